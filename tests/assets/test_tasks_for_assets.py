@@ -33,3 +33,13 @@ class AssetTasksTestCase(ApiDBTestCase):
         self.assertEqual(
             assets[0]["tasks"][0]["assignees"][0], str(self.person_id)
         )
+
+    def test_get_assets_and_tasks_wrong_parameters(self):
+        self.get("data/assets/with-tasks?cursor=wrong", 400)
+        self.get(
+            "data/assets/with-tasks?limit=1&since=2000-01-01T00:00:00", 400
+        )
+        self.get(
+            "data/assets/with-tasks?format=ndjson&since=2000-01-01T00:00:00",
+            400
+        )
@@ -1,8 +1,13 @@
+import time
+
 import flask_bcrypt as bcrypt
 
+from ldap3.core.exceptions import LDAPSocketOpenError
+
 from tests.base import ApiDBTestCase
 
-from zou.app.utils import auth
+from zou.app import config
+from zou.app.utils import auth, ldap_pool
 
 from zou.app.services import persons_service, auth_service
 from zou.app.services.exception import (
@@ -12,6 +17,40 @@ from zou.app.services.exception import (
 )
 
 
+class FakeLDAPConnection(object):
+    """
+    Connection accepting only given password. Like an ldap3 connection built
+    without raise_exceptions, a failed bind returns False. With a bind error
+    (a server that cannot be reached), bind fails whatever the password is.
+    """
+
+    def __init__(self, password, bind_error=None):
+        self.password = password
+        self.bind_error = bind_error
+        self.closed = False
+        self.last_error = None
+        self.result = None
+        self.response = [{
+            "type": "searchResEntry",
+            "attributes": {"mail": ["john.doe@gmail.com"]}
+        }]
+
+    def rebind(self, user=None, password=None):
+        if self.bind_error is not None:
+            raise self.bind_error
+        if password != self.password:
+            self.last_error = "invalidCredentials"
+            self.result = {"result": 49, "description": "invalidCredentials"}
+            return False
+        return True
+
+    def search(self, **kwargs):
+        pass
+
+    def unbind(self):
+        self.closed = True
+
+
 class AuthTestCase(ApiDBTestCase):
 
     def setUp(self):
@@ -45,6 +84,18 @@ class AuthTestCase(ApiDBTestCase):
         self.assertNotEqual(pass_hash, password)
         self.assertTrue(bcrypt.check_password_hash(pass_hash, password))
 
+    def test_needs_rehash(self):
+        pass_hash = auth.encrypt_password("my secret")
+        self.assertEqual(
+            auth.get_hash_rounds(pass_hash),
+            config.BCRYPT_LOG_ROUNDS
+        )
+        self.assertFalse(auth.needs_rehash(pass_hash))
+        pass_hash = bcrypt.generate_password_hash("my secret", 4)
+        self.assertEqual(auth.get_hash_rounds(pass_hash), 4)
+        self.assertTrue(auth.needs_rehash(pass_hash))
+        self.assertIsNone(auth.get_hash_rounds("wrong-hash"))
+
     def test_validate_email(self):
         self.assertEqual(
             auth.validate_email("john@gmail.com"),
@@ -93,6 +144,93 @@ class AuthTestCase(ApiDBTestCase):
             auth_service.check_credentials("john.doe@gmail.com", "mypassword")
         )
 
+    def test_check_credentials_rehash(self):
+        self.person.update({
+            "password": bcrypt.generate_password_hash("mypassword", 4)
+        })
+        auth_service.check_credentials("john.doe@gmail.com", "mypassword")
+        person = persons_service.get_person_raw(self.person.id)
+        self.assertFalse(auth.needs_rehash(person.password))
+        self.assertTrue(auth.check_password(person.password, "mypassword"))
+
+    def test_get_person_from_ldap_account(self):
+        person = auth_service.get_person_from_ldap_account(
+            "jdoe@studio.local",
+            {"mail": ["john.doe@gmail.com"], "sAMAccountName": "jdoe"}
+        )
+        self.assertEqual(person["id"], str(self.person.id))
+        person = auth_service.get_person_from_ldap_account(
+            "jdoe@studio.local",
+            {"mail": [], "sAMAccountName": "john.doe"}
+        )
+        self.assertEqual(person["id"], str(self.person.id))
+        person = auth_service.get_person_from_ldap_account(
+            "john.doe@studio.local",
+            {}
+        )
+        self.assertEqual(person["id"], str(self.person.id))
+        self.assertRaises(
+            PersonNotFoundException,
+            auth_service.get_person_from_ldap_account,
+            "jdoe@studio.local",
+            {"mail": [], "sAMAccountName": "jdoe"}
+        )
+
+    def test_active_directory_auth_strategy(self):
+        pool = ldap_pool.LDAPConnectionPool("localhost", 389)
+        pool.acquire = lambda: (FakeLDAPConnection("adpassword"), time.time())
+        old_pool = auth_service.ldap_pools.get("pool", None)
+        auth_service.ldap_pools["pool"] = pool
+        try:
+            person = auth_service.active_directory_auth_strategy(
+                "john.doe@gmail.com",
+                "adpassword",
+                self.flask_app
+            )
+            self.assertEqual(person["id"], str(self.person.id))
+            self.assertRaises(
+                WrongPasswordException,
+                auth_service.active_directory_auth_strategy,
+                "john.doe@gmail.com",
+                "wrongpassword",
+                self.flask_app
+            )
+        finally:
+            auth_service.ldap_pools["pool"] = old_pool
+
+    def test_active_directory_auth_strategy_unreachable(self):
+        pool = ldap_pool.LDAPConnectionPool("localhost", 389)
+        old_pool = auth_service.ldap_pools.get("pool", None)
+        auth_service.ldap_pools["pool"] = pool
+        try:
+            pool.acquire = lambda: (
+                FakeLDAPConnection(
+                    "adpassword",
+                    bind_error=LDAPSocketOpenError("socket connection error")
+                ),
+                time.time()
+            )
+            self.assertRaises(
+                PersonNotFoundException,
+                auth_service.active_directory_auth_strategy,
+                "john.doe@gmail.com",
+                "adpassword",
+                self.flask_app
+            )
+
+            connection = FakeLDAPConnection("adpassword")
+            connection.rebind = lambda user=None, password=None: False
+            pool.acquire = lambda: (connection, time.time())
+            self.assertRaises(
+                PersonNotFoundException,
+                auth_service.active_directory_auth_strategy,
+                "john.doe@gmail.com",
+                "adpassword",
+                self.flask_app
+            )
+        finally:
+            auth_service.ldap_pools["pool"] = old_pool
+
     def test_no_password_auth_strategy(self):
         person = auth_service.no_password_auth_strategy("john.doe@gmail.com")
         self.assertEquals(person["first_name"], "John")
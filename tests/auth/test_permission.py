@@ -120,3 +120,20 @@ class PermissionTestCase(ApiDBTestCase):
         self.task = tasks_service.get_task(task_id)
         tasks_service.assign_task(self.task["id"], self.user_cg_artist.id)
         self.get("data/assets/%s" % self.entity.id, 200)
+
+    def test_cg_artist_lists_related_tasks(self):
+        self.generate_fixture_entity_type()
+        self.generate_assigned_task()
+        self.log_in_cg_artist()
+        self.assertEquals(len(self.get("data/tasks")), 0)
+        self.assertEquals(len(self.get("data/entities")), 0)
+
+        tasks_service.assign_task(self.task.id, self.user_cg_artist.id)
+        tasks = self.get("data/tasks")
+        self.assertEquals(len(tasks), 1)
+        self.assertEquals(tasks[0]["id"], str(self.task.id))
+        entities = self.get("data/entities")
+        self.assertTrue(len(entities) > 0)
+        for entity in entities:
+            self.assertEquals(entity["project_id"], str(self.project_id))
+        self.assertEquals(len(self.get("data/comments")), 0)
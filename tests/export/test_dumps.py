@@ -0,0 +1,77 @@
+import datetime
+import gzip
+import io
+import json
+
+from tests.base import ApiDBTestCase
+
+from zou.app.models.time_spent import TimeSpent
+
+
+class DumpsExportTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(DumpsExportTestCase, self).setUp()
+
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_entity_type()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_entity()
+        self.generate_fixture_sequence()
+        self.generate_fixture_shot()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_task()
+        TimeSpent.create(
+            task_id=self.task.id,
+            person_id=self.person.id,
+            date=datetime.date(2017, 2, 21),
+            duration=3600
+        )
+
+    def test_dump_tasks_ndjson(self):
+        lines = self.get_raw("/export/dumps/tasks").splitlines()
+        self.assertEqual(len(lines), 1)
+        task = json.loads(lines[0])
+        self.assertEqual(task["id"], str(self.task.id))
+        self.assertEqual(task["project_name"], "Cosmos Landromat")
+        self.assertEqual(task["entity_name"], "Tree")
+        self.assertEqual(task["assignees"], str(self.person.id))
+        self.assertEqual(task["duration"], 50)
+
+    def test_dump_shots_ndjson(self):
+        lines = self.get_raw("/export/dumps/shots").splitlines()
+        shots = {
+            shot["id"]: shot for shot in [json.loads(line) for line in lines]
+        }
+        self.assertEqual(len(shots), 2)
+        shot = shots[str(self.shot.id)]
+        self.assertEqual(shot["name"], "P01")
+        self.assertEqual(shot["sequence_name"], "S01")
+        self.assertEqual(shot["frame_in"], "0")
+        self.assertEqual(shot["frame_out"], "100")
+
+    def test_dump_assets_ndjson(self):
+        lines = self.get_raw("/export/dumps/assets").splitlines()
+        self.assertEqual(len(lines), 1)
+        asset = json.loads(lines[0])
+        self.assertEqual(asset["id"], str(self.entity.id))
+        self.assertEqual(asset["project_name"], "Cosmos Landromat")
+
+    def test_dump_time_spents_csv_gz(self):
+        response = self.app.get(
+            "/export/dumps/time-spents?format=csv.gz",
+            headers=self.base_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        content = gzip.GzipFile(fileobj=io.BytesIO(response.data)).read()
+        lines = content.decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("id,date,duration,person_id"))
+        self.assertTrue(",2017-02-21,3600,%s," % self.person.id in lines[1])
+
+    def test_dump_wrong_format(self):
+        self.get("/export/dumps/comments?format=xml", 400)
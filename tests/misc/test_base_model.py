@@ -1,6 +1,8 @@
 # -*- coding: UTF-8 -*-
 from tests.base import ApiDBTestCase
 
+from zou.app.models.project import Project
+
 
 class BaseModelTestCase(ApiDBTestCase):
 
@@ -25,7 +27,14 @@ class BaseModelTestCase(ApiDBTestCase):
         pass
 
     def test_get_id_map(self):
-        pass
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_project_standard()
+        id_map = Project.get_id_map(field="name")
+        self.assertEqual(id_map, {
+            self.project.name: self.project.id,
+            self.project_standard.name: self.project_standard.id
+        })
 
     def save(self):
         pass
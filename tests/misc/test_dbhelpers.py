@@ -0,0 +1,41 @@
+from tests.base import ApiDBTestCase
+
+from zou.app import db
+from zou.app.models.task import Task
+from zou.app.utils import dbhelpers
+
+
+class DbHelpersTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(DbHelpersTestCase, self).setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_entity_type()
+        self.generate_fixture_entity()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_task()
+        self.generate_fixture_task(name="Secondary")
+
+    def test_upgrade_all(self):
+        # Make the schema look like one created before the upgrade.
+        db.session.execute(
+            "ALTER TABLE task DROP CONSTRAINT task_shotgun_id_key"
+        )
+        db.session.execute("ALTER TABLE person DROP COLUMN slug")
+        db.session.execute("UPDATE task SET shotgun_id = 1")
+        db.session.commit()
+
+        cleared = dbhelpers.upgrade_all()
+        self.assertEqual(cleared, {"task": 1, "comment": 0})
+        self.assertEqual(Task.query.filter_by(shotgun_id=1).count(), 1)
+        self.assertIsNotNone(db.session.execute(
+            "SELECT to_regclass('task_shotgun_id_key')"
+        ).scalar())
+
+        cleared = dbhelpers.upgrade_all()
+        self.assertEqual(cleared, {"task": 0, "comment": 0})
@@ -2,7 +2,7 @@ from tests.base import ApiDBTestCase
 from zou.app.models.task import Task
 from zou.app.models.person import Person
 
-from zou.app.utils import fields
+from zou.app.utils import events, fields
 
 
 class TaskTestCase(ApiDBTestCase):
@@ -71,6 +71,29 @@ class TaskTestCase(ApiDBTestCase):
         self.assertEquals(data["name"], task_again["name"])
         self.put_404("data/tasks/%s" % fields.gen_uuid(), data)
 
+    def test_update_task_status(self):
+        self.generate_fixture_task_status_wip()
+        self.status_changes = []
+        events.register("task:status-changed", "test_handler", self)
+        try:
+            task = self.get_first("data/tasks")
+            self.put("data/tasks/%s" % task["id"], {"name": "Modeling 2"})
+            self.assertEquals(len(self.status_changes), 0)
+            self.put(
+                "data/tasks/%s" % task["id"],
+                {"task_status_id": str(self.task_status_wip.id)}
+            )
+            self.assertEquals(len(self.status_changes), 1)
+            self.assertEquals(
+                self.status_changes[0]["previous_task_status_id"],
+                str(self.task_status.id)
+            )
+        finally:
+            events.unregister("task:status-changed", "test_handler")
+
+    def handle_event(self, data):
+        self.status_changes.append(data)
+
     def test_delete_task(self):
         tasks = self.get("data/tasks")
         self.assertEquals(len(tasks), 3)
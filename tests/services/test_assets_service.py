@@ -1,7 +1,10 @@
 from tests.base import ApiDBTestCase
 
 from zou.app.services import assets_service
-from zou.app.services.exception import AssetNotFoundException
+from zou.app.services.exception import (
+    AssetNotFoundException,
+    WrongParameterException
+)
 
 
 class AssetServiceTestCase(ApiDBTestCase):
@@ -58,6 +61,49 @@ class AssetServiceTestCase(ApiDBTestCase):
             assets[1]["tasks"][0]["assignees"][0], str(self.person.id)
         )
 
+    def test_get_assets_and_tasks_page(self):
+        self.generate_fixture_asset_types()
+        self.generate_fixture_entity_character()
+        self.generate_fixture_department()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task_type()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_task()
+        page = assets_service.get_assets_and_tasks_page(limit=1)
+        self.assertEqual(len(page["data"]), 1)
+        self.assertEqual(page["data"][0]["name"], "Rabbit")
+        self.assertIsNotNone(page["next_cursor"])
+
+        page = assets_service.get_assets_and_tasks_page(
+            limit=1,
+            cursor=page["next_cursor"]
+        )
+        self.assertEqual(len(page["data"]), 1)
+        self.assertEqual(page["data"][0]["name"], "Tree")
+        self.assertEqual(len(page["data"][0]["tasks"]), 1)
+        self.assertIsNone(page["next_cursor"])
+
+        assets = list(assets_service.iter_assets_and_tasks(batch_size=1))
+        self.assertEqual(
+            [asset["name"] for asset in assets],
+            ["Rabbit", "Tree"]
+        )
+        self.assertRaises(
+            WrongParameterException,
+            assets_service.get_assets_and_tasks_page,
+            cursor="wrong"
+        )
+        self.assertRaises(
+            WrongParameterException,
+            assets_service.get_assets_and_tasks_page,
+            cursor=assets_service.encode_asset_cursor({
+                "asset_type_name": "Props",
+                "name": "Tree",
+                "id": "not-an-id"
+            })
+        )
+
     def test_get_asset(self):
         asset = assets_service.get_asset(self.entity.id)
         self.assertEqual(asset["id"], str(self.entity.id))
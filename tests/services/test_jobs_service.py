@@ -0,0 +1,86 @@
+import os
+import time
+
+from tests.base import ApiDBTestCase
+
+from zou.app import app
+from zou.app.services import jobs_service
+from zou.app.stores import jobs_store
+from zou.app.services.exception import JobNotFoundException
+
+
+def add_numbers(job):
+    return {"sum": job["params"]["a"] + job["params"]["b"]}
+
+
+def fail(job):
+    raise Exception("Job failed")
+
+
+class JobsServiceTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(JobsServiceTestCase, self).setUp()
+        jobs_service.work(burst=True)
+        jobs_service.register_job("add_numbers", add_numbers)
+        jobs_service.register_job("fail", fail)
+
+    def test_get_job(self):
+        self.assertRaises(
+            JobNotFoundException,
+            jobs_service.get_job,
+            "wrong-id"
+        )
+        job = jobs_service.submit_job("add_numbers", {"a": 1, "b": 2})
+        job = jobs_service.get_job(job["id"])
+        self.assertEqual(job["status"], "queued")
+        self.assertFalse("params" in jobs_service.serialize_job(job))
+
+    def test_work(self):
+        job = jobs_service.submit_job("add_numbers", {"a": 1, "b": 2})
+        failed_job = jobs_service.submit_job("fail")
+        jobs_service.work(burst=True)
+
+        job = jobs_service.get_job(job["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["progress"], 100)
+        self.assertEqual(job["result_mimetype"], "application/json")
+        self.assertTrue(os.path.exists(job["result_file"]))
+
+        failed_job = jobs_service.get_job(failed_job["id"])
+        self.assertEqual(failed_job["status"], "failed")
+        self.assertEqual(failed_job["error"], "Job failed")
+
+    def test_work_without_burst(self):
+        first_job = jobs_service.submit_job("add_numbers", {"a": 1, "b": 2})
+        second_job = jobs_service.submit_job("add_numbers", {"a": 3, "b": 4})
+        jobs_service.work(timeout=1, max_jobs=2)
+        for job in [first_job, second_job]:
+            job = jobs_service.get_job(job["id"])
+            self.assertEqual(job["status"], "done")
+        self.assertEqual(jobs_store.get_running_ids(), [])
+
+    def test_fail_stale_jobs(self):
+        job = jobs_service.submit_job("add_numbers", {"a": 1, "b": 2})
+        jobs_store.pop()
+        jobs_service.update_job(job["id"], {
+            "status": "running",
+            "started_at": "2000-01-01T00:00:00"
+        })
+        jobs_store.add_running(job["id"])
+        self.assertEqual(jobs_service.fail_stale_jobs(), 1)
+        job = jobs_service.get_job(job["id"])
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Job timed out.")
+        self.assertEqual(jobs_store.get_running_ids(), [])
+
+    def test_clean_job_files(self):
+        file_path = jobs_service.get_job_file_path("expired", "json")
+        with open(file_path, "w") as job_file:
+            job_file.write("{}")
+        self.assertEqual(jobs_service.clean_job_files(), 0)
+
+        expired_at = time.time() - app.config["JOB_TTL"] - 60
+        os.utime(file_path, (expired_at, expired_at))
+        self.assertEqual(jobs_service.clean_job_files(), 1)
+        self.assertFalse(os.path.exists(file_path))
@@ -1,6 +1,10 @@
+import time
+
 from tests.base import ApiDBTestCase
 
+from zou.app.models.person import Person
 from zou.app.services import persons_service
+from zou.app.stores import persons_store
 
 from zou.app.services.exception import PersonNotFoundException
 
@@ -78,3 +82,66 @@ class PersonServiceTestCase(ApiDBTestCase):
             persons_service.get_person_by_email_username,
             "ema.doe@yahoo.com"
         )
+
+    def test_get_current_user(self):
+        old_get_jwt_identity = persons_service.get_jwt_identity
+        persons_service.get_jwt_identity = lambda: self.person_email
+        try:
+            with self.flask_app.test_request_context():
+                user = persons_service.get_current_user()
+                self.assertEqual(user["id"], self.person_id)
+                self.assertTrue(
+                    persons_service.get_current_user() is user
+                )
+                person = persons_service.get_current_user_raw()
+                self.assertEqual(str(person.id), self.person_id)
+
+            if persons_service.person_changes_listener.is_running():
+                self.assertEqual(
+                    persons_service.current_users.get(self.person_email),
+                    user
+                )
+            persons_service.update_person(
+                self.person_id,
+                {"first_name": "Johnny"}
+            )
+            self.assertIsNone(
+                persons_service.current_users.get(self.person_email)
+            )
+            with self.flask_app.test_request_context():
+                user = persons_service.get_current_user()
+                self.assertEqual(user["first_name"], "Johnny")
+        finally:
+            persons_service.get_jwt_identity = old_get_jwt_identity
+
+    def test_current_user_cache_broadcast(self):
+        if not persons_service.person_changes_listener.is_running():
+            self.skipTest("Person changes cannot be listened to.")
+
+        persons_service.current_users.set(self.person_email, {"id": "1"})
+        persons_store.publish_changes()
+        for attempt in range(20):
+            if persons_service.current_users.get(self.person_email) is None:
+                break
+            time.sleep(0.05)
+        self.assertIsNone(
+            persons_service.current_users.get(self.person_email)
+        )
+
+    def test_slug(self):
+        self.assertEqual(self.person.slug, "john.doe")
+        persons_service.update_person(
+            self.person_id,
+            {"last_name": "Doe Smith"}
+        )
+        person = persons_service.get_person_by_email_username(
+            "john.doe-smith@gmail.com"
+        )
+        self.assertEqual(person["id"], self.person_id)
+
+    def test_reset_slugs(self):
+        Person.query.filter_by(id=self.person_id).update({"slug": None})
+        Person.commit()
+        persons_service.reset_slugs()
+        person = persons_service.get_person_raw(self.person_id)
+        self.assertEqual(person.slug, "john.doe")
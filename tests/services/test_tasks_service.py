@@ -360,6 +360,43 @@ class TaskServiceTestCase(ApiDBTestCase):
         self.assertEquals(time_spents[str(user_id)]["duration"], 7200)
         self.assertEquals(time_spents[str(person_id)]["duration"], 3600)
 
+    def test_get_time_spent_aggregates(self):
+        person_id = self.person.id
+        user_id = self.user.id
+        task_id = self.task.id
+        for (person, date, duration) in [
+            (person_id, datetime.date(2017, 9, 23), 3600),
+            (person_id, datetime.date(2017, 9, 24), 1800),
+            (user_id, datetime.date(2017, 10, 2), 7200)
+        ]:
+            TimeSpent.create(
+                person_id=person,
+                task_id=task_id,
+                date=date,
+                duration=duration
+            )
+
+        aggregates = self.get(
+            "/data/time-spents/aggregates?group_by=person,project"
+            "&interval=month&start_date=2017-09-01"
+        )
+        self.assertEquals(len(aggregates), 2)
+        aggregates = {
+            aggregate["person_id"]: aggregate for aggregate in aggregates
+        }
+        aggregate = aggregates[str(person_id)]
+        self.assertEquals(aggregate["duration"], 5400)
+        self.assertEquals(aggregate["date"], "2017-09-01")
+        self.assertEquals(aggregate["project_id"], str(self.project.id))
+        self.assertEquals(aggregates[str(user_id)]["date"], "2017-10-01")
+
+        aggregates = tasks_service.get_time_spent_aggregates(
+            end_date="2017-09-30"
+        )
+        self.assertEquals(aggregates, [{"duration": 5400}])
+        self.get("/data/time-spents/aggregates?group_by=wrong", 400)
+        self.get("/data/time-spents/aggregates?interval=year", 400)
+
     def test_clear_assignation(self):
         task_id = self.task.id
         tasks_service.assign_task(self.task.id, self.person.id)
@@ -395,3 +432,32 @@ class TaskServiceTestCase(ApiDBTestCase):
             tasks[0]["last_comment"]["person_id"],
             str(self.person.id)
         )
+
+    def test_reset_last_comments(self):
+        task_id = self.task.id
+        tasks_service.create_comment(
+            task_id,
+            self.task_status.id,
+            self.person.id,
+            "first comment"
+        )
+        comment = tasks_service.create_comment(
+            task_id,
+            self.task_status.id,
+            self.person.id,
+            "last comment"
+        )
+        task = tasks_service.get_task(task_id)
+        self.assertEqual(task["last_comment_id"], comment["id"])
+
+        Task.query.update({"last_comment_id": None, "last_comment_at": None})
+        Task.commit()
+        tasks_service.reset_last_comments()
+        task = tasks_service.get_task(task_id)
+        self.assertEqual(task["last_comment_id"], comment["id"])
+
+        tasks_service.get_comment(comment["id"]).delete()
+        tasks_service.reset_last_comments([task_id])
+        task = tasks_service.get_task(task_id)
+        self.assertNotEqual(task["last_comment_id"], comment["id"])
+        self.assertIsNotNone(task["last_comment_id"])
@@ -1,6 +1,7 @@
 # -*- coding: UTF-8 -*-
 from tests.base import ApiDBTestCase
 
+from zou.app.models.project import Project
 from zou.app.services import user_service, persons_service
 
 from zou.app.utils import permissions
@@ -67,6 +68,43 @@ class TaskServiceTestCase(ApiDBTestCase):
         self.task.assignees.append(self.user)
         self.task.save()
         self.assertTrue(user_service.check_has_task_related(self.project_id))
+        self.generate_fixture_project_standard()
+        with self.assertRaises(permissions.PermissionDenied):
+            user_service.check_has_task_related(self.project_standard.id)
+
+    def test_get_event_person_ids(self):
+        self.assertEqual(
+            user_service.get_event_person_ids({"task_id": str(self.task_id)}),
+            set()
+        )
+        self.task.assignees.append(self.user)
+        self.task.save()
+        self.assertEqual(
+            user_service.get_event_person_ids({"task_id": str(self.task_id)}),
+            set([str(self.user.id)])
+        )
+        self.assertEqual(
+            user_service.get_event_person_ids({
+                "person": {"id": "person-1"},
+                "task": {"assignees": ["person-2"]}
+            }),
+            set(["person-1", "person-2"])
+        )
+
+    def test_filter_permitted(self):
+        self.generate_fixture_project_standard()
+        query = Project.query
+        self.assertEqual(
+            user_service.filter_permitted(query, Project.id).all(),
+            []
+        )
+        self.task.assignees.append(self.user)
+        self.task.save()
+        projects = user_service.filter_permitted(query, Project.id).all()
+        self.assertEqual(
+            [str(project.id) for project in projects],
+            [str(self.project_id)]
+        )
 
     def test_check_criterions_has_task_related(self):
         with self.assertRaises(permissions.PermissionDenied):
@@ -1,5 +1,9 @@
 from tests.base import ApiDBTestCase
 
+from zou.app import app
+from zou.app.models.tombstone import Tombstone
+from zou.app.services import sync_service, tasks_service
+
 
 class ShotTasksTestCase(ApiDBTestCase):
 
@@ -33,3 +37,36 @@ class ShotTasksTestCase(ApiDBTestCase):
         self.assertEqual(shots[0]["tasks"][0]["assignees"][0], self.person_id)
         self.assertEqual(shots[0]["episode_name"], "E01")
         self.assertEqual(shots[0]["sequence_name"], "S01")
+
+    def test_get_shots_and_tasks_since(self):
+        result = self.get("data/shots/with-tasks?since=2000-01-01T00:00:00")
+        self.assertEqual(len(result["data"]), 1)
+        self.assertEqual(len(result["data"][0]["tasks"]), 1)
+
+        timestamp = result["timestamp"]
+        result = self.get("data/shots/with-tasks?since=%s" % timestamp)
+        self.assertEqual(len(result["data"]), 1)
+
+        margin = app.config["SYNC_SAFETY_MARGIN"]
+        app.config["SYNC_SAFETY_MARGIN"] = 0
+        try:
+            timestamp = result["timestamp"]
+            result = self.get("data/shots/with-tasks?since=%s" % timestamp)
+            self.assertEqual(len(result["data"]), 0)
+        finally:
+            app.config["SYNC_SAFETY_MARGIN"] = margin
+
+        shot_task_id = str(self.shot_task.id)
+        tasks_service.assign_task(shot_task_id, self.user.id)
+        result = self.get("data/shots/with-tasks?since=%s" % timestamp)
+        self.assertEqual(len(result["data"]), 1)
+
+        tasks_service.delete_task(shot_task_id)
+        result = self.get("data/shots/with-tasks?since=%s" % timestamp)
+        self.assertEqual(result["deleted"]["tasks"], [shot_task_id])
+
+        self.assertEqual(sync_service.prune_tombstones(), 0)
+        self.assertEqual(sync_service.prune_tombstones(-1), 1)
+        self.assertEqual(Tombstone.query.count(), 0)
+
+        self.get("data/shots/with-tasks?since=wrong-date", 400)
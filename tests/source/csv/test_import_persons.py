@@ -1,8 +1,10 @@
+import json
 import os
 
 from tests.base import ApiDBTestCase
 
 from zou.app.models.person import Person
+from zou.app.services import jobs_service
 
 
 class ImportCsvPersonsTestCase(ApiDBTestCase):
@@ -23,3 +25,20 @@ class ImportCsvPersonsTestCase(ApiDBTestCase):
 
         persons = Person.query.all()
         self.assertEqual(len(persons), 3)
+
+    def test_import_persons_async(self):
+        path = "/import/csv/persons?async=true"
+
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "persons.csv")
+        )
+        job = json.loads(self.upload_file(path, file_path_fixture, 202))
+        self.assertEqual(job["status"], "queued")
+        self.assertEqual(len(Person.query.all()), 1)
+
+        jobs_service.work(burst=True)
+        job = self.get("data/jobs/%s" % job["id"])
+        self.assertEqual(job["status"], "done")
+        persons = self.get("data/jobs/%s/result" % job["id"])
+        self.assertEqual(len(persons), 2)
+        self.assertEqual(len(Person.query.all()), 3)
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+
+from tests.base import ApiDBTestCase
+
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
+from zou.app.models.project import Project
+from zou.app.models.task import Task
+from zou.app.services import shots_service
+
+
+class ImportCsvTasksTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(ImportCsvTasksTestCase, self).setUp()
+
+        self.generate_fixture_project_status()
+        self.generate_fixture_person()
+        self.project = Project.create(
+            name="Cosmos Landraumat",
+            project_status_id=self.open_status.id
+        )
+        episode = shots_service.get_or_create_episode(self.project.id, "E01")
+        sequence = shots_service.get_or_create_sequence(
+            self.project.id,
+            episode["id"],
+            "SE01"
+        )
+        Entity.create(
+            name="S01",
+            project_id=self.project.id,
+            parent_id=sequence["id"],
+            entity_type_id=shots_service.get_shot_type()["id"]
+        )
+        Entity.create(
+            name="Cassette Player",
+            project_id=self.project.id,
+            entity_type_id=EntityType.create(name="Prop").id
+        )
+
+    def test_import_tasks(self):
+        path = "/import/csv/tasks"
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "tasks.csv")
+        )
+        self.upload_file(path, file_path_fixture)
+
+        tasks = Task.query.all()
+        self.assertEqual(len(tasks), 3)
+        assigned_tasks = [task for task in tasks if len(task.assignees) > 0]
+        self.assertEqual(len(assigned_tasks), 1)
+        self.assertEqual(assigned_tasks[0].assignees[0].id, self.person.id)
+        self.assertEqual(assigned_tasks[0].duration, 40 * 3600)
+
+        self.upload_file(path, file_path_fixture)
+        self.assertEqual(len(Task.query.all()), 3)
+
+    def test_import_tasks_unknown_person(self):
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "tasks.csv")
+        )
+        with open(file_path_fixture) as csv_file:
+            lines = csv_file.read().splitlines()
+        lines[2] = lines[2].replace("John Doe", "Jane Doe", 1)
+        (file_descriptor, file_path) = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(file_descriptor, "w") as csv_file:
+            csv_file.write("\n".join(lines))
+        result = json.loads(
+            self.upload_file("/import/csv/tasks", file_path, 400)
+            .decode("utf-8")
+        )
+        os.remove(file_path)
+        self.assertTrue(
+            result["error"].startswith("Person Jane Doe does not exist.")
+        )
+        self.assertEqual(len(Task.query.all()), 0)
+
+    def test_import_tasks_wrong_duration(self):
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "tasks.csv")
+        )
+        with open(file_path_fixture) as csv_file:
+            lines = csv_file.read().splitlines()
+        lines[2] = lines[2].replace(",50,20,", ",fifty,20,")
+        (file_descriptor, file_path) = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(file_descriptor, "w") as csv_file:
+            csv_file.write("\n".join(lines))
+        result = json.loads(
+            self.upload_file("/import/csv/tasks", file_path, 400)
+            .decode("utf-8")
+        )
+        os.remove(file_path)
+        self.assertTrue(
+            result["error"].startswith("Duration is not an integer.")
+        )
+        self.assertEqual(len(Task.query.all()), 0)
+
+    def test_import_tasks_dry_run(self):
+        path = "/import/csv/tasks?dry_run=true"
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "tasks.csv")
+        )
+        result = json.loads(
+            self.upload_file(path, file_path_fixture, 200).decode("utf-8")
+        )
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["nb_rows"], 3)
+        self.assertEqual(len(Task.query.all()), 0)
+
+        with open(file_path_fixture) as csv_file:
+            lines = csv_file.read().splitlines()
+        lines[2] = lines[2].replace("John Doe", "Jane Doe", 1)
+        lines[3] = lines[3].replace("Cassette Player", "Radio")
+        (file_descriptor, file_path) = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(file_descriptor, "w") as csv_file:
+            csv_file.write("\n".join(lines))
+        result = json.loads(
+            self.upload_file(path, file_path, 200).decode("utf-8")
+        )
+        os.remove(file_path)
+        self.assertFalse(result["valid"])
+        self.assertEqual(result["errors"], [
+            {"line": 3, "error": "Person Jane Doe does not exist."},
+            {"line": 4, "error": "Entity Radio does not exist."}
+        ])
+        self.assertEqual(len(Task.query.all()), 0)
+
+    def test_import_tasks_dry_run_short_row(self):
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "tasks.csv")
+        )
+        with open(file_path_fixture) as csv_file:
+            lines = csv_file.read().splitlines()
+        lines.append("Cosmos Landraumat,Animation,Facial,E01,SE01,S01")
+        (file_descriptor, file_path) = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(file_descriptor, "w") as csv_file:
+            csv_file.write("\n".join(lines))
+        result = json.loads(
+            self.upload_file(
+                "/import/csv/tasks?dry_run=true",
+                file_path,
+                200
+            ).decode("utf-8")
+        )
+        os.remove(file_path)
+        self.assertFalse(result["valid"])
+        self.assertEqual(result["nb_rows"], 4)
+        errors = [error["error"] for error in result["errors"]]
+        self.assertIn("Name is empty.", errors)
+        self.assertIn("Duration is not an integer.", errors)
+        self.assertTrue(all(error["line"] == 5 for error in result["errors"]))
@@ -66,6 +66,29 @@ class ImportShotgunTaskTestCase(ShotgunTestCase):
         api_path = "/import/shotgun/notes"
         self.notes = self.post(api_path, [self.sg_note], 200)
 
+    def test_import_notes_bulk(self):
+        self.load_note()
+        sg_note = dict(self.sg_note, id=2, content="comment 02")
+        sg_orphan_note = dict(
+            self.sg_note,
+            id=3,
+            tasks=[{"type": "Task", "id": 999, "name": "Unknown"}]
+        )
+        api_path = "/import/shotgun/notes?bulk=true"
+        result = self.post(
+            api_path,
+            [self.sg_note, sg_note, sg_orphan_note],
+            200
+        )
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(result["errors"], [])
+
+        self.comments = self.get("data/comments")
+        self.assertEqual(len(self.comments), 2)
+        task = Task.get_by(shotgun_id=self.sg_note["tasks"][0]["id"])
+        self.assertIsNotNone(task.last_comment_id)
+
     def test_import_note(self):
         self.load_note()
         self.assertEqual(len(self.notes), 1)
@@ -94,9 +117,13 @@ class ImportShotgunTaskTestCase(ShotgunTestCase):
         self.notes = self.get(
             "data/comments?shotgun_id=%s" % self.sg_note["id"])
         note = self.notes[0]
+        task = Task.get_by(shotgun_id=self.sg_note["tasks"][0]["id"])
+        self.assertEqual(str(task.last_comment_id), note["id"])
 
         response = self.post(api_path, sg_note, 200)
         self.assertEqual(response["removed_instance_id"], note["id"])
         self.notes = self.get(
             "data/comments?shotgun_id=%s" % self.sg_note["id"])
         self.assertEqual(len(self.notes), 0)
+        task = self.get("data/tasks/%s" % task.id)
+        self.assertIsNone(task["last_comment_id"])
@@ -1,8 +1,12 @@
+import json
+
 from tests.source.shotgun.base import ShotgunTestCase
 
 from zou.app.config import DEFAULT_FILE_TREE
-from zou.app.services import file_tree
+from zou.app.services import file_tree, jobs_service
+from zou.app.models.project import Project
 from zou.app.models.project_status import ProjectStatus
+from zou.app.blueprints.source.shotgun.base import get_id_map, id_maps
 
 
 class ImportShotgunProjectTestCase(ShotgunTestCase):
@@ -27,6 +31,18 @@ class ImportShotgunProjectTestCase(ShotgunTestCase):
         tree = file_tree.get_tree_from_file(DEFAULT_FILE_TREE)
         self.assertDictEqual(self.projects[0]["file_tree"], tree)
 
+    def test_import_projects_async(self):
+        file_path = "./tests/fixtures/shotgun/projects.json"
+        data = json.loads(open(file_path).read())
+        job = self.post("/import/shotgun/projects?async=true", data, 202)
+        self.assertEqual(job["status"], "queued")
+        self.assertEqual(len(self.get("data/projects")), 0)
+
+        jobs_service.work(burst=True)
+        job = self.get("data/jobs/%s" % job["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(len(self.get("data/projects")), 2)
+
     def test_import_projects_twice(self):
         self.projects = self.load_fixture('projects')
         self.projects = self.load_fixture('projects')
@@ -55,3 +71,25 @@ class ImportShotgunProjectTestCase(ShotgunTestCase):
         self.assertEqual(project["name"], sg_project["name"])
         self.assertEqual(project["shotgun_id"], sg_project["id"])
         self.assertEqual(project["project_status_id"], str(project_status.id))
+
+    def test_id_maps_cache(self):
+        ttl = id_maps.ttl
+        id_maps.ttl = 60
+        try:
+            self.load_fixture('projects')
+            id_map = get_id_map(Project, field="name")
+            self.assertEqual(len(id_map), 2)
+            self.assertIs(get_id_map(Project, field="name"), id_map)
+
+            self.post("/import/shotgun/projects", [{
+                "id": 3,
+                "name": "Elephant Dream",
+                "sg_status": "Active",
+                "type": "Project"
+            }], 200)
+            id_map = get_id_map(Project, field="name")
+            self.assertEqual(len(id_map), 3)
+            self.assertIn("Elephant Dream", id_map)
+        finally:
+            id_maps.ttl = ttl
+            id_maps.clear()
@@ -64,6 +64,27 @@ class ImportShotgunShotTestCase(ShotgunTestCase):
         self.assertEqual(shot["entities_out"][0], str(entity.id))
         self.assertEqual(shot["project_id"], str(project.id))
 
+    def test_import_shot_bulk(self):
+        self.load_fixture('projects')
+        self.load_fixture('sequences')
+        self.load_fixture('assets')
+
+        api_path = "/import/shotgun/shots?bulk=true"
+        summary = self.post(api_path, [self.sg_shot], 200)
+        self.assertEqual(summary["imported"], 1)
+        summary = self.post(api_path, [self.sg_shot], 200)
+        self.assertEqual(summary["updated"], 1)
+
+        shot = Entity.get_by(
+            shotgun_id=self.sg_shot["id"],
+            entity_type_id=shots_service.get_shot_type()["id"]
+        )
+        entity = Entity.get_by(name=self.sg_shot["assets"][0]["name"])
+        self.assertEqual(
+            [asset.id for asset in shot.entities_out],
+            [entity.id]
+        )
+
     def test_import_shot_twice(self):
         self.load_fixture('projects')
         self.load_fixture('sequences')
@@ -1,3 +1,5 @@
+import json
+
 from tests.source.shotgun.base import ShotgunTestCase
 
 from zou.app.models.project import Project
@@ -155,6 +157,67 @@ class ImportShotgunTaskTestCase(ShotgunTestCase):
         self.tasks = self.get("data/tasks")
         self.assertEqual(len(self.tasks), 2)
 
+    def test_import_tasks_bulk(self):
+        file_path = "./tests/fixtures/shotgun/tasks.json"
+        sg_tasks = json.loads(open(file_path).read())
+        api_path = "/import/shotgun/tasks?bulk=true"
+        result = self.post(api_path, sg_tasks, 200)
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(result["updated"], 0)
+        self.assertEqual(result["errors"], [])
+
+        result = self.post(api_path, sg_tasks, 200)
+        self.assertEqual(result["created"], 0)
+        self.assertEqual(result["updated"], 2)
+        self.tasks = self.get("data/tasks")
+        self.assertEqual(len(self.tasks), 2)
+
+        self.load_task()
+        sg_task = dict(self.sg_task, id=21)
+        result = self.post(api_path, [self.sg_task, sg_task], 200)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(len(result["errors"]), 1)
+        self.assertEqual(result["errors"][0]["shotgun_id"], 21)
+        task = self.get("data/tasks?shotgun_id=20")[0]
+        self.assertEqual(len(task["assignees"]), 1)
+
+    def post_ndjson(self, path, lines):
+        response = self.app.post(
+            path,
+            data="\n".join(lines),
+            headers=self.base_headers,
+            content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data.decode("utf-8"))
+
+    def test_import_tasks_ndjson(self):
+        file_path = "./tests/fixtures/shotgun/tasks.json"
+        sg_tasks = json.loads(open(file_path).read())
+        lines = [json.dumps(sg_task) for sg_task in sg_tasks]
+        lines.append("{wrong line")
+        lines.append("[1]")
+        result = self.post_ndjson("/import/shotgun/tasks", lines)
+        self.assertEqual(result["imported"], 2)
+        self.assertFalse("created" in result)
+        self.assertEqual(result["failed"], 2)
+        self.assertEqual(result["errors"][0]["line"], 3)
+        self.assertEqual(result["errors"][1]["line"], 4)
+        self.tasks = self.get("data/tasks")
+        self.assertEqual(len(self.tasks), 2)
+
+    def test_import_tasks_ndjson_bulk(self):
+        file_path = "./tests/fixtures/shotgun/tasks.json"
+        sg_tasks = json.loads(open(file_path).read())
+        lines = [json.dumps(sg_task) for sg_task in sg_tasks]
+        lines.append('"wrong entry"')
+        result = self.post_ndjson("/import/shotgun/tasks?bulk=true", lines)
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(result["failed"], 1)
+        self.tasks = self.get("data/tasks")
+        self.assertEqual(len(self.tasks), 2)
+
     def test_import_task(self):
         self.load_task()
         self.assertEqual(len(self.tasks), 1)
@@ -1,5 +1,8 @@
+import time
+
 from tests.base import ApiTestCase
 
+from zou.app import config
 from zou.app.stores import auth_tokens_store
 
 
@@ -35,3 +38,35 @@ class CommandsTestCase(ApiTestCase):
         self.store.add("key-2", "true")
         self.assertTrue("key-1" in self.store.keys())
         self.assertTrue("key-2" in self.store.keys())
+
+    def test_add_all_and_get_all(self):
+        self.store.add_all([
+            ("key-1", "true", None),
+            ("key-2", "false", None)
+        ])
+        self.assertEqual(
+            self.store.get_all(["key-1", "key-2", "key-3"]),
+            ["true", "false", None]
+        )
+
+    def test_clear(self):
+        self.store.add("key-1", "true")
+        self.store.add("key-2", "true")
+        self.store.clear()
+        self.assertEqual(self.store.keys(), [])
+
+    def test_revoke(self):
+        self.store.add("key-1", "false")
+        self.assertFalse(self.store.is_revoked({"jti": "key-1"}))
+        self.assertFalse(self.store.is_revoked({"jti": "key-1"}))
+        self.store.revoke("key-1")
+        self.assertEquals(self.store.get("key-1"), "true")
+        self.assertTrue(self.store.is_revoked({"jti": "key-1"}))
+
+    def test_revocation_listener_survives_idle_period(self):
+        if not self.store.is_revocation_listener_running():
+            self.skipTest("Revocations cannot be listened to.")
+
+        time.sleep(config.KEY_VALUE_STORE["socket_timeout"] + 1)
+        self.assertTrue(self.store.revocation_listener.thread.is_alive())
+        self.assertTrue(self.store.is_revocation_listener_running())
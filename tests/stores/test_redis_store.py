@@ -0,0 +1,39 @@
+import unittest
+
+import redis
+
+from zou.app import config
+from zou.app.stores import redis_store
+
+
+class RedisStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(RedisStoreTestCase, self).setUp()
+        self.settings = dict(config.KEY_VALUE_STORE)
+        self.calls = 0
+
+    def tearDown(self):
+        config.KEY_VALUE_STORE.update(self.settings)
+
+    def lose_connection(self):
+        self.calls += 1
+        raise redis.ConnectionError("Connection lost.")
+
+    def test_with_retry(self):
+        config.KEY_VALUE_STORE["retry_attempts"] = 0
+        self.assertEqual(redis_store.with_retry(lambda: "value"), "value")
+
+        config.KEY_VALUE_STORE["retry_attempts"] = 2
+        config.KEY_VALUE_STORE["retry_backoff"] = 0
+        self.assertRaises(
+            redis.ConnectionError,
+            redis_store.with_retry,
+            self.lose_connection
+        )
+        self.assertEqual(self.calls, 2)
+
+    def test_get_connection_pool(self):
+        pool = redis_store.get_connection_pool(1)
+        self.assertTrue(isinstance(pool, redis.BlockingConnectionPool))
+        self.assertEqual(pool, redis_store.get_connection_pool(1))
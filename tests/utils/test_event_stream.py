@@ -0,0 +1,115 @@
+import json
+import unittest
+
+from zou import event_stream
+
+
+class FakeEventLogClient(object):
+    """
+    Answer the event log commands run by the replay from a list of entries.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def execute_command(self, command, key, *args):
+        if command == "XLEN":
+            return len(self.entries)
+        elif args[0] == "-":
+            return self.entries[:1]
+        else:
+            start = event_stream.parse_event_id(args[0])
+            return [
+                entry for entry in self.entries
+                if event_stream.parse_event_id(entry[0]) >= start
+            ]
+
+
+def build_entry(event_id):
+    return [event_id, ["channel", "events/global/task:start", "payload", "{}"]]
+
+
+class EventStreamTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.redis_client = event_stream.redis_client
+        self.event_log_max_length = event_stream.event_log_max_length
+
+    def tearDown(self):
+        event_stream.redis_client = self.redis_client
+        event_stream.event_log_max_length = self.event_log_max_length
+
+    def replay(self, entries, last_event_id):
+        event_stream.redis_client = FakeEventLogClient(entries)
+        return [
+            event_id for (event_id, payload) in event_stream.replay_events(
+                event_stream.parse_event_id(last_event_id),
+                ["events/*/*"]
+            )
+        ]
+
+    def test_replay_events(self):
+        event_stream.event_log_max_length = 3
+        self.assertEqual(self.replay([], "1-0"), [])
+
+        entries = [build_entry("2-0"), build_entry("3-0")]
+        self.assertEqual(self.replay(entries, "1-0"), ["2-0", "3-0"])
+        self.assertEqual(self.replay(entries, "2-0"), ["3-0"])
+
+        entries.append(build_entry("4-0"))
+        self.assertEqual(
+            self.replay(entries, "1-0"),
+            [None, "2-0", "3-0", "4-0"]
+        )
+        self.assertEqual(self.replay(entries, "3-0"), ["4-0"])
+
+    def test_get_channel_patterns(self):
+        self.assertEqual(
+            event_stream.get_channel_patterns([], []),
+            ["events/*/*"]
+        )
+        self.assertEqual(
+            event_stream.get_channel_patterns(["project-1"], ["task:*"]),
+            ["events/project-1/task:*", "events/global/task:*"]
+        )
+        self.assertEqual(
+            event_stream.get_channel_patterns(["project?[1]"], []),
+            ["events/project1/*", "events/global/*"]
+        )
+
+    def test_format_message(self):
+        payload = json.dumps({
+            "type": "task:start",
+            "data": {"data": {"id": "task-1"}}
+        })
+        self.assertEqual(
+            event_stream.format_message("", payload),
+            'event:task:start\ndata:{"data": {"id": "task-1"}}\n\n'
+        )
+        self.assertEqual(
+            event_stream.format_message("1520000000000-0", payload),
+            'id:1520000000000-0\n'
+            'event:task:start\ndata:{"data": {"id": "task-1"}}\n\n'
+        )
+
+    def test_split_message(self):
+        self.assertEqual(
+            event_stream.split_message('1520000000000-1\n{"type": "a"}'),
+            ("1520000000000-1", '{"type": "a"}')
+        )
+        self.assertEqual(
+            event_stream.split_message('\n{"type": "a"}'),
+            ("", '{"type": "a"}')
+        )
+
+    def test_parse_event_id(self):
+        self.assertEqual(
+            event_stream.parse_event_id("1520000000000-2"),
+            (1520000000000, 2)
+        )
+        self.assertTrue(
+            event_stream.parse_event_id("1520000000000-10") >
+            event_stream.parse_event_id("1520000000000-9")
+        )
+        self.assertIsNone(event_stream.parse_event_id("wrong-id"))
+        self.assertIsNone(event_stream.parse_event_id(None))
@@ -1,5 +1,9 @@
 import unittest
 
+from tests.base import ApiDBTestCase
+
+from zou.app import db
+from zou.app.models.department import Department
 from zou.app.utils import events
 
 
@@ -44,3 +48,103 @@ class EventsTestCase(unittest.TestCase):
         self.assertEqual(self.counter, 3)
         events.emit("task:new")
         self.assertEqual(self.counter, 4)
+
+    def test_lazy_data(self):
+        old_has_stream_subscribers = events.has_stream_subscribers
+        events.has_stream_subscribers = lambda: False
+        self.calls = 0
+
+        def build_data():
+            self.calls += 1
+            return {"id": "task-1"}
+
+        try:
+            events.emit("task:start", build_data)
+            self.assertEqual(self.calls, 0)
+            events.register("task:start", "inc_counter", self)
+            events.emit("task:start", build_data)
+            self.assertEqual(self.calls, 1)
+            self.assertEqual(self.counter, 2)
+        finally:
+            events.has_stream_subscribers = old_has_stream_subscribers
+
+    def test_emit_after_rollback(self):
+        from zou.app import db
+        from zou.app.models.department import Department
+
+        events.register("task:start", "inc_counter", self)
+        db.session.add(Department(name="Modeling", color="#FFFFFF"))
+        events.emit("task:start")
+        self.assertEqual(self.counter, 1)
+        db.session.rollback()
+        self.assertEqual(self.counter, 1)
+        events.emit("task:start")
+        self.assertEqual(self.counter, 2)
+
+    def test_get_channel(self):
+        self.assertEqual(
+            events.get_channel("task:start", "project-1"),
+            "events/project-1/task:start"
+        )
+        self.assertEqual(
+            events.get_channel("person:new"),
+            "events/global/person:new"
+        )
+
+    def test_publish_with_event_log_error(self):
+        import redis
+
+        old_event_log = dict(events.event_log)
+
+        def fail_transiently(keys=[], args=[]):
+            raise redis.ResponseError("BUSY Redis is busy running a script.")
+
+        def fail_without_streams(keys=[], args=[]):
+            raise redis.ResponseError("ERR unknown command 'XADD'")
+
+        try:
+            events.event_log["enabled"] = True
+            events.event_log["publish_script"] = fail_transiently
+            events.publish("events/global/task:start", "{}")
+            self.assertTrue(events.event_log["enabled"])
+
+            events.event_log["publish_script"] = fail_without_streams
+            events.publish("events/global/task:start", "{}")
+            self.assertFalse(events.event_log["enabled"])
+        finally:
+            events.event_log.update(old_event_log)
+
+
+class CommittedEventsTestCase(ApiDBTestCase):
+
+    __name__ = "test_handler"
+
+    def setUp(self):
+        super(CommittedEventsTestCase, self).setUp()
+        events.unregister_all()
+        self.department_names = []
+
+    def tearDown(self):
+        events.unregister_all()
+        super(CommittedEventsTestCase, self).tearDown()
+
+    def handle_event(self, data={}):
+        self.department_names = [
+            department.name for department in Department.query.all()
+        ]
+        Department(name="Animation", color="#000000").save()
+
+    def test_handler_uses_session(self):
+        events.register("department:new", "read_departments", self)
+        db.session.add(Department(name="Modeling", color="#FFFFFF"))
+        events.emit("department:new")
+        db.session.commit()
+
+        self.assertEqual(self.department_names, ["Modeling"])
+        self.assertEqual(
+            sorted(department.name for department in Department.query.all()),
+            ["Animation", "Modeling"]
+        )
+        db.session.add(Department(name="Compositing", color="#FFFFFF"))
+        db.session.commit()
+        self.assertEqual(Department.query.count(), 3)
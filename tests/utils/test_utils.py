@@ -6,7 +6,7 @@ import uuid
 from babel import Locale
 from pytz import timezone
 
-from zou.app.utils import colors, fields, query, fs
+from zou.app.utils import cache, colors, fields, query, fs
 from zou.app.models.person import Person
 from zou.app.models.task import Task
 from zou.app.models.working_file import WorkingFile
@@ -98,3 +98,18 @@ class UtilsTestCase(unittest.TestCase):
         self.assertTrue(os.path.exists(folder))
         fs.rm_rf("one")
         self.assertTrue(not os.path.exists(folder))
+
+    def test_ttl_cache(self):
+        ttl_cache = cache.TTLCache(max_size=2, ttl=60)
+        ttl_cache.set("key-1", 1)
+        ttl_cache.set("key-2", 2)
+        self.assertEqual(ttl_cache.get("key-1"), 1)
+        ttl_cache.set("key-3", 3)
+        self.assertIsNone(ttl_cache.get("key-2"))
+        self.assertEqual(ttl_cache.get("key-3"), 3)
+        ttl_cache.delete("key-3")
+        self.assertIsNone(ttl_cache.get("key-3"))
+
+        ttl_cache = cache.TTLCache(max_size=2, ttl=0)
+        ttl_cache.set("key-1", 1)
+        self.assertIsNone(ttl_cache.get("key-1"))
@@ -42,9 +42,11 @@ def configure_auth():
     def add_permissions(callback):
         try:
             user = persons_service.get_current_user()
+            identity = Identity(user["id"])
+            identity.user = user
             identity_changed.send(
                 current_app._get_current_object(),
-                identity=Identity(user["id"])
+                identity=identity
             )
             return user
         except PersonNotFoundException:
@@ -1,6 +1,7 @@
 import sys
 
 from zou.app.utils import events
+from zou.app.services import user_service
 
 from .blueprints.assets import blueprint as assets_blueprint
 from .blueprints.auth import blueprint as auth_blueprint
@@ -9,6 +10,7 @@ from .blueprints.files import blueprint as files_blueprint
 from .blueprints.export import blueprint as export_blueprint
 from .blueprints.source import blueprint as import_blueprint
 from .blueprints.index import blueprint as index_blueprint
+from .blueprints.jobs import blueprint as jobs_blueprint
 from .blueprints.persons import blueprint as persons_blueprint
 from .blueprints.projects import blueprint as projects_blueprint
 from .blueprints.shots import blueprint as shots_blueprint
@@ -41,6 +43,7 @@ def configure_api_routes(app):
     app.register_blueprint(files_blueprint)
     app.register_blueprint(import_blueprint)
     app.register_blueprint(index_blueprint)
+    app.register_blueprint(jobs_blueprint)
     app.register_blueprint(persons_blueprint)
     app.register_blueprint(projects_blueprint)
     app.register_blueprint(shots_blueprint)
@@ -56,6 +59,8 @@ def register_event_handlers(app):
     Load code from event handlers folder. Then it registers in the event manager
     each event handler listed in the __init_.py.
     """
+    user_service.register_todos_cache_handler()
+
     sys.path.insert(0, app.config["EVENT_HANDLERS_FOLDER"])
     try:
         import event_handlers
@@ -1,4 +1,6 @@
-from flask import request
+import json
+
+from flask import Response, request, stream_with_context
 from flask_restful import Resource, reqparse
 from flask_jwt_extended import jwt_required
 
@@ -7,9 +9,14 @@ from zou.app.services import (
     assets_service,
     shots_service,
     breakdown_service,
+    sync_service,
     tasks_service,
     user_service
 )
+from zou.app.services.exception import (
+    WrongDateFormatException,
+    WrongParameterException
+)
 
 
 class AssetResource(Resource):
@@ -52,12 +59,61 @@ class AssetsAndTasksResource(Resource):
         """
         Retrieve all entities that are not shot or sequence.
         Adds project name and asset type name and all related tasks.
+        If a since timestamp is given, only assets changed since then are
+        returned along with deletions.
+
+        With limit (and cursor) parameters, assets are returned page by page.
+        With format=ndjson, assets are streamed, one JSON object per line.
+        These two modes cannot be combined with a since timestamp.
         """
         criterions = query.get_query_criterions_from_request(request)
-        page = query.get_page_from_request(request)
         if not permissions.has_manager_permissions():
             user_service.check_criterions_has_task_related(criterions)
-        return assets_service.all_assets_and_tasks(criterions, page)
+
+        is_paginated = "limit" in request.args or "cursor" in request.args
+        is_streamed = request.args.get("format", None) == "ndjson"
+        if "since" in request.args and (is_paginated or is_streamed):
+            return {
+                "error": "Since cannot be used with pages or streaming."
+            }, 400
+
+        if is_streamed:
+            return self.stream_assets(criterions)
+
+        try:
+            if is_paginated:
+                limit = int(request.args.get("limit", 100))
+                if limit < 1 or limit > 1000:
+                    raise ValueError("Limit must be between 1 and 1000.")
+                return assets_service.get_assets_and_tasks_page(
+                    criterions,
+                    limit,
+                    request.args.get("cursor", None)
+                )
+
+            since = request.args.get("since", None)
+            if since is None:
+                return assets_service.all_assets_and_tasks(criterions)
+            else:
+                return sync_service.get_delta(
+                    assets_service.all_assets_and_tasks,
+                    criterions,
+                    since
+                )
+        except WrongDateFormatException:
+            return {"error": "Wrong since date format."}, 400
+        except (ValueError, WrongParameterException) as exception:
+            return {"error": str(exception)}, 400
+
+    def stream_assets(self, criterions):
+        def generate():
+            for asset in assets_service.iter_assets_and_tasks(criterions):
+                yield json.dumps(asset) + "\n"
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="application/x-ndjson"
+        )
 
 
 class AssetTypeResource(Resource):
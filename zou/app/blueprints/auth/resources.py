@@ -59,7 +59,10 @@ def on_identity_loaded(sender, identity):
     if identity.id is not None:
         from zou.app.services import persons_service
         try:
-            identity.user = persons_service.get_person(identity.id)
+            user = getattr(identity, "user", None)
+            if user is None or user["id"] != identity.id:
+                user = persons_service.get_person(identity.id)
+            identity.user = user
 
             if hasattr(identity.user, "id"):
                 identity.provides.add(UserNeed(identity.user["id"]))
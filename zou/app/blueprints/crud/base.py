@@ -92,9 +92,19 @@ class BaseModelsResource(Resource):
     def check_read_permissions(self):
         return permissions.check_manager_permissions()
 
+    def add_read_filters(self, query):
+        """
+        Restrict listed entries to the ones the current user can read. By
+        default only managers can list entries, so nothing is filtered.
+        """
+        return query
+
     def check_create_permissions(self, data):
         return permissions.check_manager_permissions()
 
+    def post_creation(self, instance):
+        pass
+
     @jwt_required
     def get(self):
         """
@@ -105,10 +115,10 @@ class BaseModelsResource(Resource):
             self.check_read_permissions()
             query = self.model.query
             if not request.args:
-                return self.all_entries(query)
+                return self.all_entries(self.add_read_filters(query))
             else:
                 options = request.args
-                query = self.apply_filters(options)
+                query = self.add_read_filters(self.apply_filters(options))
                 page = int(options.get("page", "-1"))
                 is_paginated = page > -1
 
@@ -132,6 +142,7 @@ class BaseModelsResource(Resource):
             self.check_create_permissions(data)
             instance = self.model(**data)
             instance.save()
+            self.post_creation(instance)
             return instance.serialize(), 201
 
         except TypeError as exception:
@@ -168,6 +179,12 @@ class BaseModelResource(Resource):
     def check_delete_permissions(self, instance):
         return permissions.check_manager_permissions()
 
+    def post_update(self, previous_instance, instance):
+        pass
+
+    def post_delete(self, instance):
+        pass
+
     def get_arguments(self):
         return request.json
 
@@ -194,9 +211,12 @@ class BaseModelResource(Resource):
         try:
             data = self.get_arguments()
             instance = self.get_model_or_404(instance_id)
-            self.check_update_permissions(instance.serialize(), data)
+            previous_instance = instance.serialize()
+            self.check_update_permissions(previous_instance, data)
             instance.update(data)
-            return instance.serialize(), 200
+            instance_dict = instance.serialize()
+            self.post_update(previous_instance, instance_dict)
+            return instance_dict, 200
 
         except StatementError:
             return {"error": "Wrong id format"}, 400
@@ -222,8 +242,10 @@ class BaseModelResource(Resource):
         instance = self.get_model_or_404(instance_id)
 
         try:
-            self.check_delete_permissions(instance.serialize())
+            instance_dict = instance.serialize()
+            self.check_delete_permissions(instance_dict)
             instance.delete()
+            self.post_delete(instance_dict)
 
         except IntegrityError as exception:
             current_app.logger.error(str(exception))
@@ -1,4 +1,5 @@
 from zou.app.models.comment import Comment
+from zou.app.models.task import Task
 
 from zou.app.services import tasks_service, user_service
 from zou.app.utils import permissions
@@ -11,6 +12,20 @@ class CommentsResource(BaseModelsResource):
     def __init__(self):
         BaseModelsResource.__init__(self, Comment)
 
+    def check_read_permissions(self):
+        return True
+
+    def add_read_filters(self, query):
+        if permissions.has_manager_permissions():
+            return query
+        else:
+            query = query.join(Task, Task.id == Comment.object_id)
+            return user_service.filter_permitted(query, Task.project_id)
+
+    def post_creation(self, instance):
+        if instance.object_type == "Task":
+            tasks_service.set_last_comment(instance)
+
 
 class CommentResource(BaseModelResource):
 
@@ -24,3 +39,7 @@ class CommentResource(BaseModelResource):
             comment = self.get_model_or_404(instance["id"])
             task = tasks_service.get_task(comment.object_id)
             return user_service.check_has_task_related(task["project_id"])
+
+    def post_delete(self, instance):
+        if instance["object_type"] == "Task":
+            tasks_service.reset_last_comments([instance["object_id"]])
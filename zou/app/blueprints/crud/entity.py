@@ -7,6 +7,7 @@ from sqlalchemy.exc import IntegrityError, StatementError
 
 from zou.app.models.entity import Entity
 from zou.app.services import user_service
+from zou.app.utils import permissions
 
 from .base import BaseModelResource, BaseModelsResource
 
@@ -16,6 +17,15 @@ class EntitiesResource(BaseModelsResource):
     def __init__(self):
         BaseModelsResource.__init__(self, Entity)
 
+    def check_read_permissions(self):
+        return True
+
+    def add_read_filters(self, query):
+        if permissions.has_manager_permissions():
+            return query
+        else:
+            return user_service.filter_permitted(query, Entity.project_id)
+
 
 class EntityResource(BaseModelResource):
 
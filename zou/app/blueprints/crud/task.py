@@ -3,7 +3,8 @@ from sqlalchemy.exc import IntegrityError
 
 from zou.app.models.task import Task
 from zou.app.models.person import Person
-from zou.app.services import user_service
+from zou.app.services import tasks_service, user_service
+from zou.app.utils import permissions
 
 from .base import BaseModelsResource, BaseModelResource
 
@@ -13,6 +14,15 @@ class TasksResource(BaseModelsResource):
     def __init__(self):
         BaseModelsResource.__init__(self, Task)
 
+    def check_read_permissions(self):
+        return True
+
+    def add_read_filters(self, query):
+        if permissions.has_manager_permissions():
+            return query
+        else:
+            return user_service.filter_permitted(query, Task.project_id)
+
     def post(self):
         """
         Create a task with data given in the request body. JSON format is
@@ -47,3 +57,9 @@ class TaskResource(BaseModelResource):
 
     def check_read_permissions(self, task):
         user_service.check_project_access(task["project_id"])
+
+    def post_update(self, previous_task, task):
+        tasks_service.emit_status_change(
+            task,
+            previous_task["task_status_id"]
+        )
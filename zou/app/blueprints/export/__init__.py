@@ -3,6 +3,7 @@ This module is named source instead of import because import is a Python
 keyword.
 """
 from flask import Blueprint
+from zou.app.services import jobs_service
 from zou.app.utils.api import configure_api_from_blueprint
 
 from .csv.assets import AssetsCsvExport
@@ -11,6 +12,11 @@ from .csv.shots import ShotsCsvExport
 from .csv.persons import PersonsCsvExport
 from .csv.task_types import TaskTypesCsvExport
 from .csv.tasks import TasksCsvExport
+from .dumps.assets import AssetsDumpExport
+from .dumps.comments import CommentsDumpExport
+from .dumps.shots import ShotsDumpExport
+from .dumps.tasks import TasksDumpExport
+from .dumps.time_spents import TimeSpentsDumpExport
 
 routes = [
     ("/export/csv/projects/<project_id>/assets.csv", AssetsCsvExport),
@@ -18,8 +24,14 @@ routes = [
     ("/export/csv/persons.csv", PersonsCsvExport),
     ("/export/csv/projects.csv", ProjectsCsvExport),
     ("/export/csv/tasks.csv", TasksCsvExport),
-    ("/export/csv/task-types.csv", TaskTypesCsvExport)
+    ("/export/csv/task-types.csv", TaskTypesCsvExport),
+    ("/export/dumps/assets", AssetsDumpExport),
+    ("/export/dumps/comments", CommentsDumpExport),
+    ("/export/dumps/shots", ShotsDumpExport),
+    ("/export/dumps/tasks", TasksDumpExport),
+    ("/export/dumps/time-spents", TimeSpentsDumpExport)
 ]
 
 blueprint = Blueprint("export", "export")
 api = configure_api_from_blueprint(blueprint, routes)
+jobs_service.register_resource_jobs([resource for (_, resource) in routes])
@@ -7,18 +7,21 @@ from zou.app.services import (
     user_service,
     tasks_service
 )
-from zou.app.utils import csv_utils
+from zou.app.blueprints.export.csv.base import CsvExportJobMixin
 
 
-class AssetsCsvExport(Resource):
+class AssetsCsvExport(Resource, CsvExportJobMixin):
 
     @jwt_required
     def get(self, project_id):
+        project = projects_service.get_project(project_id)
+        self.check_permissions(project["id"])
+        return self.send_csv(project_id)
+
+    def build_csv(self, project_id):
         self.task_type_map = tasks_service.get_task_type_map()
         self.task_status_map = tasks_service.get_task_status_map()
-
         project = projects_service.get_project(project_id)
-        self.check_permissions(project["id"])
 
         csv_content = []
         results = self.get_assets_data(project_id)
@@ -30,7 +33,7 @@ class AssetsCsvExport(Resource):
             csv_content.append(self.build_row(result, validation_columns))
 
         file_name = "%s assets" % project["name"]
-        return csv_utils.build_csv_response(csv_content, file_name)
+        return (csv_content, file_name)
 
     def check_permissions(self, project_id):
         user_service.check_project_access(project_id)
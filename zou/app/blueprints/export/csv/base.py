@@ -1,11 +1,49 @@
-from flask import abort
+from flask import abort, request
 from flask_jwt_extended import jwt_required
 
 from zou.app.blueprints.crud.base import BaseModelResource
+from zou.app.services import jobs_service, persons_service
 from zou.app.utils import csv_utils, permissions
 
 
-class BaseCsvExport(BaseModelResource):
+class CsvExportJobMixin(object):
+    """
+    Allow an export to run in a background job (async parameter). Exports
+    using it build their content through build_csv.
+    """
+
+    def is_async(self):
+        return request.args.get("async", "false").lower() == "true"
+
+    def send_csv(self, *args):
+        if self.is_async():
+            job = jobs_service.submit_job(
+                type(self).__name__,
+                {"args": list(args)},
+                person_id=persons_service.get_current_user()["id"]
+            )
+            return jobs_service.serialize_job(job), 202
+        else:
+            (csv_content, file_name) = self.build_csv(*args)
+            return csv_utils.build_csv_response(csv_content, file_name)
+
+    @classmethod
+    def run_job(cls, job):
+        """
+        Write the export in a file attached to given job.
+        """
+        (csv_content, file_name) = cls().build_csv(*job["params"]["args"])
+        file_path = jobs_service.get_job_file_path(job["id"], "csv")
+        csv_utils.write_csv_file(csv_content, file_path)
+        jobs_service.set_result_file(
+            job["id"],
+            file_path,
+            "text/csv",
+            "%s.csv" % csv_utils.build_csv_file_name(file_name)
+        )
+
+
+class BaseCsvExport(BaseModelResource, CsvExportJobMixin):
 
     def __init__(self, model):
         BaseModelResource.__init__(self, model)
@@ -17,12 +55,14 @@ class BaseCsvExport(BaseModelResource):
     def get(self):
         try:
             self.check_permissions()
-            csv_content = []
-            csv_content.append(self.build_headers())
-            results = self.build_query().all()
-            for result in results:
-                csv_content.append(self.build_row(result))
+            return self.send_csv()
         except permissions.PermissionDenied:
             abort(403)
 
-        return csv_utils.build_csv_response(csv_content)
+    def build_csv(self):
+        csv_content = []
+        csv_content.append(self.build_headers())
+        results = self.build_query().all()
+        for result in results:
+            csv_content.append(self.build_row(result))
+        return (csv_content, "export")
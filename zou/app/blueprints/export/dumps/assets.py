@@ -0,0 +1,30 @@
+from zou.app import db
+from zou.app.blueprints.export.dumps.base import BaseDumpExport
+
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
+from zou.app.models.project import Project
+from zou.app.services import assets_service
+
+
+class AssetsDumpExport(BaseDumpExport):
+
+    name = "assets"
+
+    def build_query(self):
+        query = db.session.query(
+            Entity.id,
+            Entity.name,
+            Entity.project_id,
+            Project.name.label("project_name"),
+            Entity.entity_type_id.label("asset_type_id"),
+            EntityType.name.label("asset_type_name"),
+            Entity.description,
+            Entity.canceled,
+            Entity.preview_file_id,
+            Entity.created_at,
+            Entity.updated_at
+        ) \
+            .join(Project, Entity.project_id == Project.id) \
+            .join(EntityType, Entity.entity_type_id == EntityType.id)
+        return assets_service.filter_assets(query)
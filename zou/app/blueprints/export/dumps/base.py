@@ -0,0 +1,63 @@
+from flask import Response, abort, request, stream_with_context
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+
+from zou.app import app
+from zou.app.utils import csv_utils, dump_utils, permissions
+
+
+class BaseDumpExport(Resource):
+    """
+    Stream all rows of a column query, as NDJSON (default) or as a gzip
+    compressed CSV file (format=csv.gz). Rows are fetched by chunks, so the
+    memory used does not depend on the dump size.
+    """
+
+    # Used to build the name of the downloaded file.
+    name = "dump"
+
+    def __init__(self):
+        Resource.__init__(self)
+
+    def check_permissions(self):
+        return permissions.check_admin_permissions()
+
+    @jwt_required
+    def get(self):
+        try:
+            self.check_permissions()
+        except permissions.PermissionDenied:
+            abort(403)
+
+        dump_format = request.args.get("format", "ndjson")
+        chunk_size = app.config["EXPORT_DUMP_CHUNK_SIZE"]
+        query = self.build_query()
+
+        if dump_format == "ndjson":
+            return Response(
+                stream_with_context(
+                    dump_utils.generate_ndjson(query, chunk_size)
+                ),
+                mimetype="application/x-ndjson"
+            )
+        elif dump_format == "csv.gz":
+            response = Response(
+                stream_with_context(
+                    dump_utils.generate_csv_gz(query, chunk_size)
+                ),
+                mimetype="application/gzip"
+            )
+            response.headers["Content-Disposition"] = \
+                "attachment; filename=%s.csv.gz" % \
+                csv_utils.build_csv_file_name(self.name)
+            return response
+        else:
+            return {"error": "Unsupported format: %s" % dump_format}, 400
+
+    def build_query(self):
+        """
+        Return the query listing the dumped columns. Every dump defines it.
+        Columns must be labelled with unique names: they are used as NDJSON
+        keys and as CSV headers.
+        """
+        pass
@@ -0,0 +1,22 @@
+from zou.app import db
+from zou.app.blueprints.export.dumps.base import BaseDumpExport
+
+from zou.app.models.comment import Comment
+
+
+class CommentsDumpExport(BaseDumpExport):
+
+    name = "comments"
+
+    def build_query(self):
+        return db.session.query(
+            Comment.id,
+            Comment.object_id,
+            Comment.object_type,
+            Comment.person_id,
+            Comment.task_status_id,
+            Comment.preview_file_id,
+            Comment.text,
+            Comment.created_at,
+            Comment.updated_at
+        )
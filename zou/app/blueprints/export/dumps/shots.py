@@ -0,0 +1,39 @@
+from sqlalchemy.orm import aliased
+
+from zou.app import db
+from zou.app.blueprints.export.dumps.base import BaseDumpExport
+
+from zou.app.models.entity import Entity
+from zou.app.models.project import Project
+from zou.app.services import shots_service
+
+
+class ShotsDumpExport(BaseDumpExport):
+
+    name = "shots"
+
+    def build_query(self):
+        Sequence = aliased(Entity, name="sequence")
+        Episode = aliased(Entity, name="episode")
+        return db.session.query(
+            Entity.id,
+            Entity.name,
+            Entity.project_id,
+            Project.name.label("project_name"),
+            Episode.name.label("episode_name"),
+            Entity.parent_id.label("sequence_id"),
+            Sequence.name.label("sequence_name"),
+            Entity.description,
+            Entity.data["frame_in"].astext.label("frame_in"),
+            Entity.data["frame_out"].astext.label("frame_out"),
+            Entity.canceled,
+            Entity.preview_file_id,
+            Entity.created_at,
+            Entity.updated_at
+        ) \
+            .join(Project, Entity.project_id == Project.id) \
+            .outerjoin(Sequence, Entity.parent_id == Sequence.id) \
+            .outerjoin(Episode, Sequence.parent_id == Episode.id) \
+            .filter(
+                Entity.entity_type_id == shots_service.get_shot_type()["id"]
+            )
@@ -0,0 +1,56 @@
+from sqlalchemy import Text, cast, func
+
+from zou.app import db
+from zou.app.blueprints.export.dumps.base import BaseDumpExport
+
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
+from zou.app.models.project import Project
+from zou.app.models.task import Task, association_table
+from zou.app.models.task_status import TaskStatus
+from zou.app.models.task_type import TaskType
+
+
+class TasksDumpExport(BaseDumpExport):
+
+    name = "tasks"
+
+    def build_query(self):
+        assignees = db.session.query(
+            func.string_agg(cast(association_table.c.person, Text), ",")
+        ) \
+            .filter(association_table.c.task == Task.id) \
+            .correlate(Task) \
+            .as_scalar() \
+            .label("assignees")
+
+        return db.session.query(
+            Task.id,
+            Task.name,
+            Task.project_id,
+            Project.name.label("project_name"),
+            Task.task_type_id,
+            TaskType.name.label("task_type_name"),
+            Task.task_status_id,
+            TaskStatus.short_name.label("task_status_short_name"),
+            Task.entity_id,
+            Entity.name.label("entity_name"),
+            EntityType.name.label("entity_type_name"),
+            Task.assigner_id,
+            assignees,
+            Task.duration,
+            Task.estimation,
+            Task.completion_rate,
+            Task.start_date,
+            Task.real_start_date,
+            Task.due_date,
+            Task.end_date,
+            Task.last_comment_at,
+            Task.created_at,
+            Task.updated_at
+        ) \
+            .join(Project, Task.project_id == Project.id) \
+            .join(TaskType, Task.task_type_id == TaskType.id) \
+            .join(TaskStatus, Task.task_status_id == TaskStatus.id) \
+            .join(Entity, Task.entity_id == Entity.id) \
+            .join(EntityType, Entity.entity_type_id == EntityType.id)
@@ -0,0 +1,24 @@
+from zou.app import db
+from zou.app.blueprints.export.dumps.base import BaseDumpExport
+
+from zou.app.models.task import Task
+from zou.app.models.time_spent import TimeSpent
+
+
+class TimeSpentsDumpExport(BaseDumpExport):
+
+    name = "time spents"
+
+    def build_query(self):
+        return db.session.query(
+            TimeSpent.id,
+            TimeSpent.date,
+            TimeSpent.duration,
+            TimeSpent.person_id,
+            TimeSpent.task_id,
+            Task.project_id,
+            Task.task_type_id,
+            Task.entity_id,
+            TimeSpent.created_at,
+            TimeSpent.updated_at
+        ).join(Task, TimeSpent.task_id == Task.id)
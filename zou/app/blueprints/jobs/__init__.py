@@ -0,0 +1,12 @@
+from flask import Blueprint
+from zou.app.utils.api import configure_api_from_blueprint
+
+from .resources import JobResource, JobResultResource
+
+routes = [
+    ("/data/jobs/<job_id>", JobResource),
+    ("/data/jobs/<job_id>/result", JobResultResource)
+]
+
+blueprint = Blueprint("jobs", "jobs")
+api = configure_api_from_blueprint(blueprint, routes)
@@ -0,0 +1,56 @@
+import os
+
+from flask import abort, send_file
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+
+from zou.app.services import jobs_service, persons_service
+from zou.app.services.exception import JobNotFoundException
+from zou.app.utils import permissions
+
+
+def get_allowed_job(job_id):
+    """
+    Return given job if current user submitted it or is an admin.
+    """
+    try:
+        job = jobs_service.get_job(job_id)
+    except JobNotFoundException:
+        abort(404)
+
+    is_owner = job["person_id"] == persons_service.get_current_user()["id"]
+    if not is_owner and not permissions.admin_permission.can():
+        abort(403)
+    return job
+
+
+class JobResource(Resource):
+
+    @jwt_required
+    def get(self, job_id):
+        """
+        Return status and progress of given job.
+        """
+        return jobs_service.serialize_job(get_allowed_job(job_id))
+
+
+class JobResultResource(Resource):
+
+    @jwt_required
+    def get(self, job_id):
+        """
+        Return the result of given job once it is done.
+        """
+        job = get_allowed_job(job_id)
+        if job["status"] != "done" or job["result_file"] is None:
+            return {"error": "Job result is not available."}, 404
+
+        if not os.path.exists(job["result_file"]):
+            abort(404)
+
+        return send_file(
+            job["result_file"],
+            mimetype=job["result_mimetype"],
+            as_attachment=job["result_file_name"] is not None,
+            attachment_filename=job["result_file_name"]
+        )
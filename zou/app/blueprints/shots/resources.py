@@ -7,11 +7,15 @@ from zou.app.services import (
     shots_service,
     tasks_service,
     projects_service,
+    sync_service,
     user_service
 )
 from zou.app.utils import query, permissions
 
-from zou.app.services.exception import ShotNotFoundException
+from zou.app.services.exception import (
+    ShotNotFoundException,
+    WrongDateFormatException
+)
 
 
 class ArgsMixin(object):
@@ -169,12 +173,25 @@ class ShotsAndTasksResource(Resource):
     def get(self):
         """
         Retrieve all shots, adds project name and asset type name and all
-        related tasks.
+        related tasks. If a since timestamp is given, only shots changed
+        since then are returned along with deletions.
         """
         criterions = query.get_query_criterions_from_request(request)
         if not permissions.has_manager_permissions():
             user_service.check_criterions_has_task_related(criterions)
-        return shots_service.get_shots_and_tasks(criterions)
+
+        since = request.args.get("since", None)
+        if since is None:
+            return shots_service.get_shots_and_tasks(criterions)
+
+        try:
+            return sync_service.get_delta(
+                shots_service.get_shots_and_tasks,
+                criterions,
+                since
+            )
+        except WrongDateFormatException:
+            return {"error": "Wrong since date format."}, 400
 
 
 class ProjectShotsResource(Resource):
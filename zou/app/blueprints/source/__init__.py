@@ -3,6 +3,7 @@ This module is named source instead of import because import is a Python
 keyword.
 """
 from flask import Blueprint
+from zou.app.services import jobs_service
 from zou.app.utils.api import configure_api_from_blueprint
 
 from .shotgun.project import (
@@ -62,6 +63,7 @@ from .csv.projects import ProjectsCsvImportResource
 from .csv.persons import PersonsCsvImportResource
 from .csv.assets import AssetsCsvImportResource
 from .csv.shots import ShotsCsvImportResource
+from .csv.tasks import TasksCsvImportResource
 
 routes = [
     ("/import/shotgun/persons", ImportShotgunPersonsResource),
@@ -94,8 +96,10 @@ routes = [
     ("/import/csv/projects", ProjectsCsvImportResource),
     ("/import/csv/persons", PersonsCsvImportResource),
     ("/import/csv/projects/<project_id>/assets", AssetsCsvImportResource),
-    ("/import/csv/projects/<project_id>/shots", ShotsCsvImportResource)
+    ("/import/csv/projects/<project_id>/shots", ShotsCsvImportResource),
+    ("/import/csv/tasks", TasksCsvImportResource)
 ]
 
 blueprint = Blueprint("/import", "import")
 api = configure_api_from_blueprint(blueprint, routes)
+jobs_service.register_resource_jobs([resource for (_, resource) in routes])
@@ -8,6 +8,9 @@ from sqlalchemy.exc import IntegrityError
 
 class AssetsCsvImportResource(BaseCsvProjectImportResource):
 
+    required_columns = ["Type", "Name", "Description"]
+    non_empty_columns = ["Type", "Name"]
+
     def prepare_import(self):
         self.entity_types = {}
 
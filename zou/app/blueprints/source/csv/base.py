@@ -1,50 +1,217 @@
-import uuid
 import os
-import csv
 
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
+from werkzeug.datastructures import FileStorage
 
 from zou.app import app
-from zou.app.utils import fields, permissions
+from zou.app.services import jobs_service, persons_service
+from zou.app.utils import csv_utils, fields, permissions
+from zou.app.blueprints.source.csv.exception import (
+    CsvColumnsMissing,
+    CsvLookupFailed
+)
 
 
 class BaseCsvImportResource(Resource):
 
+    # Columns a file must provide to be imported.
+    required_columns = []
+    # Columns that must be filled for each row.
+    non_empty_columns = []
+    # Set when the import runs as a background job.
+    job_id = None
+
     def __init__(self):
         Resource.__init__(self)
 
     @jwt_required
     def post(self):
-        uploaded_file = request.files["file"]
-        file_name = "%s.csv" % uuid.uuid4()
-
-        file_path = os.path.join(app.config["TMP_DIR"], file_name)
-        uploaded_file.save(file_path)
-        result = []
-
+        return self.import_file()
+
+    def import_file(self, *args):
+        """
+        Import the uploaded file. With the dry_run parameter, rows are only
+        checked and the list of errors is returned. With the async parameter,
+        the import runs in a background job and the job is returned.
+        """
         try:
             self.check_permissions()
-            self.prepare_import()
-            with open(file_path) as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    result.append(self.import_row(row))
-
-            return fields.serialize_models(result), 201
-        except KeyError as e:
-            return {"error": "A column is missing: %s" % e}, 400
+            uploaded_file = request.files["file"]
+            if self.is_dry_run():
+                self.prepare_validation()
+                return self.run_validation(uploaded_file, *args), 200
+            elif self.is_async():
+                return self.submit_job(uploaded_file, *args), 202
+            else:
+                self.prepare_import()
+                result = self.run_import(uploaded_file, *args)
+                return fields.serialize_models(result), 201
+        except CsvColumnsMissing as exception:
+            return {"error": "Missing columns: %s" % exception}, 400
+        except CsvLookupFailed as exception:
+            return {
+                "error": "%s Rows of previous batches were imported, use "
+                         "dry_run=true to check the whole file." % exception
+            }, 400
+
+    def is_dry_run(self):
+        return request.args.get("dry_run", "false").lower() == "true"
+
+    def is_async(self):
+        return request.args.get("async", "false").lower() == "true"
+
+    def submit_job(self, uploaded_file, *args):
+        """
+        Save the uploaded file on disk and queue its import.
+        """
+        job_id = jobs_service.new_job_id()
+        file_path = jobs_service.get_job_file_path(job_id, "csv")
+        uploaded_file.save(file_path)
+        job = jobs_service.submit_job(
+            type(self).__name__,
+            {"file_path": file_path, "args": list(args)},
+            person_id=persons_service.get_current_user()["id"],
+            job_id=job_id
+        )
+        return jobs_service.serialize_job(job)
+
+    @classmethod
+    def run_job(cls, job):
+        """
+        Import the file saved for given job. Imported models are the job
+        result.
+        """
+        resource = cls()
+        resource.job_id = job["id"]
+        file_path = job["params"]["file_path"]
+        resource.file_size = os.path.getsize(file_path)
+        try:
+            with open(file_path, "rb") as csv_file:
+                resource.prepare_import()
+                result = resource.run_import(
+                    FileStorage(stream=csv_file),
+                    *job["params"]["args"]
+                )
+        finally:
+            os.remove(file_path)
+        return fields.serialize_models(result)
+
+    def report_progress(self, stream):
+        if self.job_id is not None and self.file_size > 0:
+            jobs_service.set_progress(
+                self.job_id,
+                100.0 * stream.tell() / self.file_size
+            )
+
+    def get_missing_columns(self, reader):
+        return [
+            column for column in self.required_columns
+            if column not in (reader.fieldnames or [])
+        ]
+
+    def run_import(self, uploaded_file, *args):
+        """
+        Read rows from the uploaded file stream and import them by batches.
+        Columns are checked before any batch is written. A row referencing
+        unknown data raises CsvLookupFailed, previous batches being already
+        committed.
+        """
+        result = []
+        reader = csv_utils.build_csv_reader(uploaded_file.stream)
+        missing_columns = self.get_missing_columns(reader)
+        if len(missing_columns) > 0:
+            raise CsvColumnsMissing(", ".join(missing_columns))
+
+        batches = csv_utils.read_batches(
+            reader,
+            app.config["CSV_IMPORT_BATCH_SIZE"]
+        )
+        for rows in batches:
+            result += self.import_rows(rows, *args)
+            self.report_progress(uploaded_file.stream)
+        return result
+
+    def run_validation(self, uploaded_file, *args):
+        """
+        Check every row of the uploaded file without writing anything in the
+        database. Errors are returned with the line where they occur (the
+        header being the first line).
+        """
+        reader = csv_utils.build_csv_reader(uploaded_file.stream)
+        missing_columns = self.get_missing_columns(reader)
+        if len(missing_columns) > 0:
+            return {
+                "valid": False,
+                "nb_rows": 0,
+                "errors": [{
+                    "line": 1,
+                    "error": "Missing columns: %s" % ", ".join(missing_columns)
+                }]
+            }
+
+        nb_rows = 0
+        errors = []
+        batch = []
+        batch_size = app.config["CSV_IMPORT_BATCH_SIZE"]
+        for row in reader:
+            nb_rows += 1
+            batch.append((reader.line_num, row))
+            if len(batch) >= batch_size:
+                errors += self.validate_rows(batch, *args)
+                batch = []
+        if len(batch) > 0:
+            errors += self.validate_rows(batch, *args)
+
+        return {
+            "valid": len(errors) == 0,
+            "nb_rows": nb_rows,
+            "errors": errors
+        }
 
     def prepare_import(self):
         pass
 
+    def prepare_validation(self):
+        """
+        Load data required to check rows. It must not write anything in the
+        database.
+        """
+        self.prepare_import()
+
     def check_permissions(self):
         return permissions.check_manager_permissions()
 
+    def import_rows(self, rows, *args):
+        """
+        Import a batch of rows. By default rows are imported one by one.
+        """
+        return [self.import_row(row, *args) for row in rows]
+
     def import_row(self):
         pass
 
+    def validate_rows(self, numbered_rows, *args):
+        """
+        Check a batch of rows given with their line number.
+        """
+        return [
+            {"line": line, "error": error}
+            for (line, row) in numbered_rows
+            for error in self.validate_row(row, *args)
+        ]
+
+    def validate_row(self, row, *args):
+        """
+        Return error messages for given row. By default it checks that
+        columns expected to be filled are not empty.
+        """
+        return [
+            "%s is empty." % column for column in self.non_empty_columns
+            if len(row[column] or "") == 0
+        ]
+
     def add_to_cache_if_absent(self, cache, retrieve_function, name):
         if name not in cache:
             cache[name] = retrieve_function(name)
@@ -62,24 +229,7 @@ class BaseCsvProjectImportResource(BaseCsvImportResource):
 
     @jwt_required
     def post(self, project_id):
-        uploaded_file = request.files["file"]
-        file_name = "%s.csv" % uuid.uuid4()
-        file_path = os.path.join(app.config["TMP_DIR"], file_name)
-        uploaded_file.save(file_path)
-        result = []
-
-        try:
-            self.check_permissions()
-            self.prepare_import()
-            with open(file_path) as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    result.append(self.import_row(row, project_id))
-
-            return fields.serialize_models(result), 201
-        except KeyError as e:
-            print(e)
-            return {"error": "A column is missing: %s" % e}, 400
+        return self.import_file(project_id)
 
     def import_row(self, project_id):
         pass
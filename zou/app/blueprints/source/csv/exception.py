@@ -0,0 +1,6 @@
+class CsvColumnsMissing(Exception):
+    pass
+
+
+class CsvLookupFailed(Exception):
+    pass
@@ -1,32 +1,51 @@
+from zou.app import db
 from zou.app.blueprints.source.csv.base import BaseCsvImportResource
 
 from zou.app.models.person import Person
 from zou.app.utils import auth, permissions
 
-from sqlalchemy.exc import IntegrityError
-
 
 class PersonsCsvImportResource(BaseCsvImportResource):
 
+    required_columns = ["First Name", "Last Name", "Email", "Phone"]
+    non_empty_columns = ["First Name", "Last Name", "Email"]
+
     def check_permissions(self):
         return permissions.check_admin_permissions()
 
-    def import_row(self, row):
-        first_name = row["First Name"]
-        last_name = row["Last Name"]
-        email = row["Email"]
-        phone = row["Phone"]
-
-        try:
-            password = auth.encrypt_password("default")
-            person = Person.create(
-                email=email,
-                password=password,
-                first_name=first_name,
-                last_name=last_name,
-                phone=phone
-            )
-        except IntegrityError:
-            person = Person.get_by(email=email)
-
-        return person
+    def prepare_validation(self):
+        pass
+
+    def prepare_import(self):
+        # Hashing is slow on purpose, all new people share the same default
+        # password.
+        self.password = auth.encrypt_password("default")
+
+    def import_rows(self, rows):
+        """
+        Create people of given rows that do not exist yet, in a single
+        transaction. People are matched through their email.
+        """
+        emails = [row["Email"] for row in rows]
+        persons = {
+            person.email: person
+            for person in Person.query.filter(Person.email.in_(emails))
+        }
+
+        new_persons = []
+        for row in rows:
+            email = row["Email"]
+            if email not in persons:
+                persons[email] = Person(
+                    email=email,
+                    password=self.password,
+                    first_name=row["First Name"],
+                    last_name=row["Last Name"],
+                    phone=row["Phone"]
+                )
+                new_persons.append(persons[email])
+
+        if len(new_persons) > 0:
+            db.session.add_all(new_persons)
+            Person.commit()
+        return [persons[email] for email in emails]
@@ -8,6 +8,9 @@ from sqlalchemy.exc import IntegrityError
 
 class ProjectsCsvImportResource(BaseCsvImportResource):
 
+    required_columns = ["Name", "Status"]
+    non_empty_columns = ["Name", "Status"]
+
     def prepare_import(self):
         self.project_statuses = {}
 
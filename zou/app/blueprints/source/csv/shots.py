@@ -1,24 +1,29 @@
+from zou.app import db
 from zou.app.blueprints.source.csv.base import BaseCsvProjectImportResource
 
 from zou.app.services import shots_service
 from zou.app.models.entity import Entity
 
-from sqlalchemy.exc import IntegrityError
-
 
 class ShotsCsvImportResource(BaseCsvProjectImportResource):
 
+    required_columns = [
+        "Episode",
+        "Sequence",
+        "Name",
+        "Description",
+        "Frame In",
+        "Frame Out"
+    ]
+    non_empty_columns = ["Sequence", "Name"]
+
     def prepare_import(self):
         self.episodes = {}
         self.sequences = {}
 
-    def import_row(self, row, project_id):
+    def get_sequence_id(self, row, project_id):
         episode_name = row["Episode"]
         sequence_name = row["Sequence"]
-        shot_name = row["Name"]
-        description = row["Description"]
-        frame_in = row["Frame In"]
-        frame_out = row["Frame Out"]
 
         episode_key = "%s-%s" % (project_id, episode_name)
         if episode_key not in self.episodes:
@@ -34,27 +39,45 @@ class ShotsCsvImportResource(BaseCsvProjectImportResource):
                     episode["id"],
                     sequence_name
                 )
-        sequence_id = self.get_id_from_cache(self.sequences, sequence_key)
+        return self.get_id_from_cache(self.sequences, sequence_key)
 
+    def import_rows(self, rows, project_id):
+        """
+        Create shots of given rows that do not exist yet. Existing shots are
+        retrieved with a single query and new ones are saved in a single
+        transaction.
+        """
         shot_type = shots_service.get_shot_type()
-        try:
-            entity = Entity.create(
-                name=shot_name,
-                description=description,
-                project_id=project_id,
-                parent_id=sequence_id,
-                entity_type_id=shot_type["id"],
-                data={
-                    "frame_in": frame_in,
-                    "frame_out": frame_out
-                }
-            )
-        except IntegrityError:
-            entity = Entity.get_by(
-                name=shot_name,
-                project_id=project_id,
-                parent_id=sequence_id,
-                entity_type_id=shot_type["id"]
+        shot_keys = [
+            (str(self.get_sequence_id(row, project_id)), row["Name"])
+            for row in rows
+        ]
+        shots = {
+            (str(shot.parent_id), shot.name): shot
+            for shot in Entity.query.filter(
+                Entity.project_id == project_id,
+                Entity.entity_type_id == shot_type["id"],
+                Entity.name.in_([name for (_, name) in shot_keys])
             )
+        }
+
+        new_shots = []
+        for (row, shot_key) in zip(rows, shot_keys):
+            if shot_key not in shots:
+                shots[shot_key] = Entity(
+                    name=row["Name"],
+                    description=row["Description"],
+                    project_id=project_id,
+                    parent_id=shot_key[0],
+                    entity_type_id=shot_type["id"],
+                    data={
+                        "frame_in": row["Frame In"],
+                        "frame_out": row["Frame Out"]
+                    }
+                )
+                new_shots.append(shots[shot_key])
 
-        return entity
+        if len(new_shots) > 0:
+            db.session.add_all(new_shots)
+            Entity.commit()
+        return [shots[shot_key] for shot_key in shot_keys]
@@ -1,100 +1,238 @@
 import datetime
 
+from sqlalchemy.dialects.postgresql import insert
+
+from zou.app import db
 from zou.app.models.project import Project
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
 from zou.app.models.person import Person
-from zou.app.models.task import Task
+from zou.app.models.task import Task, association_table
 from zou.app.services import shots_service, tasks_service
+from zou.app.utils import fields
 
 from zou.app.blueprints.source.csv.base import BaseCsvImportResource
+from zou.app.blueprints.source.csv.exception import CsvLookupFailed
 
 
 class TasksCsvImportResource(BaseCsvImportResource):
 
+    required_columns = [
+        "Project",
+        "Department",
+        "Task Type",
+        "Episode",
+        "Sequence",
+        "Shot",
+        "Asset Type",
+        "Asset",
+        "Name",
+        "Assigner",
+        "Assignee",
+        "Duration",
+        "Estimation",
+        "Start Date",
+        "Real Start Date",
+        "End Date",
+        "Due Date",
+        "Task Status"
+    ]
+    non_empty_columns = [
+        "Project",
+        "Department",
+        "Task Type",
+        "Name",
+        "Assigner",
+        "Duration",
+        "Estimation",
+        "Task Status"
+    ]
+    date_columns = ["Start Date", "Real Start Date", "End Date", "Due Date"]
+
     def prepare_import(self):
-        self.projects = {}
-        self.sequences = {}
-        self.episodes = {}
-        self.shots = {}
-        self.entity_types = {}
-        self.entities = {}
-        self.persons = {}
+        self.load_lookup_maps()
+        self.episode_type_id = shots_service.get_episode_type()["id"]
+        self.sequence_type_id = shots_service.get_sequence_type()["id"]
+        self.shot_type_id = shots_service.get_shot_type()["id"]
+
+    def prepare_validation(self):
+        self.load_lookup_maps()
+        self.episode_type_id = self.entity_types.get("Episode", None)
+        self.sequence_type_id = self.entity_types.get("Sequence", None)
+        self.shot_type_id = self.entity_types.get("Shot", None)
+
+    def load_lookup_maps(self):
         self.departments = {}
         self.task_types = {}
         self.task_statuses = {}
 
-        for project in Project.query.all():
-            self.projects[project.name] = project
-
-        for person in Person.query.all():
-            self.persons[person.first_name + " " + person.last_name] = person
-
-        for episode in shots_service.get_episodes():
-            self.episodes[
-                str(episode["project_id"]) + episode["name"]
-            ] = episode
-
-        for sequence in shots_service.get_sequences():
-            self.sequences["%s%s%s" % (
-                sequence["project_id"],
-                sequence["parent_id"],
-                sequence["name"]
-            )] = sequence
-
-        for shot in shots_service.get_shots():
-            self.shots["%s%s%s" % (
-                shot["project_id"],
-                shot["parent_id"],
-                shot["name"]
-            )] = shot
-
-        for entity_type in EntityType.query.all():
-            self.entity_types[entity_type.name] = entity_type
-
-        for entity in Entity.query.all():
-            self.entities["%s%s%s" % (
-                entity.project_id,
-                entity.entity_type_id,
-                entity.name
-            )] = entity
+        self.projects = {
+            name: str(project_id)
+            for (name, project_id) in Project.get_id_map(field="name").items()
+        }
+        self.persons = {
+            "%s %s" % (first_name, last_name): person_id
+            for (first_name, last_name, person_id) in db.session.query(
+                Person.first_name,
+                Person.last_name,
+                Person.id
+            )
+        }
+        self.entity_types = {
+            name: str(entity_type_id)
+            for (name, entity_type_id)
+            in EntityType.get_id_map(field="name").items()
+        }
 
     def normalize_date(self, date):
         result = None
-        if len(date) > 0:
+        if len(date or "") > 0:
             result = datetime.datetime.strptime(date, "%Y-%m-%d")
         return result
 
-    def import_row(self, row):
-        project_name = row["Project"]
-        department_name = row["Department"]
-        task_type_name = row["Task Type"]
-        task_status_name = row["Task Status"]
-        entity_type_name = row["Asset Type"]
-        entity_name = row["Asset"]
-        episode_name = row["Episode"]
-        sequence_name = row["Sequence"]
-        shot_name = row["Shot"]
-        name = row["Name"]
-        assigner_name = row["Assigner"]
-        assignee_name = row["Assignee"]
-        duration = int(row["Duration"]) * 3600
-        estimation = int(row["Estimation"]) * 3600
-        start_date = self.normalize_date(row["Start Date"])
-        real_start_date = self.normalize_date(row["Real Start Date"])
-        due_date = self.normalize_date(row["Due Date"])
-        end_date = self.normalize_date(row["End Date"])
+    def import_rows(self, rows):
+        """
+        Import a batch of tasks: entities are resolved for the whole batch
+        with a single query, then tasks are inserted (or updated if they
+        already exist) with a single statement, in one transaction.
+        """
+        entity_maps = self.get_entity_maps(rows)
+        tasks = {}
+        for row in rows:
+            try:
+                data = self.extract_data(row, *entity_maps)
+            except (KeyError, TypeError, ValueError):
+                self.entity_maps = entity_maps
+                errors = self.validate_row(row)
+                raise CsvLookupFailed(
+                    " ".join(errors) or "Task %s is invalid." % row["Name"]
+                )
+            task_key = (
+                data["name"],
+                data["project_id"],
+                data["task_type_id"],
+                data["entity_id"]
+            )
+            tasks[task_key] = data
+
+        try:
+            task_ids = self.save_tasks(list(tasks.values()))
+            Task.commit()
+        except:
+            db.session.rollback()
+            raise
+        return Task.query.filter(Task.id.in_(task_ids)).all()
+
+    def get_entity_maps(self, rows):
+        """
+        Retrieve entities named in given rows. Episodes and assets are indexed
+        by project, type and name. Sequences and shots are indexed by
+        project, type, parent and name.
+        """
+        project_ids = set()
+        names = set()
+        for row in rows:
+            if row["Project"] in self.projects:
+                project_ids.add(self.projects[row["Project"]])
+            names.update([
+                row["Episode"],
+                row["Sequence"],
+                row["Shot"],
+                row["Asset"]
+            ])
+
+        entities = {}
+        children = {}
+        query = db.session.query(
+            Entity.id,
+            Entity.project_id,
+            Entity.entity_type_id,
+            Entity.parent_id,
+            Entity.name
+        ).filter(
+            Entity.project_id.in_(list(project_ids)),
+            Entity.name.in_(list(names))
+        )
+        for (entity_id, project_id, entity_type_id, parent_id, name) in query:
+            entities[(str(project_id), str(entity_type_id), name)] = \
+                str(entity_id)
+            children[(
+                str(project_id),
+                str(entity_type_id),
+                str(parent_id),
+                name
+            )] = str(entity_id)
+        return (entities, children)
+
+    def get_entity_id(self, row, project_id, entities, children):
+        shot_name = row["Shot"] or ""
+        if len(shot_name) > 0:
+            episode_id = entities[
+                (project_id, self.episode_type_id, row["Episode"])
+            ]
+            sequence_id = children[
+                (project_id, self.sequence_type_id, episode_id, row["Sequence"])
+            ]
+            return children[
+                (project_id, self.shot_type_id, sequence_id, shot_name)
+            ]
+        else:
+            entity_type_id = self.entity_types[row["Asset Type"]]
+            return entities[(project_id, entity_type_id, row["Asset"])]
+
+    def validate_rows(self, numbered_rows):
+        self.entity_maps = self.get_entity_maps(
+            [row for (_, row) in numbered_rows]
+        )
+        return BaseCsvImportResource.validate_rows(self, numbered_rows)
 
+    def validate_row(self, row):
+        """
+        Check that referenced project, people and entity exist and that
+        numbers and dates are well formatted. Departments, task types and
+        task statuses are created if they do not exist, so they are not
+        checked. Cells missing from short rows are read as empty.
+        """
+        errors = BaseCsvImportResource.validate_row(self, row)
+        project_name = row["Project"] or ""
+        project_id = self.projects.get(project_name, None)
+        if project_id is None:
+            errors.append("Project %s does not exist." % project_name)
+        else:
+            try:
+                self.get_entity_id(row, project_id, *self.entity_maps)
+            except KeyError:
+                errors.append("Entity %s does not exist." % (
+                    row["Shot"] or row["Asset"] or ""
+                ))
+
+        for column in ["Assigner", "Assignee"]:
+            person_name = row[column] or ""
+            if len(person_name) > 0 and person_name not in self.persons:
+                errors.append("Person %s does not exist." % person_name)
+
+        for column in ["Duration", "Estimation"]:
+            try:
+                int(row[column] or "")
+            except (TypeError, ValueError):
+                errors.append("%s is not an integer." % column)
+
+        for column in self.date_columns:
+            try:
+                self.normalize_date(row[column] or "")
+            except (TypeError, ValueError):
+                errors.append("%s is not a date (YYYY-MM-DD)." % column)
+        return errors
+
+    def get_task_status_id(self, task_status_name):
         self.add_to_cache_if_absent(
             self.task_statuses,
             tasks_service.get_or_create_status,
             task_status_name
         )
-        task_status_id = self.get_id_from_cache(
-            self.task_statuses,
-            task_status_name
-        )
+        return self.get_id_from_cache(self.task_statuses, task_status_name)
 
+    def get_task_type_id(self, department_name, task_type_name):
         self.add_to_cache_if_absent(
             self.departments,
             tasks_service.get_or_create_department,
@@ -113,45 +251,94 @@ class TasksCsvImportResource(BaseCsvImportResource):
                     department,
                     task_type_name
                 )
+        return self.get_id_from_cache(self.task_types, task_type_key)
 
-        task_type_id = self.get_id_from_cache(
-            self.task_types,
-            task_type_key
-        )
-        project_id = self.projects[project_name].id
-        assigner_id = self.persons[assigner_name].id
-        assignee = self.persons.get(assignee_name, None)
+    def extract_data(self, row, entities, children):
+        project_id = self.projects[row["Project"]]
+        assignee_name = row["Assignee"]
+        return {
+            "name": row["Name"],
+            "project_id": project_id,
+            "task_type_id": str(self.get_task_type_id(
+                row["Department"],
+                row["Task Type"]
+            )),
+            "entity_id": self.get_entity_id(
+                row,
+                project_id,
+                entities,
+                children
+            ),
+            "task_status_id": self.get_task_status_id(row["Task Status"]),
+            "assigner_id": self.persons[row["Assigner"]],
+            "assignee_id": self.persons.get(assignee_name, None),
+            "duration": int(row["Duration"]) * 3600,
+            "estimation": int(row["Estimation"]) * 3600,
+            "start_date": self.normalize_date(row["Start Date"]),
+            "real_start_date": self.normalize_date(row["Real Start Date"]),
+            "due_date": self.normalize_date(row["Due Date"]),
+            "end_date": self.normalize_date(row["End Date"])
+        }
 
-        if len(shot_name) > 0:
-            episode_id = self.episodes[str(project_id) + episode_name]["id"]
-            sequence_id = self.sequences[
-                str(project_id) + str(episode_id) + sequence_name
-            ]["id"]
-            entity_id = self.shots[
-                str(project_id) + str(sequence_id) + shot_name
-            ]["id"]
-        else:
-            entity_type_id = self.entity_types[entity_type_name].id
-            entity_id = self.entities[
-                str(project_id) + str(entity_type_id) + entity_name
-            ].id
-
-        task = Task.create(
-            name=name,
-            project_id=project_id,
-            task_type_id=task_type_id,
-            entity_id=entity_id,
-            task_status_id=task_status_id,
-            assigner_id=assigner_id,
-            duration=duration,
-            estimation=estimation,
-            start_date=start_date,
-            end_date=end_date,
-            real_start_date=real_start_date,
-            due_date=due_date
+    def save_tasks(self, tasks):
+        """
+        Insert given tasks or update them if they already exist. People
+        assigned through the CSV file replace current assignees. It returns
+        ids of saved tasks.
+        """
+        now = datetime.datetime.utcnow()
+        assignee_ids = {}
+        rows = []
+        for data in tasks:
+            row = dict(
+                data,
+                id=fields.gen_uuid(),
+                created_at=now,
+                updated_at=now
+            )
+            assignee_ids[(
+                row["name"],
+                row["project_id"],
+                row["task_type_id"],
+                row["entity_id"]
+            )] = row.pop("assignee_id")
+            rows.append(row)
+
+        statement = insert(Task.__table__).values(rows)
+        statement = statement.on_conflict_do_update(
+            constraint="task_uc",
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0].keys()
+                if column not in ["id", "name", "created_at"]
+            }
+        ).returning(
+            Task.id,
+            Task.name,
+            Task.project_id,
+            Task.task_type_id,
+            Task.entity_id
         )
-        if assignee is not None:
-            task.assignees.append(assignee)
-        task.save()
 
-        return task
+        task_ids = []
+        assignations = []
+        for (task_id, name, project_id, task_type_id, entity_id) in \
+                db.session.execute(statement):
+            task_ids.append(task_id)
+            assignee_id = assignee_ids[(
+                name,
+                str(project_id),
+                str(task_type_id),
+                str(entity_id)
+            )]
+            if assignee_id is not None:
+                assignations.append({"task": task_id, "person": assignee_id})
+
+        if len(assignations) > 0:
+            db.session.execute(
+                association_table.delete().where(association_table.c.task.in_(
+                    [assignation["task"] for assignation in assignations]
+                ))
+            )
+            db.session.execute(association_table.insert().values(assignations))
+        return task_ids
@@ -8,7 +8,8 @@ from zou.app.models.entity_type import EntityType
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 
 from zou.app.services import (
@@ -26,11 +27,13 @@ class ImportShotgunAssetsResource(BaseImportShotgunResource):
         BaseImportShotgunResource.__init__(self)
 
     def prepare_import(self):
+        self.project_ids = get_id_map(Project)
+        self.parent_map = {}
+
+    def prepare_batch(self):
         entity_type_names = self.extract_entity_type_names(self.sg_entries)
         assets_service.save_asset_types(entity_type_names)
-        self.project_ids = Project.get_id_map()
         self.entity_type_ids = EntityType.get_id_map(field="name")
-        self.parent_map = {}
 
     def extract_entity_type_names(self, sg_assets):
         return {
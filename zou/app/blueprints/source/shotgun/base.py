@@ -1,52 +1,188 @@
+import datetime
+import json
+import os
+import shutil
+
 from flask import request, abort
 from flask_restful import Resource, current_app
 from flask_jwt_extended import jwt_required
 
-from zou.app.utils import fields, permissions
+from zou.app import app, config, db
+from zou.app.models.person import Person
+from zou.app.models.project import Project
+from zou.app.models.task_status import TaskStatus
+from zou.app.models.task_type import TaskType
+from zou.app.services import jobs_service, persons_service
+from zou.app.utils import cache, fields, permissions
 from zou.app.blueprints.source.shotgun.exception import (
     ShotgunEntryImportFailed
 )
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import object_session
+
+
+# Id maps of reference data (projects, people, task types...) shared by
+# successive imports, e.g. when a sync sends its entries by batches. The
+# cache is disabled unless SHOTGUN_ID_MAP_CACHE_TTL is set. It is cleared
+# when the current process commits a change on cached models. Changes made
+# by other processes are seen once the TTL expires.
+id_maps = cache.TTLCache(max_size=100, ttl=config.SHOTGUN_ID_MAP_CACHE_TTL)
+id_map_models = [Project, Person, TaskType, TaskStatus]
+
+
+def get_id_map(model, field="shotgun_id"):
+    """
+    Return the id map of given model, from the cache if possible.
+    """
+    key = (model.__tablename__, field)
+    id_map = id_maps.get(key)
+    if id_map is None:
+        id_map = model.get_id_map(field=field)
+        id_maps.set(key, id_map)
+    return id_map
+
+
+def on_id_map_model_changed(mapper, connection, instance):
+    session = object_session(instance) or db.session()
+    session.info["has_id_map_changes"] = True
+
+
+for id_map_model in id_map_models:
+    for event_name in ["after_insert", "after_update", "after_delete"]:
+        event.listen(id_map_model, event_name, on_id_map_model_changed)
+
+
+@event.listens_for(db.session, "after_commit")
+def clear_id_maps(session):
+    """
+    Id maps are dropped once changes are committed. Doing it before the
+    commit would let another import cache the old data again.
+    """
+    if session.info.pop("has_id_map_changes", False):
+        id_maps.clear()
+
+
+@event.listens_for(db.session, "after_rollback")
+def drop_id_map_changes(session):
+    session.info.pop("has_id_map_changes", None)
 
 
 class BaseImportShotgunResource(Resource):
 
+    # Model imported through bulk mode. Resources without bulk model only
+    # support the entry by entry import.
+    bulk_model = None
+    bulk_index_elements = ["shotgun_id"]
+    # Set when the import runs as a background job.
+    job_id = None
+
     def __init__(self):
         Resource.__init__(self)
 
     @jwt_required
     def post(self):
-        results = []
-        self.sg_entries = request.json
-
         try:
             self.check_permissions()
-            self.prepare_import()
+            if self.is_async():
+                return self.submit_job(), 202
 
-            for sg_entry in self.filtered_entries():
-                try:
-                    data = self.extract_data(sg_entry)
-                    result_entry = self.import_entry(data)
-                    results.append(result_entry)
-                except ShotgunEntryImportFailed as exception:
-                    current_app.logger.warn(exception)
-                except KeyError as exception:
-                    current_app.logger.warn(exception)
-                    current_app.logger.error(
-                        "Your data is not properly formatted: %s" % sg_entry
-                    )
-                except IntegrityError:
-                    current_app.logger.error(
-                        "Data information are duplicated or wrong: %s" %
-                        sg_entry
-                    )
-
-                self.post_processing()
+            result = self.run_import(
+                request.stream,
+                ndjson=self.is_ndjson_request(),
+                bulk=self.is_bulk_import()
+            )
         except permissions.PermissionDenied:
             abort(403)
 
-        return fields.serialize_models(results), 200
+        return result, 200
+
+    def run_import(self, stream, ndjson=False, bulk=False):
+        """
+        Import entries read from given stream. In NDJSON and bulk modes, it
+        returns a summary of the import, else it returns imported models.
+        """
+        self.stream = stream
+        self.prepare_import()
+        bulk = bulk and self.bulk_model is not None
+        summary = None
+        if ndjson or bulk:
+            summary = {"imported": 0, "failed": 0, "errors": []}
+            if ndjson:
+                batches = self.read_ndjson_batches(stream, summary)
+            else:
+                batches = [self.read_json(stream)]
+            self.import_batches(batches, summary, bulk=bulk)
+        else:
+            self.sg_entries = self.read_json(stream)
+            self.prepare_batch()
+            results = self.import_entries()
+
+        self.post_processing()
+        if summary is not None:
+            return summary
+        else:
+            return fields.serialize_models(results)
+
+    def read_json(self, stream):
+        return json.loads(stream.read().decode("utf-8"))
+
+    def is_async(self):
+        return request.args.get("async", "false").lower() == "true"
+
+    def submit_job(self):
+        """
+        Save the request body on disk and queue its import.
+        """
+        job_id = jobs_service.new_job_id()
+        ndjson = self.is_ndjson_request()
+        file_path = jobs_service.get_job_file_path(
+            job_id,
+            "ndjson" if ndjson else "json"
+        )
+        with open(file_path, "wb") as payload:
+            shutil.copyfileobj(request.stream, payload)
+
+        job = jobs_service.submit_job(
+            type(self).__name__,
+            {
+                "file_path": file_path,
+                "ndjson": ndjson,
+                "bulk": self.is_bulk_import()
+            },
+            person_id=persons_service.get_current_user()["id"],
+            job_id=job_id
+        )
+        return jobs_service.serialize_job(job)
+
+    @classmethod
+    def run_job(cls, job):
+        """
+        Import entries saved for given job. The import result is the job
+        result.
+        """
+        params = job["params"]
+        resource = cls()
+        resource.job_id = job["id"]
+        resource.file_size = os.path.getsize(params["file_path"])
+        try:
+            with open(params["file_path"], "rb") as payload:
+                return resource.run_import(
+                    payload,
+                    ndjson=params["ndjson"],
+                    bulk=params["bulk"]
+                )
+        finally:
+            os.remove(params["file_path"])
+
+    def report_progress(self):
+        if self.job_id is not None and self.file_size > 0:
+            jobs_service.set_progress(
+                self.job_id,
+                100.0 * self.stream.tell() / self.file_size
+            )
 
     def filtered_entries(self):
         return self.sg_entries
@@ -57,6 +193,13 @@ class BaseImportShotgunResource(Resource):
     def prepare_import(self):
         pass
 
+    def prepare_batch(self):
+        """
+        Called each time a new batch of entries is set in sg_entries, before
+        they are imported.
+        """
+        pass
+
     def extract_data(self, sg_entry):
         pass
 
@@ -66,6 +209,232 @@ class BaseImportShotgunResource(Resource):
     def post_processing(self):
         pass
 
+    def is_bulk_import(self):
+        return self.bulk_model is not None and \
+            request.args.get("bulk", "false").lower() == "true"
+
+    def is_ndjson_request(self):
+        return request.mimetype == "application/x-ndjson"
+
+    def import_entries(self, summary=None):
+        """
+        Import entries one by one. It returns imported models. If a summary
+        is given, import results are counted in it.
+        """
+        results = []
+        for sg_entry in self.filtered_entries():
+            try:
+                data = self.extract_data(sg_entry)
+                result_entry = self.import_entry(data)
+                if summary is None:
+                    results.append(result_entry)
+                elif result_entry is not None:
+                    summary["imported"] += 1
+            except ShotgunEntryImportFailed as exception:
+                self.add_error(summary, sg_entry, exception)
+            except KeyError as exception:
+                current_app.logger.warn(exception)
+                current_app.logger.error(
+                    "Your data is not properly formatted: %s" % sg_entry
+                )
+                self.add_error(summary, sg_entry, exception)
+            except IntegrityError as exception:
+                current_app.logger.error(
+                    "Data information are duplicated or wrong: %s" %
+                    sg_entry
+                )
+                self.add_error(summary, sg_entry, exception)
+        return results
+
+    def import_batches(self, batches, summary, bulk=False):
+        """
+        Import given batches of entries and count results in given summary.
+        Entries can be read from a JSON list or from NDJSON (one entry per
+        line). NDJSON is parsed while it is read, so the whole payload is
+        never held in memory. In bulk mode, batches are imported with
+        bulk_import, else entries are imported one by one.
+        """
+        if bulk:
+            summary.update({"created": 0, "updated": 0})
+            self.existing_ids = self.get_existing_ids()
+            self.known_ids = dict(self.existing_ids)
+
+        for batch in batches:
+            self.sg_entries = batch
+            self.prepare_batch()
+            if bulk:
+                self.bulk_import(summary)
+            else:
+                self.import_entries(summary)
+            self.report_progress()
+        return summary
+
+    def read_ndjson_batches(self, stream, summary):
+        batch = []
+        batch_size = app.config["SHOTGUN_IMPORT_CHUNK_SIZE"]
+        for (line_number, line) in enumerate(stream, 1):
+            line = line.strip()
+            if len(line) == 0:
+                continue
+
+            try:
+                entry = json.loads(line.decode("utf-8"))
+                if not isinstance(entry, dict):
+                    raise ValueError("Entry is not a JSON object.")
+                batch.append(entry)
+            except ValueError as exception:
+                self.add_line_error(summary, line_number, exception)
+
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if len(batch) > 0:
+            yield batch
+
+    def bulk_import(self, summary):
+        """
+        Import current entries at once: rows are inserted or updated by
+        chunks with INSERT ... ON CONFLICT DO UPDATE statements, existing
+        rows being known from a single query run before the import. When a
+        chunk fails, its rows are imported one by one, so a wrong row does
+        not prevent the others from being imported.
+        """
+        entries = []
+        for sg_entry in self.filtered_entries():
+            try:
+                entries.append(self.extract_data(sg_entry))
+            except (ShotgunEntryImportFailed, KeyError) as exception:
+                self.add_error(summary, sg_entry, exception)
+
+        chunk_size = app.config["SHOTGUN_IMPORT_CHUNK_SIZE"]
+        for index in range(0, len(entries), chunk_size):
+            chunk = entries[index:index + chunk_size]
+            rows = [self.build_row(data, self.known_ids) for data in chunk]
+            try:
+                with db.session.begin_nested():
+                    ids = self.upsert_rows(rows)
+            except SQLAlchemyError:
+                ids = {}
+                for (data, row) in zip(chunk, rows):
+                    try:
+                        with db.session.begin_nested():
+                            ids.update(self.upsert_rows([row]))
+                    except SQLAlchemyError as exception:
+                        self.add_error(summary, data, exception)
+
+            for data in chunk:
+                if data["shotgun_id"] in ids:
+                    data["id"] = ids[data["shotgun_id"]]
+                    summary["imported"] += 1
+                    if data["shotgun_id"] in self.existing_ids:
+                        summary["updated"] += 1
+                    else:
+                        summary["created"] += 1
+            self.known_ids.update(ids)
+            self.post_bulk_chunk(chunk, ids)
+            db.session.commit()
+
+    def get_existing_query(self):
+        return self.bulk_model.query.filter(
+            self.bulk_model.shotgun_id.isnot(None)
+        )
+
+    def get_existing_ids(self):
+        """
+        Return a map of ids of already imported rows, indexed by Shotgun id.
+        """
+        query = self.get_existing_query() \
+            .with_entities(self.bulk_model.shotgun_id, self.bulk_model.id)
+        return {shotgun_id: entry_id for (shotgun_id, entry_id) in query}
+
+    def build_row(self, data, existing_ids):
+        """
+        Keep only column values from extracted data and set audit fields.
+        Rows already imported keep their id and their creation date.
+        """
+        columns = self.bulk_model.__table__.columns.keys()
+        row = {
+            key: value for (key, value) in data.items()
+            if key in columns
+        }
+        now = datetime.datetime.utcnow()
+        if data["shotgun_id"] in existing_ids:
+            row["id"] = existing_ids[data["shotgun_id"]]
+        else:
+            row["id"] = fields.gen_uuid()
+            row.setdefault("created_at", now)
+        row["updated_at"] = now
+        return row
+
+    def get_update_values(self, statement, columns):
+        return {
+            column: statement.excluded[column] for column in columns
+        }
+
+    def upsert_rows(self, rows):
+        """
+        Insert or update given rows. Rows are grouped by the columns they set
+        because a multi-row INSERT requires the same columns for each row.
+        It returns a map of imported ids indexed by Shotgun id.
+        """
+        table = self.bulk_model.__table__
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+
+        ids = {}
+        for (columns, group_rows) in groups.items():
+            statement = insert(table).values(group_rows)
+            updated_columns = [
+                column for column in columns
+                if column != "id" and column not in self.bulk_index_elements
+            ]
+            statement = statement.on_conflict_do_update(
+                index_elements=self.bulk_index_elements,
+                set_=self.get_update_values(statement, updated_columns)
+            ).returning(table.c.shotgun_id, table.c.id)
+            for (shotgun_id, entry_id) in db.session.execute(statement):
+                ids[shotgun_id] = entry_id
+        return ids
+
+    def post_bulk_chunk(self, entries, ids):
+        """
+        Called after each chunk is imported, to save relations that are not
+        stored in the imported table. Entries have their id set if they were
+        imported successfully.
+        """
+        pass
+
+    def add_error(self, summary, entry, exception):
+        """
+        Log given import failure and report it in given summary.
+        """
+        error = getattr(exception, "orig", exception)
+        shotgun_id = entry.get("shotgun_id", entry.get("id"))
+        current_app.logger.error(
+            "Shotgun entry %s cannot be imported: %s" % (shotgun_id, error)
+        )
+        if summary is not None:
+            summary["failed"] += 1
+            summary["errors"].append({
+                "shotgun_id": shotgun_id,
+                "error": str(error)
+            })
+
+    def add_line_error(self, summary, line_number, exception):
+        """
+        Report in given summary a NDJSON line that cannot be read.
+        """
+        current_app.logger.error(
+            "Line %s cannot be imported: %s" % (line_number, exception)
+        )
+        summary["failed"] += 1
+        summary["errors"].append({
+            "line": line_number,
+            "error": str(exception)
+        })
+
 
 class ImportRemoveShotgunBaseResource(Resource):
 
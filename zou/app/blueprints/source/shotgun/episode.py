@@ -5,7 +5,8 @@ from zou.app.models.entity import Entity
 from zou.app.services import shots_service
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 from zou.app.blueprints.source.shotgun.exception import ShotgunEntryImportFailed
 
@@ -14,7 +15,7 @@ class ImportShotgunEpisodesResource(BaseImportShotgunResource):
 
     def prepare_import(self):
         self.episode_type = shots_service.get_episode_type()
-        self.project_map = Project.get_id_map(field="name")
+        self.project_map = get_id_map(Project, field="name")
 
     def extract_data(self, sg_episode):
         project_id = self.get_project(sg_episode)
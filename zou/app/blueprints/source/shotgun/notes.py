@@ -5,30 +5,33 @@ from flask_restful import current_app
 from zou.app.models.task import Task
 from zou.app.models.comment import Comment
 from zou.app.models.person import Person
+from zou.app.services import tasks_service
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 
 
 class ImportShotgunNotesResource(BaseImportShotgunResource):
 
+    bulk_model = Comment
+
     def prepare_import(self):
-        self.person_ids = Person.get_id_map()
+        self.person_ids = get_id_map(Person)
+        self.task_map = Task.get_id_map()
+        self.task_ids = set()
 
     def filtered_entries(self):
         return (x for x in self.sg_entries if self.is_note_linked_to_task(x))
 
     def is_note_linked_to_task(self, sg_note):
-        if len(sg_note["tasks"]) == 0:
-            return False
-
-        task = Task.get_by(shotgun_id=sg_note["tasks"][0]["id"])
-        return task is not None
+        return len(sg_note["tasks"]) > 0 and \
+            sg_note["tasks"][0]["id"] in self.task_map
 
     def extract_data(self, sg_note):
-        task = Task.get_by(shotgun_id=sg_note["tasks"][0]["id"])
+        task_id = self.task_map[sg_note["tasks"][0]["id"]]
         person_id = self.person_ids.get(sg_note["user"]["id"], None)
         date = datetime.datetime.strptime(
             sg_note["created_at"][:19],
@@ -38,7 +41,7 @@ class ImportShotgunNotesResource(BaseImportShotgunResource):
         return {
             "text": sg_note["content"],
             "shotgun_id": sg_note["id"],
-            "object_id": task.id,
+            "object_id": task_id,
             "object_type": "Task",
             "person_id": person_id,
             "created_at": date
@@ -54,10 +57,30 @@ class ImportShotgunNotesResource(BaseImportShotgunResource):
         else:
             comment.update(data)
             current_app.logger.info("Comment updated: %s" % comment)
+        self.task_ids.add(comment.object_id)
         return comment
 
+    def post_bulk_chunk(self, entries, ids):
+        self.task_ids.update(
+            data["object_id"] for data in entries if "id" in data
+        )
+
+    def post_processing(self):
+        tasks_service.reset_last_comments(list(self.task_ids))
+        self.task_ids = set()
+
 
 class ImportRemoveShotgunNoteResource(ImportRemoveShotgunBaseResource):
 
     def __init__(self):
-        ImportRemoveShotgunBaseResource.__init__(self, Comment)
+        ImportRemoveShotgunBaseResource.__init__(
+            self,
+            Comment,
+            self.delete_func
+        )
+
+    def delete_func(self, comment):
+        comment_dict = comment.serialize()
+        comment.delete()
+        if comment_dict["object_type"] == "Task":
+            tasks_service.reset_last_comments([comment_dict["object_id"]])
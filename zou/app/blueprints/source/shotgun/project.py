@@ -16,7 +16,7 @@ class ImportShotgunProjectsResource(BaseImportShotgunResource):
     def __init__(self):
         BaseImportShotgunResource.__init__(self)
 
-    def prepare_import(self):
+    def prepare_batch(self):
         self.project_status_names = self.extract_status_names(self.sg_entries)
         projects_service.save_project_status(self.project_status_names)
         self.project_status_map = ProjectStatus.get_id_map(field="name")
@@ -7,7 +7,8 @@ from zou.app.services import shots_service
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 
 
@@ -18,7 +19,7 @@ class ImportShotgunScenesResource(BaseImportShotgunResource):
 
     def prepare_import(self):
         self.scene_type = shots_service.get_shot_type()
-        self.project_map = Project.get_id_map(field="name")
+        self.project_map = get_id_map(Project, field="name")
         self.sequence_map = self.get_sequence_map()
 
     def get_sequence_map(self):
@@ -5,7 +5,8 @@ from zou.app.models.entity import Entity
 from zou.app.services import shots_service
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 from zou.app.blueprints.source.shotgun.exception import ShotgunEntryImportFailed
 
@@ -14,7 +15,7 @@ class ImportShotgunSequencesResource(BaseImportShotgunResource):
 
     def prepare_import(self):
         self.sequence_type = shots_service.get_sequence_type()
-        self.project_map = Project.get_id_map(field="name")
+        self.project_map = get_id_map(Project, field="name")
         self.episode_map = self.get_episode_map()
 
     def get_episode_map(self):
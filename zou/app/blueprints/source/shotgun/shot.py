@@ -1,24 +1,33 @@
 from flask_restful import current_app
+from sqlalchemy import cast, func
+from sqlalchemy.dialects.postgresql import JSONB
 
+from zou.app import db
 from zou.app.models.project import Project
-from zou.app.models.entity import Entity
+from zou.app.models.entity import Entity, EntityLink
 
 from zou.app.services import assets_service, shots_service
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 
 
 class ImportShotgunShotsResource(BaseImportShotgunResource):
 
+    # Shotgun ids are not unique among entities, existing shots are matched
+    # through their id.
+    bulk_model = Entity
+    bulk_index_elements = ["id"]
+
     def __init__(self):
         BaseImportShotgunResource.__init__(self)
 
     def prepare_import(self):
         self.shot_type = shots_service.get_shot_type()
-        self.project_map = Project.get_id_map(field="name")
+        self.project_map = get_id_map(Project, field="name")
         self.asset_map = self.get_asset_map()
         self.sequence_map = self.get_sequence_map()
 
@@ -42,7 +51,7 @@ class ImportShotgunShotsResource(BaseImportShotgunResource):
         custom_fields = self.extract_custom_data(sg_shot)
         project_id = self.get_project(sg_shot, self.project_map)
         sequence_id = self.get_sequence(sg_shot, self.sequence_map)
-        assets = self.extract_assets(sg_shot, self.asset_map)
+        asset_ids = self.extract_asset_ids(sg_shot, self.asset_map)
 
         shot_type = shots_service.get_shot_type()
 
@@ -52,7 +61,7 @@ class ImportShotgunShotsResource(BaseImportShotgunResource):
             "project_id": project_id,
             "entity_type_id": shot_type["id"],
             "parent_id": sequence_id,
-            "entities_out": assets
+            "asset_ids": asset_ids
         }
         data_field_content = {
             "frame_in": frame_in,
@@ -81,14 +90,15 @@ class ImportShotgunShotsResource(BaseImportShotgunResource):
             frame_out = sg_shot["sg_cut_in"] + sg_shot["sg_cut_duration"]
         return (frame_in, frame_out)
 
-    def extract_assets(self, sg_shot, asset_map):
-        assets = []
-        if "assets" in sg_shot and len(sg_shot["assets"]) > 0:
-            for sg_asset in sg_shot["assets"]:
-                entity_id = asset_map[sg_asset["id"]]
-                asset = Entity.get(entity_id)
-                assets.append(asset)
-        return assets
+    def extract_asset_ids(self, sg_shot, asset_map):
+        """
+        Return ids of assets cast in given shot. Only ids are needed to
+        save links, so no asset is loaded.
+        """
+        return [
+            asset_map[sg_asset["id"]]
+            for sg_asset in sg_shot.get("assets", None) or []
+        ]
 
     def extract_custom_data(self, sg_shot):
         return {
@@ -105,6 +115,12 @@ class ImportShotgunShotsResource(BaseImportShotgunResource):
         return name[:3] == "sg_" and name not in non_custom_fields
 
     def import_entry(self, data):
+        asset_ids = data.pop("asset_ids")
+        data["entities_out"] = []
+        if len(asset_ids) > 0:
+            data["entities_out"] = \
+                Entity.query.filter(Entity.id.in_(asset_ids)).all()
+
         shot = Entity.get_by(
             shotgun_id=data["shotgun_id"],
             entity_type_id=shots_service.get_shot_type()["id"]
@@ -126,6 +142,45 @@ class ImportShotgunShotsResource(BaseImportShotgunResource):
 
         return shot
 
+    def get_existing_query(self):
+        return BaseImportShotgunResource.get_existing_query(self) \
+            .filter(Entity.entity_type_id == self.shot_type["id"])
+
+    def get_update_values(self, statement, columns):
+        """
+        Custom data are merged with the ones already stored.
+        """
+        values = BaseImportShotgunResource.get_update_values(
+            self,
+            statement,
+            columns
+        )
+        if "data" in values:
+            values["data"] = func.coalesce(
+                Entity.__table__.c.data,
+                cast({}, JSONB)
+            ).op("||")(statement.excluded.data)
+        return values
+
+    def post_bulk_chunk(self, entries, ids):
+        """
+        Replace casting of imported shots.
+        """
+        imported_entries = [data for data in entries if "id" in data]
+        shot_ids = [data["id"] for data in imported_entries]
+        if len(shot_ids) > 0:
+            EntityLink.query \
+                .filter(EntityLink.entity_in_id.in_(shot_ids)) \
+                .delete(synchronize_session=False)
+
+        links = [
+            {"entity_in_id": data["id"], "entity_out_id": asset_id}
+            for data in imported_entries
+            for asset_id in data["asset_ids"]
+        ]
+        if len(links) > 0:
+            db.session.execute(EntityLink.__table__.insert().values(links))
+
 
 class ImportRemoveShotgunShotResource(ImportRemoveShotgunBaseResource):
 
@@ -1,10 +1,13 @@
+import datetime
+
 from flask_restful import current_app
 
+from zou.app import db
 from zou.app.models.task_type import TaskType
 from zou.app.models.task_status import TaskStatus
 from zou.app.models.project import Project
 from zou.app.models.person import Person
-from zou.app.models.task import Task
+from zou.app.models.task import Task, association_table
 
 from zou.app.services import (
     tasks_service,
@@ -14,21 +17,25 @@ from zou.app.services import (
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 
 
 class ImportShotgunTasksResource(BaseImportShotgunResource):
 
+    bulk_model = Task
+
     def prepare_import(self):
-        self.project_ids = Project.get_id_map()
-        self.person_ids = Person.get_id_map()
-        self.task_type_ids = TaskType.get_id_map(field="name")
-        self.task_status_ids = TaskStatus.get_id_map(field="short_name")
+        self.project_ids = get_id_map(Project)
+        self.person_ids = get_id_map(Person)
+        self.task_type_ids = get_id_map(TaskType, field="name")
+        self.task_status_ids = get_id_map(TaskStatus, field="short_name")
         self.asset_ids = self.get_asset_map()
         self.shot_ids = self.get_shot_map()
         self.scene_ids = self.get_scene_map()
         self.sequence_ids = self.get_sequence_map()
+        self.assignations = {}
 
     def get_asset_map(self):
         assets = assets_service.get_assets()
@@ -63,7 +70,7 @@ class ImportShotgunTasksResource(BaseImportShotgunResource):
         assigner_id = self.person_ids.get(sg_task["created_by"]["id"], None)
         project_id = self.project_ids.get(sg_task["project"]["id"], None)
         task_type_id = self.task_type_ids.get(step_name, None)
-        assignees = self.extract_assignees(sg_task, self.person_ids)
+        assignees = self.extract_assignees(sg_task)
 
         return {
             "name": sg_task["cached_display_name"],
@@ -96,16 +103,19 @@ class ImportShotgunTasksResource(BaseImportShotgunResource):
 
         return entity_id
 
-    def extract_assignees(self, sg_task, person_ids):
-        assignees = []
-        if len(sg_task["task_assignees"]) > 0:
-            for sg_person in sg_task["task_assignees"]:
-                person_id = person_ids[sg_person["id"]]
-                person = Person.get(person_id)
-                assignees.append(person)
-        return assignees
+    def extract_assignees(self, sg_task):
+        """
+        Return ids of people assigned to given task. Assignations are not
+        saved through the task relation but written directly, for all
+        imported tasks at once.
+        """
+        return [
+            self.person_ids[sg_person["id"]]
+            for sg_person in sg_task["task_assignees"]
+        ]
 
     def import_entry(self, data):
+        assignees = data.pop("assignees")
         task = Task.get_by(shotgun_id=data["shotgun_id"])
 
         if task is None:
@@ -116,8 +126,46 @@ class ImportShotgunTasksResource(BaseImportShotgunResource):
             task.update(data)
             current_app.logger.info("Task updated: %s" % task)
 
+        self.assignations[task.id] = assignees
         return task
 
+    def post_processing(self):
+        if len(self.assignations) > 0:
+            self.save_assignations(self.assignations)
+            db.session.commit()
+            self.assignations = {}
+
+    def post_bulk_chunk(self, entries, ids):
+        self.save_assignations({
+            data["id"]: data["assignees"] for data in entries if "id" in data
+        })
+
+    def save_assignations(self, assignations):
+        """
+        Replace assignations of given tasks with a single delete and a single
+        insert. Assignations are given as a map of person ids indexed by task
+        id. Tasks are marked as updated.
+        """
+        if len(assignations) > 0:
+            task_ids = list(assignations.keys())
+            db.session.execute(
+                association_table.delete()
+                .where(association_table.c.task.in_(task_ids))
+            )
+            db.session.execute(
+                Task.__table__.update()
+                .where(Task.id.in_(task_ids))
+                .values(updated_at=datetime.datetime.utcnow())
+            )
+
+        rows = [
+            {"task": task_id, "person": person_id}
+            for (task_id, person_ids) in assignations.items()
+            for person_id in person_ids
+        ]
+        if len(rows) > 0:
+            db.session.execute(association_table.insert().values(rows))
+
 
 class ImportRemoveShotgunTaskResource(ImportRemoveShotgunBaseResource):
 
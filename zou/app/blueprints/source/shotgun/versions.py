@@ -8,17 +8,21 @@ from zou.app.services import assets_service, shots_service
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
-    ImportRemoveShotgunBaseResource
+    ImportRemoveShotgunBaseResource,
+    get_id_map
 )
 
 
 class ImportShotgunVersionsResource(BaseImportShotgunResource):
 
+    # In bulk mode, versions are matched on their Shotgun id only.
+    bulk_model = PreviewFile
+
     def __init__(self):
         BaseImportShotgunResource.__init__(self)
 
     def prepare_import(self):
-        self.person_ids = Person.get_id_map()
+        self.person_ids = get_id_map(Person)
         self.task_ids = Task.get_id_map()
         self.asset_ids = self.get_asset_map()
         self.shot_ids = self.get_shot_map()
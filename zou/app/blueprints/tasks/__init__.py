@@ -23,7 +23,8 @@ from .resources import (
 
     GetTimeSpentResource,
     SetTimeSpentResource,
-    AddTimeSpentResource
+    AddTimeSpentResource,
+    TimeSpentAggregatesResource
 )
 
 
@@ -32,6 +33,7 @@ routes = [
     ("/data/tasks/<task_id>/previews", TaskPreviewsResource),
     ("/data/tasks/<task_id>/full", TaskFullResource),
     ("/data/persons/<person_id>/tasks", PersonTasksResource),
+    ("/data/time-spents/aggregates", TimeSpentAggregatesResource),
     (
         "/data/entities/<entity_id>/task-types/<task_type_id>/tasks",
         TaskForEntityResource
@@ -6,7 +6,8 @@ from zou.app.services.exception import (
     TaskNotFoundException,
     PersonNotFoundException,
     MalformedFileTreeException,
-    WrongDateFormatException
+    WrongDateFormatException,
+    WrongParameterException
 )
 from zou.app.services import (
     tasks_service,
@@ -32,7 +33,7 @@ class CommentTaskResource(Resource):
             person_id
         ) = self.get_arguments()
 
-        tasks_service.get_task(task_id)
+        task = tasks_service.get_task(task_id)
         if not permissions.has_manager_permissions():
             user_service.check_assigned(task_id)
         task_status = tasks_service.get_task_status(task_status_id)
@@ -53,7 +54,11 @@ class CommentTaskResource(Resource):
         )
         comment["task_status"] = task_status
         comment["person"] = person
-        events.emit("comment:new", {"id": comment["id"]})
+        events.emit(
+            "comment:new",
+            {"id": comment["id"], "task_id": task_id},
+            project_id=task["project_id"]
+        )
         return comment, 201
 
     def get_arguments(self):
@@ -109,7 +114,7 @@ class AddPreviewResource(Resource):
             "comment_id": comment_id,
             "task_id": task_id,
             "preview": preview
-        })
+        }, project_id=task["project_id"])
 
         return preview, 201
 
@@ -136,7 +141,8 @@ class TaskCommentsResource(Resource):
     @jwt_required
     def get(self, task_id):
         if not permissions.has_manager_permissions():
-            user_service.check_has_task_related(task_id)
+            task = tasks_service.get_task(task_id)
+            user_service.check_has_task_related(task["project_id"])
         return tasks_service.get_comments(task_id)
 
 
@@ -472,7 +478,45 @@ class GetTimeSpentResource(Resource):
         try:
             task = tasks_service.get_task(task_id)
             if not permissions.has_manager_permissions():
-                user_service.check_has_task_related(task.project_id)
+                user_service.check_has_task_related(task["project_id"])
             return tasks_service.get_time_spents(task_id)
         except WrongDateFormatException:
             abort(404)
+
+
+class TimeSpentAggregatesResource(Resource):
+
+    @jwt_required
+    def get(self):
+        """
+        Return time spent durations summed by the database. They are grouped
+        by the fields listed in the group_by parameter (person, task,
+        task_type, project) and by period with the interval parameter (day,
+        week or month). Results can be filtered by person_id, task_id,
+        task_type_id, project_id, start_date and end_date. People without
+        manager rights only get their own time spents.
+        """
+        criterions = {
+            key: request.args[key]
+            for key in ["person_id", "task_id", "task_type_id", "project_id"]
+            if key in request.args
+        }
+        if not permissions.has_manager_permissions():
+            criterions["person_id"] = persons_service.get_current_user()["id"]
+        group_by = [
+            group for group in request.args.get("group_by", "").split(",")
+            if len(group) > 0
+        ]
+
+        try:
+            return tasks_service.get_time_spent_aggregates(
+                group_by=group_by,
+                interval=request.args.get("interval", None),
+                start_date=request.args.get("start_date", None),
+                end_date=request.args.get("end_date", None),
+                criterions=criterions
+            )
+        except WrongDateFormatException:
+            return {"error": "Wrong date format."}, 400
+        except WrongParameterException as exception:
+            return {"error": str(exception)}, 400
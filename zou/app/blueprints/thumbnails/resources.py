@@ -344,7 +344,7 @@ class ShotThumbnailResource(BasePictureResource):
         shot = shots_service.get_shot(shot_id)
         try:
             if not permissions.has_manager_permissions():
-                user_service.check_has_task_related(shot.project_id)
+                user_service.check_has_task_related(shot["project_id"])
             return True
         except permissions.PermissionDenied:
             return False
@@ -371,7 +371,7 @@ class AssetThumbnailResource(BasePictureResource):
         asset = assets_service.get_asset(asset_id)
         try:
             if not permissions.has_manager_permissions():
-                user_service.check_has_task_related(asset.project_id)
+                user_service.check_has_task_related(asset["project_id"])
             return True
         except permissions.PermissionDenied:
             return False
@@ -399,7 +399,7 @@ class WorkingFileThumbnailResource(BasePictureResource):
         task = tasks_service.get_task(working_file["task_id"])
         try:
             if not permissions.has_manager_permissions():
-                user_service.check_has_task_related(task.project_id)
+                user_service.check_has_task_related(task["project_id"])
             return True
         except permissions.PermissionDenied:
             return False
@@ -10,13 +10,35 @@ DEBUG = os.getenv("DEBUG", True)
 SECRET_KEY = os.getenv("SECRET_KEY", "mysecretkey")
 
 AUTH_STRATEGY = os.getenv("AUTH_STRATEGY", "auth_local_classic")
+AUTH_AD_HOST = os.getenv("AUTH_AD_HOST", "localhost")
+AUTH_AD_PORT = int(os.getenv("AUTH_AD_PORT", 389))
+AUTH_AD_SSL = os.getenv("AUTH_AD_SSL", "False").lower() == "true"
+AUTH_AD_DOMAIN = os.getenv("AUTH_AD_DOMAIN", "")
+AUTH_AD_BASE_DN = os.getenv("AUTH_AD_BASE_DN", "CN=Users,DC=domain,DC=local")
+AUTH_AD_POOL_SIZE = int(os.getenv("AUTH_AD_POOL_SIZE", 5))
 
 KEY_VALUE_STORE = {
   "host": os.getenv("KV_HOST", "localhost"),
   "port": os.getenv("KV_PORT", "6379"),
+  "max_connections": int(os.getenv("KV_MAX_CONNECTIONS", 50)),
+  "pool_timeout": float(os.getenv("KV_POOL_TIMEOUT", 5)),
+  "socket_timeout": float(os.getenv("KV_SOCKET_TIMEOUT", 2)),
+  "connect_timeout": float(os.getenv("KV_CONNECT_TIMEOUT", 2)),
+  "retry_attempts": int(os.getenv("KV_RETRY_ATTEMPTS", 3)),
+  "retry_backoff": float(os.getenv("KV_RETRY_BACKOFF", 0.1)),
 }
 AUTH_TOKEN_BLACKLIST_KV_INDEX = 0
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", 30))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+CURRENT_USER_CACHE_TTL = int(os.getenv("CURRENT_USER_CACHE_TTL", 30))
+TODO_CACHE_TTL = int(os.getenv("TODO_CACHE_TTL", 0))
+BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+BCRYPT_POOL_SIZE = int(os.getenv("BCRYPT_POOL_SIZE", 4))
+KV_CACHE_DB_INDEX = 1
 KV_EVENTS_DB_INDEX = 2
+KV_JOBS_DB_INDEX = 3
+EVENT_LOG_KEY = "events:log"
+EVENT_LOG_MAX_LENGTH = int(os.getenv("EVENT_LOG_MAX_LENGTH", 10000))
 
 JWT_BLACKLIST_ENABLED = True
 JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
@@ -42,6 +64,12 @@ SQLALCHEMY_DATABASE_URI = dbhelpers.get_db_uri()
 SQLALCHEMY_TRACK_MODIFICATIONS = True
 
 NB_RECORDS_PER_PAGE = 100
+SHOTGUN_IMPORT_CHUNK_SIZE = int(os.getenv("SHOTGUN_IMPORT_CHUNK_SIZE", 1000))
+CSV_IMPORT_BATCH_SIZE = int(os.getenv("CSV_IMPORT_BATCH_SIZE", 1000))
+EXPORT_DUMP_CHUNK_SIZE = int(os.getenv("EXPORT_DUMP_CHUNK_SIZE", 5000))
+SHOTGUN_ID_MAP_CACHE_TTL = int(os.getenv("SHOTGUN_ID_MAP_CACHE_TTL", 0))
+SYNC_SAFETY_MARGIN = int(os.getenv("SYNC_SAFETY_MARGIN", 60))
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", 30))
 
 DONE_TASK_STATUS = "Done"
 WIP_TASK_STATUS = "WIP"
@@ -58,3 +86,7 @@ EVENT_HANDLERS_FOLDER = os.getenv(
     os.path.join(os.getcwd(), "event_handlers")
 )
 TMP_DIR = os.getenv("TMP_DIR", os.path.join(os.sep, "tmp"))
+JOBS_FOLDER = os.getenv("JOBS_FOLDER", os.path.join(TMP_DIR, "jobs"))
+JOB_TTL = int(os.getenv("JOB_TTL", 7 * 24 * 3600))
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", 24 * 3600))
+JOB_CLEANUP_INTERVAL = int(os.getenv("JOB_CLEANUP_INTERVAL", 3600))
@@ -74,13 +74,22 @@ class BaseMixin(object):
     def get_id_map(cls, field="shotgun_id"):
         """
         Build a map to easily match a field value with an id. It's useful during
-        mass import to build foreign keys.
+        mass import to build foreign keys. Only the two required columns are
+        loaded.
         """
-        entry_map = {}
-        entries = cls.query.all()
-        for entry in entries:
-            entry_map[getattr(entry, field)] = entry.id
-        return entry_map
+        query = db.session.query(getattr(cls, field), cls.id).yield_per(1000)
+        return {value: entry_id for (value, entry_id) in query}
+
+    @classmethod
+    def commit(cls):
+        """
+        Shorthand to commit changes made on instances loaded in the session.
+        """
+        try:
+            db.session.commit()
+        except:
+            db.session.rollback()
+            raise
 
     def save(self):
         """
@@ -7,7 +7,7 @@ from zou.app.models.base import BaseMixin
 
 
 class Comment(db.Model, BaseMixin, SerializerMixin):
-    shotgun_id = db.Column(db.Integer)
+    shotgun_id = db.Column(db.Integer, unique=True)
 
     object_id = db.Column(UUIDType(binary=False), nullable=False)
     object_type = db.Column(db.String(80), nullable=False)
@@ -63,4 +63,5 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
             'parent_id',
             name='entity_uc'
         ),
+        db.Index("entity_updated_at_idx", "updated_at"),
     )
@@ -1,4 +1,7 @@
 import sys
+import slugify
+
+from sqlalchemy import event
 
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
@@ -36,7 +39,7 @@ class Person(db.Model, BaseMixin, SerializerMixin):
     last_presence = db.Column(db.Date())
 
     password = db.Column(db.Binary(60))
-    desktop_login = db.Column(db.String(80))
+    desktop_login = db.Column(db.String(80), index=True)
     shotgun_id = db.Column(db.Integer, unique=True)
     timezone = db.Column(
         TimezoneType(backend="pytz"),
@@ -45,6 +48,7 @@ class Person(db.Model, BaseMixin, SerializerMixin):
     locale = db.Column(LocaleType, default=Locale("en", "US"))
     data = db.Column(JSONB)
     role = db.Column(db.String(30), default="user")
+    slug = db.Column(db.String(170), index=True)
     has_avatar = db.Column(db.Boolean(), default=False)
 
     skills = db.relationship(
@@ -67,7 +71,22 @@ class Person(db.Model, BaseMixin, SerializerMixin):
                 self.last_name
             )
 
+    def build_slug(self):
+        """
+        Build the first.last identifier used to match login usernames.
+        """
+        return "%s.%s" % (
+            slugify.slugify(self.first_name or ""),
+            slugify.slugify(self.last_name or "")
+        )
+
     def serialize_safe(self):
         data = SerializerMixin.serialize(self, "Person")
         del data["password"]
         return data
+
+
+@event.listens_for(Person, "before_insert")
+@event.listens_for(Person, "before_update")
+def set_slug(mapper, connection, person):
+    person.slug = person.build_slug()
@@ -1,3 +1,6 @@
+import datetime
+
+from sqlalchemy import event, inspect
 from sqlalchemy_utils import UUIDType
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
@@ -6,7 +9,12 @@ from zou.app.models.base import BaseMixin
 association_table = db.Table(
     'assignations',
     db.Column('task', UUIDType(binary=False), db.ForeignKey('task.id')),
-    db.Column('person', UUIDType(binary=False), db.ForeignKey('person.id'))
+    db.Column(
+        'person',
+        UUIDType(binary=False),
+        db.ForeignKey('person.id'),
+        index=True
+    )
 )
 
 
@@ -22,7 +30,9 @@ class Task(db.Model, BaseMixin, SerializerMixin):
     end_date = db.Column(db.DateTime)
     due_date = db.Column(db.DateTime)
     real_start_date = db.Column(db.DateTime)
-    shotgun_id = db.Column(db.Integer)
+    shotgun_id = db.Column(db.Integer, unique=True)
+    last_comment_id = db.Column(UUIDType(binary=False))
+    last_comment_at = db.Column(db.DateTime)
 
     project_id = \
         db.Column(UUIDType(binary=False), db.ForeignKey('project.id'))
@@ -48,7 +58,19 @@ class Task(db.Model, BaseMixin, SerializerMixin):
             'entity_id',
             name='task_uc'
         ),
+        db.Index("task_updated_at_idx", "updated_at"),
     )
 
     def assignees_as_string(self):
         return ", ".join([x.full_name() for x in self.assignees])
+
+
+@event.listens_for(Task, "before_update")
+def touch_on_assignation(mapper, connection, task):
+    """
+    Assignations are stored in a separate table, so changing them does not
+    update the task row by itself. Bump updated_at to let synchronizing
+    clients know the task changed.
+    """
+    if inspect(task).attrs.assignees.history.has_changes():
+        task.updated_at = datetime.datetime.utcnow()
@@ -8,8 +8,11 @@ class TimeSpent(db.Model, BaseMixin, SerializerMixin):
     duration = db.Column(db.Integer, nullable=False)
     date = db.Column(db.Date, nullable=False)
 
-    task_id = \
-        db.Column(UUIDType(binary=False), db.ForeignKey('task.id'))
+    task_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey('task.id'),
+        index=True
+    )
     person_id = \
         db.Column(UUIDType(binary=False), db.ForeignKey('person.id'))
 
@@ -20,4 +23,5 @@ class TimeSpent(db.Model, BaseMixin, SerializerMixin):
             'date',
             name='time_spent_uc'
         ),
+        db.Index("time_spent_person_id_date_idx", "person_id", "date"),
     )
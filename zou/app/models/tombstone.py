@@ -0,0 +1,38 @@
+from sqlalchemy import event
+from sqlalchemy_utils import UUIDType
+
+from zou.app import db
+from zou.app.models.serializer import SerializerMixin
+from zou.app.models.base import BaseMixin
+from zou.app.models.entity import Entity
+from zou.app.models.task import Task
+
+
+class Tombstone(db.Model, BaseMixin, SerializerMixin):
+    """
+    Trace left by a deleted entity or task. It tells clients that keep a
+    local copy of the data what was removed since their last
+    synchronization.
+    """
+    object_id = db.Column(UUIDType(binary=False), nullable=False)
+    object_type = db.Column(db.String(80), nullable=False)
+    project_id = db.Column(UUIDType(binary=False), index=True)
+
+    __table_args__ = (
+        db.Index("tombstone_created_at_idx", "created_at"),
+    )
+
+    def __repr__(self):
+        return "<Tombstone of %s %s>" % (self.object_type, self.object_id)
+
+
+def record_deletion(mapper, connection, instance):
+    connection.execute(Tombstone.__table__.insert().values(
+        object_id=instance.id,
+        object_type=type(instance).__name__,
+        project_id=instance.project_id
+    ))
+
+
+event.listen(Entity, "after_delete", record_deletion)
+event.listen(Task, "after_delete", record_deletion)
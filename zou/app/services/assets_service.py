@@ -1,3 +1,8 @@
+import json
+import uuid
+import base64
+
+from sqlalchemy import Text, and_, cast, func, or_
 from sqlalchemy.exc import StatementError, IntegrityError
 
 from zou.app.utils import events, fields
@@ -9,12 +14,13 @@ from zou.app.models.task import Task
 from zou.app.models.asset_instance import AssetInstance
 from zou.app.models.task import association_table as assignees_table
 
-from zou.app.services import shots_service, projects_service
+from zou.app.services import shots_service, projects_service, sync_service
 
 from zou.app.services.exception import (
     AssetNotFoundException,
     AssetInstanceNotFoundException,
-    AssetTypeNotFoundException
+    AssetTypeNotFoundException,
+    WrongParameterException
 )
 
 
@@ -224,11 +230,11 @@ def create_asset(project_id, asset_type_id, name, description):
     )
     asset.save()
     asset_dict = asset.serialize(obj_type="Asset")
-    events.emit("asset:new", {
+    events.emit("asset:new", lambda: {
         "asset": asset_dict,
         "asset_type": asset_type.serialize(obj_type="AssetType"),
         "project": project.serialize()
-    })
+    }, project_id=project_id)
     return asset_dict
 
 
@@ -241,7 +247,7 @@ def remove_asset(asset_id):
     deleted_asset = asset.serialize(obj_type="Asset")
     events.emit("asset:deletion", {
         "deleted_asset": deleted_asset
-    })
+    }, project_id=deleted_asset["project_id"])
     return deleted_asset
 
 
@@ -252,10 +258,10 @@ def add_asset_link(asset_in_id, asset_out_id):
     if asset_out not in asset_in.entities_out:
         asset_in.entities_out.append(asset_out)
         asset_in.save()
-        events.emit("asset:new-link", {
+        events.emit("asset:new-link", lambda: {
             "asset_in": asset_in.serialize(obj_type="Asset"),
             "asset_out": asset_out.serialize(obj_type="Asset")
-        })
+        }, project_id=str(asset_in.project_id))
     return asset_in.serialize(obj_type="Asset")
 
 
@@ -267,10 +273,10 @@ def remove_asset_link(asset_in_id, asset_out_id):
         asset_in.entities_out = \
             [x for x in asset_in.entities_out if x.id != asset_out]
         asset_in.save()
-        events.emit("asset:remove-link", {
+        events.emit("asset:remove-link", lambda: {
             "asset_in": asset_in.serialize(obj_type="Asset"),
             "asset_out": asset_out.serialize(obj_type="Asset")
-        })
+        }, project_id=str(asset_in.project_id))
     return asset_in.serialize(obj_type="Asset")
 
 
@@ -304,80 +310,218 @@ def all_assets(criterions={}):
     return assets
 
 
-def all_assets_and_tasks(criterions={}, page=1):
+def filter_assets(query, criterions={}, since=None):
+    """
+    Restrict given query (which has to involve the entity table) to assets
+    matching given criterions. If a date is given, only assets changed
+    since then or having a task changed since then are kept.
+    """
     shot_type = shots_service.get_shot_type()
     sequence_type = shots_service.get_sequence_type()
     episode_type = shots_service.get_episode_type()
     scene_type = shots_service.get_scene_type()
-    asset_map = {}
-    task_map = {}
-
-    query = Entity.query \
-        .join(EntityType) \
-        .outerjoin(Task) \
-        .outerjoin(assignees_table) \
-        .add_columns(
-            EntityType.name,
+    query = query.filter(
+        ~Entity.entity_type_id.in_([
+            shot_type["id"],
+            scene_type["id"],
+            sequence_type["id"],
+            episode_type["id"]
+        ])
+    )
+
+    if "project_id" in criterions:
+        query = query.filter(Entity.project_id == criterions["project_id"])
+
+    if since is not None:
+        query = query.filter(Entity.id.in_(
+            sync_service.get_changed_entity_ids(
+                since,
+                criterions.get("project_id", None)
+            )
+        ))
+    return query
+
+
+def get_asset_dicts(query):
+    """
+    Run given asset query with only the columns needed for listings and
+    return assets as dicts with an empty task list.
+    """
+    query = query.with_entities(
+        Entity.id,
+        Entity.name,
+        Entity.preview_file_id,
+        Entity.description,
+        EntityType.name,
+        Entity.entity_type_id,
+        Entity.canceled,
+        Entity.data
+    )
+    return [
+        {
+            "id": str(asset_id),
+            "name": name,
+            "preview_file_id": str(preview_file_id or ""),
+            "description": description,
+            "asset_type_name": asset_type_name,
+            "asset_type_id": str(asset_type_id),
+            "canceled": canceled,
+            "data": fields.serialize_value(data),
+            "tasks": []
+        }
+        for (
+            asset_id,
+            name,
+            preview_file_id,
+            description,
+            asset_type_name,
+            asset_type_id,
+            canceled,
+            data
+        ) in query
+    ]
+
+
+def add_asset_tasks(assets, task_query):
+    """
+    Add to given assets their tasks returned by given query. Assignees are
+    aggregated in SQL, so there is one row per task.
+    """
+    asset_map = {asset["id"]: asset for asset in assets}
+    task_query = task_query \
+        .outerjoin(assignees_table, assignees_table.c.task == Task.id) \
+        .group_by(Task.id) \
+        .with_entities(
             Task.id,
+            Task.entity_id,
             Task.task_type_id,
             Task.task_status_id,
-            assignees_table.columns.person
-        ) \
-        .order_by(
-            EntityType.name,
-            Entity.name
-        ) \
-        .filter(
-            ~Entity.entity_type_id.in_([
-                shot_type["id"],
-                scene_type["id"],
-                sequence_type["id"],
-                episode_type["id"]
-            ])
+            func.array_agg(cast(assignees_table.c.person, Text))
         )
 
-    if "project_id" in criterions:
-        query = query.filter(Entity.project_id == criterions["project_id"])
-
     for (
-        asset,
-        entity_type_name,
         task_id,
+        entity_id,
         task_type_id,
         task_status_id,
-        person_id
-    ) in query.all():
-
-        if asset.id not in asset_map:
-            asset_map[asset.id] = {
-                "id": str(asset.id),
-                "name": asset.name,
-                "preview_file_id": str(asset.preview_file_id or ""),
-                "description": asset.description,
-                "asset_type_name": entity_type_name,
-                "asset_type_id": str(asset.entity_type_id),
-                "canceled": asset.canceled,
-                "data": fields.serialize_value(asset.data),
-                "tasks": []
-            }
-
-        if task_id is not None:
-            if task_id not in task_map:
-                task_dict = {
-                    "id": str(task_id),
-                    "entity_id": str(asset.id),
-                    "task_status_id": str(task_status_id),
-                    "task_type_id": str(task_type_id),
-                    "assignees": []
-                }
-                task_map[task_id] = task_dict
-                asset_dict = asset_map[asset.id]
-                asset_dict["tasks"].append(task_dict)
-
-            if person_id:
-                task_map[task_id]["assignees"].append(str(person_id))
-
-    return list(asset_map.values())
+        person_ids
+    ) in task_query:
+        asset_id = str(entity_id)
+        if asset_id in asset_map:
+            asset_map[asset_id]["tasks"].append({
+                "id": str(task_id),
+                "entity_id": asset_id,
+                "task_status_id": str(task_status_id),
+                "task_type_id": str(task_type_id),
+                "assignees": [
+                    str(person_id) for person_id in person_ids or []
+                    if person_id is not None
+                ]
+            })
+    return assets
+
+
+def all_assets_and_tasks(criterions={}, since=None):
+    """
+    Return assets with their tasks and task assignees, sorted by asset type
+    name and asset name.
+    """
+    asset_query = filter_assets(
+        Entity.query.join(EntityType, EntityType.id == Entity.entity_type_id),
+        criterions,
+        since
+    ).order_by(EntityType.name, Entity.name, Entity.id)
+    task_query = filter_assets(
+        Task.query.join(Entity, Entity.id == Task.entity_id),
+        criterions,
+        since
+    )
+    return add_asset_tasks(get_asset_dicts(asset_query), task_query)
+
+
+def encode_asset_cursor(asset):
+    value = json.dumps([asset["asset_type_name"], asset["name"], asset["id"]])
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def decode_asset_cursor(cursor):
+    """
+    Return the sort key (asset type name, asset name, asset id) encoded in
+    given cursor. Every part is checked, so a forged cursor cannot reach the
+    database.
+    """
+    try:
+        value = base64.urlsafe_b64decode(str(cursor)).decode("utf-8")
+        (asset_type_name, name, asset_id) = json.loads(value)
+        if not isinstance(asset_type_name, type(u"")) or \
+           not isinstance(name, type(u"")):
+            raise ValueError("Wrong sort key.")
+        return (asset_type_name, name, str(uuid.UUID(asset_id)))
+    except (AttributeError, TypeError, ValueError):
+        raise WrongParameterException("Wrong cursor.")
+
+
+def get_assets_and_tasks_page(criterions={}, limit=100, cursor=None):
+    """
+    Return a page of assets with their tasks, sorted by asset type name and
+    asset name. Pagination relies on the sort key (keyset pagination): the
+    cursor returned with a page gives access to the next one, without
+    scanning the previous ones.
+    """
+    query = filter_assets(
+        Entity.query.join(EntityType, EntityType.id == Entity.entity_type_id),
+        criterions
+    )
+    if cursor is not None:
+        (asset_type_name, name, asset_id) = decode_asset_cursor(cursor)
+        query = query.filter(or_(
+            EntityType.name > asset_type_name,
+            and_(
+                EntityType.name == asset_type_name,
+                Entity.name > name
+            ),
+            and_(
+                EntityType.name == asset_type_name,
+                Entity.name == name,
+                Entity.id > asset_id
+            )
+        ))
+    query = query \
+        .order_by(EntityType.name, Entity.name, Entity.id) \
+        .limit(limit + 1)
+
+    assets = get_asset_dicts(query)
+    next_cursor = None
+    if len(assets) > limit:
+        assets = assets[:limit]
+        next_cursor = encode_asset_cursor(assets[-1])
+
+    if len(assets) > 0:
+        task_query = Task.query.filter(
+            Task.entity_id.in_([asset["id"] for asset in assets])
+        )
+        add_asset_tasks(assets, task_query)
+
+    return {
+        "data": assets,
+        "limit": limit,
+        "next_cursor": next_cursor
+    }
+
+
+def iter_assets_and_tasks(criterions={}, batch_size=500):
+    """
+    Yield assets with their tasks one by one. They are loaded page by page,
+    so the whole list is never held in memory.
+    """
+    cursor = None
+    while True:
+        page = get_assets_and_tasks_page(criterions, batch_size, cursor)
+        for asset in page["data"]:
+            yield asset
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
 
 
 def cancel_asset(asset_id):
@@ -386,5 +530,5 @@ def cancel_asset(asset_id):
     asset_dict = asset.serialize(obj_type="Asset")
     events.emit("asset:deletion", {
         "deleted_asset": asset_dict
-    })
+    }, project_id=asset_dict["project_id"])
     return asset_dict
@@ -1,13 +1,6 @@
-import flask_bcrypt as bcrypt
-
 from flask_jwt_extended import get_jti
-from ldap3 import (
-    Server,
-    Connection,
-    AUTO_BIND_NO_TLS,
-    SUBTREE,
-    ALL_ATTRIBUTES
-)
+from ldap3.core.exceptions import LDAPBindError, LDAPException
+from ldap3.utils.conv import escape_filter_chars
 
 from zou.app.services import persons_service
 from zou.app.services.exception import (
@@ -18,6 +11,9 @@ from zou.app.services.exception import (
     UnactiveUserException
 )
 from zou.app.stores import auth_tokens_store
+from zou.app.utils import auth, ldap_pool
+
+ldap_pools = {}
 
 
 def check_auth(app, email, password):
@@ -55,7 +51,12 @@ def check_credentials(email, password, app=None):
     try:
         password_hash = person["password"] or u''
 
-        if bcrypt.check_password_hash(password_hash, password):
+        if auth.check_password(password_hash, password):
+            if auth.needs_rehash(password_hash):
+                person = persons_service.update_person(
+                    person["id"],
+                    {"password": auth.encrypt_password(password)}
+                )
             return person
         else:
             if app is not None:
@@ -82,57 +83,84 @@ def local_auth_strategy(email, password, app=None):
     return check_credentials(email, password, app)
 
 
+def get_ldap_pool(app):
+    if ldap_pools.get("pool", None) is None:
+        ldap_pools["pool"] = ldap_pool.LDAPConnectionPool(
+            app.config["AUTH_AD_HOST"],
+            app.config["AUTH_AD_PORT"],
+            use_ssl=app.config["AUTH_AD_SSL"],
+            size=app.config["AUTH_AD_POOL_SIZE"]
+        )
+    return ldap_pools["pool"]
+
+
+def get_person_from_ldap_account(email, account):
+    """
+    Find the person matching given LDAP account: through its email first,
+    then through its account name (desktop login) and finally through the
+    first.last part of given email.
+    """
+    emails = account.get("mail", [])
+    if not isinstance(emails, list):
+        emails = [emails]
+    for account_email in emails + [email]:
+        try:
+            return persons_service.get_by_email(account_email)
+        except PersonNotFoundException:
+            pass
+
+    account_name = account.get("sAMAccountName", None)
+    if account_name:
+        try:
+            return persons_service.get_by_desktop_login(account_name)
+        except PersonNotFoundException:
+            pass
+
+    return persons_service.get_person_by_email_username(email)
+
+
 def active_directory_auth_strategy(email, password, app):
     username = email.split("@")[0]
     domain = app.config["AUTH_AD_DOMAIN"]
     user = "%s\\%s" % (domain, username)
 
-    server_ip = app.config["AUTH_AD_HOST"]
-    server_port = app.config["AUTH_AD_PORT"]
-    server = Server(server_ip, port=server_port, use_ssl=False)
-
     try:
-        with Connection(
-            server,
-            auto_bind=AUTO_BIND_NO_TLS,
-            read_only=True,
-            check_names=True,
-            user=user,
-            password=password,
-            pool_lifetime=3600
-        ) as connection:
-            connection.search(
-                search_base='CN=Users,DC=domain,DC=local',
-                search_filter='(&(samAccountName=%s))' % username,
-                search_scope=SUBTREE,
-                attributes=ALL_ATTRIBUTES,
-                get_operational_attributes=True
-            )
-            return persons_service.get_person_by_email_username(email)
-    except:
+        account = get_ldap_pool(app).search_account(
+            user,
+            password,
+            app.config["AUTH_AD_BASE_DN"],
+            "(&(samAccountName=%s))" % escape_filter_chars(username),
+            ["mail", "sAMAccountName"]
+        )
+    except LDAPBindError:
+        raise WrongPasswordException()
+    except LDAPException:
+        app.logger.error("Active directory is not reachable.")
         raise PersonNotFoundException
 
+    if account is None:
+        raise PersonNotFoundException
+    return get_person_from_ldap_account(email, account)
+
 
 def register_tokens(app, access_token, refresh_token=None):
     access_jti = get_jti(encoded_token=access_token)
-    auth_tokens_store.add(
+    tokens = [(
         access_jti,
         'false',
         app.config["JWT_ACCESS_TOKEN_EXPIRES"]
-    )
+    )]
 
     if refresh_token is not None:
         refresh_jti = get_jti(encoded_token=refresh_token)
-        auth_tokens_store.add(
+        tokens.append((
             refresh_jti,
             'false',
             app.config["JWT_REFRESH_TOKEN_EXPIRES"]
-        )
+        ))
+
+    auth_tokens_store.add_all(tokens)
 
 
 def revoke_tokens(app, jti):
-    auth_tokens_store.add(
-        jti,
-        'true',
-        app.config["JWT_ACCESS_TOKEN_EXPIRES"]
-    )
+    auth_tokens_store.revoke(jti, app.config["JWT_ACCESS_TOKEN_EXPIRES"])
@@ -43,5 +43,5 @@ def update_entity_preview(entity_id, preview_file_id):
     events.emit("preview-file:set-main", {
         "entity_id": entity_id,
         "preview_file_id": preview_file_id
-    })
+    }, project_id=str(entity.project_id))
     return entity.serialize()
@@ -119,3 +119,11 @@ class WrongDateFormatException(Exception):
 
 class EntryAlreadyExistsException(Exception):
     pass
+
+
+class WrongParameterException(Exception):
+    pass
+
+
+class JobNotFoundException(Exception):
+    pass
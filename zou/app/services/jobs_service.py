@@ -0,0 +1,220 @@
+import datetime
+import json
+import os
+import time
+import traceback
+
+from zou.app import app, db
+from zou.app.stores import jobs_store
+from zou.app.utils import fields
+from zou.app.services.exception import JobNotFoundException
+
+
+# Functions running jobs, indexed by job name. They receive the job and
+# return its result (a JSON serializable value) or None when they saved a
+# result file themselves.
+job_functions = {}
+
+
+def register_job(name, function):
+    job_functions[name] = function
+
+
+def register_resource_jobs(resources):
+    """
+    Register as jobs the resources which can run in background (the ones
+    providing a run_job class method). Jobs are named after the resource.
+    """
+    for resource in resources:
+        if hasattr(resource, "run_job"):
+            register_job(resource.__name__, resource.run_job)
+
+
+def get_jobs_folder():
+    folder = app.config["JOBS_FOLDER"]
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    return folder
+
+
+def get_job_file_path(job_id, extension):
+    """
+    Return path of a file (input or result) attached to given job.
+    """
+    return os.path.join(get_jobs_folder(), "%s.%s" % (job_id, extension))
+
+
+def new_job_id():
+    return str(fields.gen_uuid())
+
+
+def submit_job(name, params={}, person_id=None, job_id=None):
+    """
+    Store a new job and add it to the queue. Workers will run it.
+    """
+    job = {
+        "id": job_id or new_job_id(),
+        "name": name,
+        "params": params,
+        "person_id": person_id,
+        "status": "queued",
+        "progress": 0,
+        "error": None,
+        "result_file": None,
+        "result_mimetype": None,
+        "result_file_name": None,
+        "created_at": datetime.datetime.utcnow().isoformat(),
+        "started_at": None,
+        "ended_at": None
+    }
+    jobs_store.save(job)
+    jobs_store.push(job["id"])
+    return job
+
+
+def get_job(job_id):
+    job = jobs_store.get(job_id)
+    if job is None:
+        raise JobNotFoundException
+    return job
+
+
+def serialize_job(job):
+    """
+    Return job fields that can be shown to the user.
+    """
+    return {
+        key: value for (key, value) in job.items()
+        if key not in ["params", "result_file"]
+    }
+
+
+def update_job(job_id, data):
+    job = get_job(job_id)
+    job.update(data)
+    jobs_store.save(job)
+    return job
+
+
+def set_progress(job_id, progress):
+    """
+    Set progress of given job, as a percentage.
+    """
+    return update_job(job_id, {"progress": min(int(progress), 100)})
+
+
+def set_result_file(job_id, file_path, mimetype, file_name):
+    """
+    Attach to given job the file where its result is stored.
+    """
+    return update_job(job_id, {
+        "result_file": file_path,
+        "result_mimetype": mimetype,
+        "result_file_name": file_name
+    })
+
+
+def run_job(job_id):
+    """
+    Run given job and store its result on disk. Failures are stored in the
+    job status. Jobs run inside an application context because the code
+    they call (importers, exports) relies on current_app.
+    """
+    job = update_job(job_id, {
+        "status": "running",
+        "started_at": datetime.datetime.utcnow().isoformat()
+    })
+    jobs_store.add_running(job_id)
+    with app.app_context():
+        try:
+            result = job_functions[job["name"]](job)
+            if result is not None:
+                result_path = get_job_file_path(job_id, "json")
+                with open(result_path, "w") as result_file:
+                    json.dump(result, result_file)
+                set_result_file(job_id, result_path, "application/json", None)
+            status = {"status": "done", "progress": 100}
+        except Exception as exception:
+            app.logger.error(traceback.format_exc())
+            db.session.rollback()
+            status = {"status": "failed", "error": str(exception)}
+        finally:
+            db.session.remove()
+
+    status["ended_at"] = datetime.datetime.utcnow().isoformat()
+    job = update_job(job_id, status)
+    jobs_store.remove_running(job_id)
+    return job
+
+
+def fail_stale_jobs():
+    """
+    Mark as failed the jobs running for more than JOB_TIMEOUT seconds. They
+    were most likely left by a worker that died. It returns the number of
+    failed jobs.
+    """
+    limit = datetime.datetime.utcnow() - \
+        datetime.timedelta(seconds=app.config["JOB_TIMEOUT"])
+    count = 0
+    for job_id in jobs_store.get_running_ids():
+        job = jobs_store.get(job_id)
+        if job is None or job["status"] != "running":
+            jobs_store.remove_running(job_id)
+        elif job["started_at"] < limit.isoformat():
+            update_job(job_id, {
+                "status": "failed",
+                "error": "Job timed out.",
+                "ended_at": datetime.datetime.utcnow().isoformat()
+            })
+            jobs_store.remove_running(job_id)
+            count += 1
+    return count
+
+
+def clean_job_files():
+    """
+    Remove input and result files older than JOB_TTL seconds. Jobs they
+    belong to have expired. It returns the number of removed files.
+    """
+    folder = get_jobs_folder()
+    limit = time.time() - app.config["JOB_TTL"]
+    count = 0
+    for file_name in os.listdir(folder):
+        file_path = os.path.join(folder, file_name)
+        if os.path.isfile(file_path) and os.path.getmtime(file_path) < limit:
+            os.remove(file_path)
+            count += 1
+    return count
+
+
+def clean_jobs():
+    fail_stale_jobs()
+    clean_job_files()
+
+
+def work(burst=False, timeout=5, max_jobs=None):
+    """
+    Run queued jobs one after the other. In burst mode, it stops once the
+    queue is empty. Otherwise it waits for new jobs, forever or until
+    max_jobs jobs were run. Stale jobs and expired files are cleaned every
+    JOB_CLEANUP_INTERVAL seconds.
+    """
+    nb_jobs = 0
+    cleaned_at = None
+    while True:
+        if cleaned_at is None or \
+           time.time() - cleaned_at > app.config["JOB_CLEANUP_INTERVAL"]:
+            clean_jobs()
+            cleaned_at = time.time()
+
+        job_id = jobs_store.pop(0 if burst else timeout)
+        if job_id is not None:
+            try:
+                run_job(job_id)
+            except JobNotFoundException:
+                app.logger.error("Job %s has expired." % job_id)
+            nb_jobs += 1
+            if max_jobs is not None and nb_jobs >= max_jobs:
+                return
+        elif burst:
+            return
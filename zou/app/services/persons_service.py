@@ -1,12 +1,14 @@
-import slugify
-
+from sqlalchemy import event
 from sqlalchemy.exc import StatementError
+from sqlalchemy.orm import object_session
 
-from flask import current_app
+from flask import current_app, g, has_request_context
 from flask_jwt_extended import get_jwt_identity
 
+from zou.app import config, db
 from zou.app.models.person import Person
-from zou.app.utils import fields
+from zou.app.stores import persons_store
+from zou.app.utils import cache, fields
 from zou.app.services.exception import PersonNotFoundException
 
 
@@ -60,16 +62,30 @@ def get_person(person_id):
 
 
 def get_person_by_email_username(email):
-    username = email.split("@")[0]
+    """
+    Return the person whose slugified first and last names match the
+    username part of given email (first.last@domain).
+    """
+    username = email.split("@")[0].lower()
+    person = Person.query \
+        .filter_by(slug=username) \
+        .order_by(Person.active.desc()) \
+        .first()
 
-    for person in all():
-        first_name = slugify.slugify(person["first_name"])
-        last_name = slugify.slugify(person["last_name"])
-        person_username = "%s.%s" % (first_name, last_name)
-        if person_username == username:
-            return person
+    if person is None:
+        raise PersonNotFoundException
+    return person.serialize()
 
-    raise PersonNotFoundException
+
+def reset_slugs():
+    """
+    Compute again the slug of every person (useful for people created
+    before slugs were stored).
+    """
+    for person in Person.query.all():
+        person.slug = person.build_slug()
+    Person.commit()
+    clear_current_user_cache()
 
 
 def get_by_email_raw(email):
@@ -96,12 +112,94 @@ def get_by_desktop_login(desktop_login):
     return person.serialize()
 
 
+# Serialized users, indexed by email. It avoids to query the database for
+# the current user on every request. Every process drops it when a person is
+# changed (changes are broadcast once committed). A user can be served stale
+# only for the time the broadcast takes to arrive. The cache is not used
+# while changes cannot be listened to.
+current_users = cache.TTLCache(
+    max_size=1000,
+    ttl=config.CURRENT_USER_CACHE_TTL
+)
+person_changes_listener = persons_store.new_changes_listener(
+    current_users.clear
+)
+
+
 def get_current_user():
-    return get_by_email(get_jwt_identity())
+    """
+    Return user matching the identity of the current request. It is loaded
+    once per request and kept a short while in a process cache.
+    """
+    email = get_jwt_identity()
+    user = None
+    if has_request_context():
+        user = g.get("current_user", None)
+
+    if user is None or user["email"] != email:
+        use_cache = person_changes_listener.is_running()
+        if use_cache:
+            user = current_users.get(email)
+        if user is None:
+            user = get_by_email(email)
+            if use_cache:
+                current_users.set(email, user)
+        if has_request_context():
+            g.current_user = user
+    return user
 
 
 def get_current_user_raw():
-    return get_by_email_raw(get_jwt_identity())
+    """
+    Return user matching the identity of the current request as a model
+    instance. It is loaded once per request.
+    """
+    user = get_current_user()
+    person = None
+    if has_request_context():
+        person = g.get("current_user_raw", None)
+
+    if person is None or str(person.id) != user["id"]:
+        person = get_person_raw(user["id"])
+        if has_request_context():
+            g.current_user_raw = person
+    return person
+
+
+def clear_current_user_cache():
+    current_users.clear()
+    if has_request_context():
+        g.pop("current_user", None)
+        g.pop("current_user_raw", None)
+
+
+@event.listens_for(Person, "after_insert")
+@event.listens_for(Person, "after_update")
+@event.listens_for(Person, "after_delete")
+def on_person_changed(mapper, connection, person):
+    clear_current_user_cache()
+    session = object_session(person) or db.session()
+    session.info["has_person_changes"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def publish_person_changes(session):
+    """
+    Once changes are committed, other processes are told to drop their
+    cached users. Doing it before the commit would let them cache the old
+    data again.
+    """
+    if session.info.pop("has_person_changes", False):
+        current_users.clear()
+        try:
+            persons_store.publish_changes()
+        except Exception:
+            current_app.logger.error("Person changes cannot be broadcast.")
+
+
+@event.listens_for(db.session, "after_rollback")
+def drop_person_changes(session):
+    session.info.pop("has_person_changes", None)
 
 
 def update_person(person_id, changes):
@@ -1,3 +1,4 @@
+from sqlalchemy import Text, cast, func
 from sqlalchemy.orm import aliased
 from sqlalchemy.exc import IntegrityError, StatementError
 
@@ -9,7 +10,7 @@ from zou.app.models.project import Project
 from zou.app.models.task import Task
 from zou.app.models.task import association_table as assignees_table
 
-from zou.app.services import projects_service
+from zou.app.services import projects_service, sync_service
 from zou.app.services.exception import (
     EpisodeNotFoundException,
     SequenceNotFoundException,
@@ -121,83 +122,115 @@ def get_episode_map(criterions={}):
     return episode_map
 
 
-def get_shots_and_tasks(criterions={}):
+def get_shots_and_tasks(criterions={}, since=None):
+    """
+    Return shots with their tasks and task assignees. Shots and tasks are
+    retrieved with two flat queries (assignees are aggregated in SQL), so
+    no row is loaded twice. If a date is given, only shots changed since
+    then or having a task changed since then are returned.
+    """
     shot_type = get_shot_type()
     shot_map = {}
-    task_map = {}
 
     Sequence = aliased(Entity, name='sequence')
     Episode = aliased(Entity, name='episode')
 
-    query = Entity.query \
+    shot_query = Entity.query \
         .join(Sequence, Sequence.id == Entity.parent_id) \
         .outerjoin(Episode, Episode.id == Sequence.parent_id) \
-        .outerjoin(Task, Task.entity_id == Entity.id) \
-        .outerjoin(assignees_table) \
-        .add_columns(
+        .filter(Entity.entity_type_id == shot_type["id"]) \
+        .with_entities(
+            Entity.id,
+            Entity.name,
+            Entity.description,
+            Entity.data,
+            Entity.preview_file_id,
+            Entity.canceled,
             Episode.name,
             Episode.id,
             Sequence.name,
-            Sequence.id,
+            Sequence.id
+        )
+
+    task_query = Task.query \
+        .join(Entity, Entity.id == Task.entity_id) \
+        .outerjoin(assignees_table, assignees_table.c.task == Task.id) \
+        .filter(Entity.entity_type_id == shot_type["id"]) \
+        .group_by(Task.id) \
+        .with_entities(
             Task.id,
+            Task.entity_id,
             Task.task_type_id,
             Task.task_status_id,
-            assignees_table.columns.person
-        ) \
-        .filter(Entity.entity_type_id == shot_type["id"]) \
+            func.array_agg(cast(assignees_table.c.person, Text))
+        )
 
     if "project_id" in criterions:
-        query = query.filter(Entity.project_id == criterions["project_id"]) \
+        shot_query = shot_query.filter(
+            Entity.project_id == criterions["project_id"]
+        )
+        task_query = task_query.filter(
+            Entity.project_id == criterions["project_id"]
+        )
+
+    if since is not None:
+        changed_entity_ids = sync_service.get_changed_entity_ids(
+            since,
+            criterions.get("project_id", None)
+        )
+        shot_query = shot_query.filter(Entity.id.in_(changed_entity_ids))
+        task_query = task_query.filter(Entity.id.in_(changed_entity_ids))
 
     for (
-        shot,
+        shot_id,
+        shot_name,
+        shot_description,
+        shot_data,
+        shot_preview_file_id,
+        shot_canceled,
         episode_name,
         episode_id,
         sequence_name,
-        sequence_id,
+        sequence_id
+    ) in shot_query:
+        shot_id = str(shot_id)
+        shot_data = shot_data or {}
+        shot_map[shot_id] = {
+            "id": shot_id,
+            "name": shot_name,
+            "description": shot_description,
+            "frame_in": shot_data.get("frame_in", None),
+            "frame_out": shot_data.get("frame_out", None),
+            "fps": shot_data.get("fps", None),
+            "preview_file_id": str(shot_preview_file_id or ""),
+            "episode_id": str(episode_id),
+            "episode_name": episode_name,
+            "sequence_id": str(sequence_id),
+            "sequence_name": sequence_name,
+            "canceled": shot_canceled,
+            "data": fields.serialize_value(shot_data),
+            "tasks": []
+        }
+
+    for (
         task_id,
+        entity_id,
         task_type_id,
         task_status_id,
-        person_id
-    ) in query.all():
-        shot_id = str(shot.id)
-
-        shot.data = shot.data or {}
-
-        if shot_id not in shot_map:
-            shot_map[shot_id] = {
-                "id": str(shot.id),
-                "name": shot.name,
-                "description": shot.description,
-                "frame_in": shot.data.get("frame_in", None),
-                "frame_out": shot.data.get("frame_out", None),
-                "fps": shot.data.get("fps", None),
-                "preview_file_id": str(shot.preview_file_id or ""),
-                "episode_id": str(episode_id),
-                "episode_name": episode_name,
-                "sequence_id": str(sequence_id),
-                "sequence_name": sequence_name,
-                "canceled": shot.canceled,
-                "data": fields.serialize_value(shot.data),
-                "tasks": []
-            }
-
-        if task_id is not None:
-
-            if task_id not in task_map:
-                task_dict = {
-                    "id": str(task_id),
-                    "entity_id": shot_id,
-                    "task_status_id": str(task_status_id),
-                    "task_type_id": str(task_type_id),
-                    "assignees": []
-                }
-                task_map[task_id] = task_dict
-                shot_dict = shot_map[shot_id]
-                shot_dict["tasks"].append(task_dict)
-
-            if person_id:
-                task_map[task_id]["assignees"].append(str(person_id))
+        person_ids
+    ) in task_query:
+        shot_id = str(entity_id)
+        if shot_id in shot_map:
+            shot_map[shot_id]["tasks"].append({
+                "id": str(task_id),
+                "entity_id": shot_id,
+                "task_status_id": str(task_status_id),
+                "task_type_id": str(task_type_id),
+                "assignees": [
+                    str(person_id) for person_id in person_ids or []
+                    if person_id is not None
+                ]
+            })
 
     return list(shot_map.values())
 
@@ -470,7 +503,11 @@ def remove_shot(shot_id):
     except IntegrityError:
         shot.update({"canceled": True})
     deleted_shot = shot.serialize(obj_type="Shot")
-    events.emit("shot:deletion", {"deleted_shot": deleted_shot})
+    events.emit(
+        "shot:deletion",
+        {"deleted_shot": deleted_shot},
+        project_id=deleted_shot["project_id"]
+    )
     return deleted_shot
 
 
@@ -481,7 +518,11 @@ def remove_scene(scene_id):
     except IntegrityError:
         scene.update({"canceled": True})
     deleted_scene = scene.serialize(obj_type="Scene")
-    events.emit("scene:deletion", {"deleted_scene": deleted_scene})
+    events.emit(
+        "scene:deletion",
+        {"deleted_scene": deleted_scene},
+        project_id=deleted_scene["project_id"]
+    )
     return deleted_scene
 
 
@@ -0,0 +1,96 @@
+import datetime
+
+from sqlalchemy import select, union
+
+from zou.app import app, db
+from zou.app.models.entity import Entity
+from zou.app.models.task import Task
+from zou.app.models.tombstone import Tombstone
+
+from zou.app.utils import fields
+from zou.app.services.exception import WrongDateFormatException
+
+
+def parse_since(since):
+    """
+    Convert a synchronization timestamp (ISO format, as returned by delta
+    listings) into a date object.
+    """
+    for date_format in ["%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S"]:
+        try:
+            return fields.get_date_object(since, date_format)
+        except (TypeError, ValueError):
+            pass
+    raise WrongDateFormatException
+
+
+def get_changed_entity_ids(since, project_id=None):
+    """
+    Return a select statement listing IDs of entities modified since given
+    date or having a task modified since then.
+    """
+    entity_query = select([Entity.id]).where(Entity.updated_at > since)
+    task_query = select([Task.entity_id]).where(Task.updated_at > since)
+    if project_id is not None:
+        entity_query = entity_query.where(Entity.project_id == project_id)
+        task_query = task_query.where(Task.project_id == project_id)
+    return union(entity_query, task_query)
+
+
+def get_deletions(since, project_id=None):
+    """
+    Return IDs of entities and tasks deleted since given date.
+    """
+    query = Tombstone.query.filter(Tombstone.created_at > since)
+    if project_id is not None:
+        query = query.filter(Tombstone.project_id == project_id)
+
+    deletions = {"entities": [], "tasks": []}
+    for (object_id, object_type) in query.with_entities(
+        Tombstone.object_id,
+        Tombstone.object_type
+    ):
+        if object_type == "Task":
+            deletions["tasks"].append(str(object_id))
+        else:
+            deletions["entities"].append(str(object_id))
+    return deletions
+
+
+def prune_tombstones(retention_days=None):
+    """
+    Remove tombstones older than the retention period (TOMBSTONE_RETENTION_DAYS
+    setting by default). Clients that did not synchronize during that period
+    must reload their data entirely. It returns the number of removed
+    tombstones.
+    """
+    if retention_days is None:
+        retention_days = app.config["TOMBSTONE_RETENTION_DAYS"]
+    limit = datetime.datetime.utcnow() - \
+        datetime.timedelta(days=retention_days)
+    count = Tombstone.query \
+        .filter(Tombstone.created_at < limit) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def get_delta(get_entries, criterions, since):
+    """
+    Build a delta listing: entries changed since given date, deletions and
+    the timestamp the client has to send for its next synchronization.
+
+    The returned timestamp is taken before reading data and moved back by
+    SYNC_SAFETY_MARGIN seconds, so changes committed by transactions still
+    running during the reads are not missed. Because of that margin, an entry
+    or a deletion can be listed again in the next delta: clients must apply
+    deltas idempotently.
+    """
+    timestamp = datetime.datetime.utcnow() - \
+        datetime.timedelta(seconds=app.config["SYNC_SAFETY_MARGIN"])
+    since = parse_since(since)
+    return {
+        "data": get_entries(criterions, since=since),
+        "deleted": get_deletions(since, criterions.get("project_id", None)),
+        "timestamp": fields.serialize_value(timestamp)
+    }
@@ -1,14 +1,15 @@
 import datetime
 
+from sqlalchemy import func
 from sqlalchemy.exc import StatementError, IntegrityError, DataError
 from sqlalchemy.orm import aliased
 
-from zou.app import app
+from zou.app import app, db
 from zou.app.utils import events
 
 from zou.app.models.comment import Comment
 from zou.app.models.person import Person
-from zou.app.models.task import Task
+from zou.app.models.task import Task, association_table
 from zou.app.models.task_type import TaskType
 from zou.app.models.department import Department
 from zou.app.models.entity import Entity
@@ -26,7 +27,8 @@ from zou.app.services.exception import (
     TaskStatusNotFoundException,
     TaskTypeNotFoundException,
     DepartmentNotFoundException,
-    WrongDateFormatException
+    WrongDateFormatException,
+    WrongParameterException
 )
 
 from zou.app.services import (
@@ -71,7 +73,9 @@ def start_task(task_id):
         or task.task_status_id != wip_status["id"]
 
     if task_is_not_already_wip:
-        task_dict_before = task.serialize()
+        task_dict_before = None
+        if events.has_listeners("task:start"):
+            task_dict_before = task.serialize()
 
         new_data = {"task_status_id": wip_status["id"]}
         if task.real_start_date is None:
@@ -83,7 +87,8 @@ def start_task(task_id):
         events.emit("task:start", {
             "task_before": task_dict_before,
             "task_after": task_dict_after
-        })
+        }, project_id=task_dict_after["project_id"])
+        return task_dict_after
 
     return task.serialize()
 
@@ -91,7 +96,9 @@ def start_task(task_id):
 def task_to_review(task_id, person, comment, preview_path=""):
     task = get_task_raw(task_id)
     to_review_status = get_to_review_status()
-    task_dict_before = task.serialize()
+    task_dict_before = None
+    if events.has_listeners("task:to-review"):
+        task_dict_before = task.serialize()
 
     task.update({"task_status_id": to_review_status["id"]})
     task.save()
@@ -111,7 +118,7 @@ def task_to_review(task_id, person, comment, preview_path=""):
     events.emit("task:to-review", {
         "task_before": task_dict_before,
         "task_after": task_dict_after
-    })
+    }, project_id=str(task.project_id))
 
     return task_dict_after
 
@@ -190,8 +197,24 @@ def create_task(task_type, entity, name="main"):
 
 def update_task(task_id, data):
     task = Task.get(task_id)
+    previous_task_status_id = fields.serialize_value(task.task_status_id)
     task.update(data)
-    return task.serialize()
+    task_dict = task.serialize()
+    emit_status_change(task_dict, previous_task_status_id)
+    return task_dict
+
+
+def emit_status_change(task_dict, previous_task_status_id):
+    """
+    Emit the status changed event if the status of given task is not the
+    previous one anymore.
+    """
+    if task_dict["task_status_id"] != previous_task_status_id:
+        events.emit("task:status-changed", {
+            "task_id": task_dict["id"],
+            "new_task_status_id": task_dict["task_status_id"],
+            "previous_task_status_id": previous_task_status_id
+        }, project_id=task_dict["project_id"])
 
 
 def delete_task(task_id):
@@ -208,14 +231,16 @@ def remove_task(task_id):
 
 def clear_assignation(task_id):
     task = get_task_raw(task_id)
-    assignees = [person.serialize() for person in task.assignees]
+    assignees = []
+    if events.has_listeners("task:unassign"):
+        assignees = [person.serialize() for person in task.assignees]
     task.update({"assignees": []})
     task_dict = task.serialize()
     for assignee in assignees:
         events.emit("task:unassign", {
             "person": assignee,
             "task": task_dict
-        })
+        }, project_id=task_dict["project_id"])
     return task_dict
 
 
@@ -225,10 +250,10 @@ def assign_task(task_id, person_id):
     task.assignees.append(person)
     task.save()
     task_dict = task.serialize()
-    events.emit("task:assign", {
+    events.emit("task:assign", lambda: {
         "task": task_dict,
         "person": person.serialize()
-    })
+    }, project_id=task_dict["project_id"])
     return task_dict
 
 
@@ -425,14 +450,98 @@ def create_or_update_time_spent(task_id, person_id, date, duration, add=False):
 
 
 def get_time_spents(task_id):
+    """
+    Return time spents of given task indexed by person ID. The total is
+    computed by the database along with the rows.
+    """
     result = {"total": 0}
-    time_spents = TimeSpent.query.filter_by(task_id=task_id).all()
-    for time_spent in time_spents:
+    query = db.session.query(
+        TimeSpent,
+        func.sum(TimeSpent.duration).over()
+    ).filter(TimeSpent.task_id == task_id)
+    for (time_spent, total) in query.all():
         result[str(time_spent.person_id)] = time_spent.serialize()
-        result["total"] += time_spent.duration
+        result["total"] = int(total)
     return result
 
 
+def get_time_spent_aggregates(
+    group_by=[],
+    interval=None,
+    start_date=None,
+    end_date=None,
+    criterions={}
+):
+    """
+    Return time spent durations summed by the database for each group. Time
+    spents can be grouped by person, task, task_type and project and, with an
+    interval (day, week or month), by period. Criterions filter on the same
+    fields (person_id, task_id, task_type_id, project_id). Dates are
+    included bounds.
+    """
+    group_columns = {
+        "person": TimeSpent.person_id,
+        "task": TimeSpent.task_id,
+        "task_type": Task.task_type_id,
+        "project": Task.project_id
+    }
+    columns = []
+    for group in group_by:
+        if group not in group_columns:
+            raise WrongParameterException("Wrong group: %s." % group)
+        columns.append(group_columns[group])
+
+    if interval is not None:
+        if interval not in ["day", "week", "month"]:
+            raise WrongParameterException("Wrong interval: %s." % interval)
+        columns.append(
+            db.cast(func.date_trunc(interval, TimeSpent.date), db.Date)
+            .label("date")
+        )
+
+    query = db.session.query(
+        *(columns + [func.sum(TimeSpent.duration).label("duration")])
+    ).select_from(TimeSpent)
+
+    filter_columns = {
+        "%s_id" % group: column for (group, column) in group_columns.items()
+    }
+    needs_task = any(group in ["task_type", "project"] for group in group_by)
+    for (key, value) in criterions.items():
+        if key not in filter_columns:
+            raise WrongParameterException("Wrong filter: %s." % key)
+        query = query.filter(filter_columns[key] == value)
+        needs_task = needs_task or key in ["task_type_id", "project_id"]
+
+    if needs_task:
+        query = query.join(Task, TimeSpent.task_id == Task.id)
+
+    try:
+        if start_date is not None:
+            query = query.filter(
+                TimeSpent.date >= fields.get_date_object(start_date)
+            )
+        if end_date is not None:
+            query = query.filter(
+                TimeSpent.date <= fields.get_date_object(end_date)
+            )
+    except ValueError:
+        raise WrongDateFormatException
+
+    if len(columns) > 0:
+        query = query.group_by(*columns).order_by(*columns)
+
+    try:
+        results = query.all()
+    except StatementError:
+        raise WrongParameterException("Wrong filter value.")
+
+    return [
+        fields.serialize_dict(dict(zip(result.keys(), result)))
+        for result in results
+    ]
+
+
 def get_comments(task_id):
     comments = []
 
@@ -520,9 +629,61 @@ def create_comment(
         person_id=person_id,
         text=text
     )
+    if object_type == "Task":
+        set_last_comment(comment)
     return comment.serialize()
 
 
+def set_last_comment(comment):
+    """
+    Make given comment the last comment of its task, unless the task already
+    has a more recent one.
+    """
+    task = Task.get(comment.object_id)
+    if task is not None and (
+        task.last_comment_at is None or
+        task.last_comment_at <= comment.created_at
+    ):
+        task.update({
+            "last_comment_id": comment.id,
+            "last_comment_at": comment.created_at
+        })
+
+
+def reset_last_comments(task_ids=None):
+    """
+    Compute again the last comment of given tasks. If no task ID is given,
+    every task is processed.
+    """
+    query = Task.query
+    if task_ids is not None:
+        if len(task_ids) == 0:
+            return
+        query = query.filter(Task.id.in_(task_ids))
+    query.update({
+        Task.last_comment_id: None,
+        Task.last_comment_at: None
+    }, synchronize_session=False)
+
+    comments = Comment.query \
+        .filter(Comment.object_type == "Task") \
+        .order_by(Comment.object_id, Comment.created_at.desc()) \
+        .distinct(Comment.object_id) \
+        .with_entities(Comment.object_id, Comment.id, Comment.created_at)
+    if task_ids is not None:
+        comments = comments.filter(Comment.object_id.in_(task_ids))
+
+    db.session.bulk_update_mappings(Task, [
+        {
+            "id": object_id,
+            "last_comment_id": comment_id,
+            "last_comment_at": created_at
+        }
+        for (object_id, comment_id, created_at) in comments
+    ])
+    Task.commit()
+
+
 def get_tasks_for_entity_and_task_type(entity_id, task_type_id):
     tasks = Task.query \
        .filter_by(entity_id=entity_id, task_type_id=task_type_id) \
@@ -545,7 +706,6 @@ def get_task_type_map():
 
 
 def get_person_tasks(person_id, projects):
-    person = Person.get(person_id)
     project_ids = [project["id"] for project in projects]
     done_status = get_done_status()
 
@@ -557,7 +717,9 @@ def get_person_tasks(person_id, projects):
         .join(EntityType, EntityType.id == Entity.entity_type_id) \
         .outerjoin(Sequence, Sequence.id == Entity.parent_id) \
         .outerjoin(Episode, Episode.id == Sequence.parent_id) \
-        .filter(Task.assignees.contains(person)) \
+        .outerjoin(Comment, Comment.id == Task.last_comment_id) \
+        .join(association_table, association_table.c.task == Task.id) \
+        .filter(association_table.c.person == person_id) \
         .filter(Project.id.in_(project_ids)) \
         .filter(Task.task_status_id != done_status["id"]) \
         .add_columns(
@@ -571,7 +733,10 @@ def get_person_tasks(person_id, projects):
             TaskStatus.name,
             TaskType.color,
             TaskStatus.color,
-            TaskStatus.short_name
+            TaskStatus.short_name,
+            Comment.text,
+            Comment.created_at,
+            Comment.person_id
         )
 
     tasks = []
@@ -587,7 +752,10 @@ def get_person_tasks(person_id, projects):
         task_status_name,
         task_type_color,
         task_status_color,
-        task_status_short_name
+        task_status_short_name,
+        last_comment_text,
+        last_comment_date,
+        last_comment_person_id
     ) in query.all():
         if entity_preview_file_id is None:
             entity_preview_file_id = ""
@@ -604,31 +772,15 @@ def get_person_tasks(person_id, projects):
             "task_status_name": task_status_name,
             "task_type_color": task_type_color,
             "task_status_color": task_status_color,
-            "task_status_short_name": task_status_short_name
+            "task_status_short_name": task_status_short_name,
+            "last_comment": {}
         })
-        tasks.append(task_dict)
-
-    task_ids = [task["id"] for task in tasks]
-
-    task_comment_map = {}
-    comments = Comment.query \
-        .filter(Comment.object_id.in_(task_ids)) \
-        .order_by(Comment.object_id, Comment.created_at) \
-        .all()
-
-    task_id = None
-    for comment in comments:
-        if comment.object_id != task_id:
-            task_id = fields.serialize_value(comment.object_id)
-            task_comment_map[task_id] = {
-                "text": comment.text,
-                "date": fields.serialize_value(comment.created_at),
-                "person_id": fields.serialize_value(comment.person_id)
+        if task.last_comment_id is not None:
+            task_dict["last_comment"] = {
+                "text": last_comment_text,
+                "date": fields.serialize_value(last_comment_date),
+                "person_id": fields.serialize_value(last_comment_person_id)
             }
-    for task in tasks:
-        if task["id"] in task_comment_map:
-            task["last_comment"] = task_comment_map[task["id"]]
-        else:
-            task["last_comment"] = {}
+        tasks.append(task_dict)
 
     return tasks
@@ -1,19 +1,23 @@
+from flask import g, has_request_context
+from sqlalchemy import false
 from sqlalchemy.orm import aliased
 
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
 from zou.app.models.project import Project
 from zou.app.models.project_status import ProjectStatus
-from zou.app.models.task import Task
+from zou.app.models.task import Task, association_table
 from zou.app.models.task_type import TaskType
 
+from zou.app import db
 from zou.app.services import persons_service, shots_service, tasks_service
-from zou.app.utils import fields, permissions
+from zou.app.stores import todos_store
+from zou.app.utils import events, fields, permissions
 
 
 def assignee_filter():
-    current_user = persons_service.get_current_user_raw()
-    return Task.assignees.contains(current_user)
+    current_user = persons_service.get_current_user()
+    return Task.assignees.any(id=current_user["id"])
 
 
 def open_project_filter():
@@ -41,9 +45,69 @@ def asset_type_filter():
 
 
 def get_todos():
-    current_user = persons_service.get_current_user_raw()
+    """
+    Return unfinished tasks assigned to the current user in open projects.
+    If the todo cache is enabled, lists are kept in the key value store until
+    an event about one of their tasks occurs.
+    """
+    current_user = persons_service.get_current_user()
+    if todos_store.is_enabled():
+        tasks = todos_store.get(current_user["id"])
+        if tasks is not None:
+            return tasks
+
     projects = related_projects()
-    return tasks_service.get_person_tasks(current_user.id, projects)
+    tasks = tasks_service.get_person_tasks(current_user["id"], projects)
+    if todos_store.is_enabled():
+        todos_store.add(current_user["id"], tasks)
+    return tasks
+
+
+def get_event_person_ids(data):
+    """
+    Return IDs of the people whose todo list is affected by given task event
+    data.
+    """
+    person_ids = set()
+    task_ids = set()
+    if data.get("person", None):
+        person_ids.add(data["person"]["id"])
+    for key in ["task", "task_before", "task_after"]:
+        if data.get(key, None):
+            person_ids.update(data[key].get("assignees", []))
+    if data.get("task_id", None):
+        task_ids.add(data["task_id"])
+
+    if len(task_ids) > 0:
+        assignations = db.session.query(association_table.c.person) \
+            .filter(association_table.c.task.in_(list(task_ids)))
+        for (person_id,) in assignations:
+            person_ids.add(str(person_id))
+    return person_ids
+
+
+class TodosCacheHandler(object):
+    """
+    Event handler removing from the todo cache the lists affected by a task
+    event.
+    """
+
+    def handle_event(self, data):
+        todos_store.delete(get_event_person_ids(data))
+
+
+def register_todos_cache_handler():
+    if todos_store.is_enabled():
+        handler = TodosCacheHandler()
+        for event in [
+            "task:assign",
+            "task:unassign",
+            "task:start",
+            "task:to-review",
+            "task:status-changed",
+            "comment:new"
+        ]:
+            events.register(event, "todos_cache", handler)
 
 
 def get_entity_tasks(entity_id):
@@ -169,28 +233,67 @@ def get_projects():
     return fields.serialize_value(query.all())
 
 
-def check_assigned(task_id):
-    query = Task.query \
-        .filter(assignee_filter()) \
-        .filter(Task.id == task_id)
+def get_user_permissions():
+    """
+    Return IDs of tasks assigned to the current user and IDs of projects
+    where they have tasks. Both sets are built from a single query and kept
+    for the whole request.
+    """
+    current_user = persons_service.get_current_user()
+    user_permissions = None
+    if has_request_context():
+        user_permissions = g.get("user_permissions", None)
+
+    if user_permissions is None or \
+       user_permissions["user_id"] != current_user["id"]:
+        user_permissions = {
+            "user_id": current_user["id"],
+            "task_ids": set(),
+            "project_ids": set()
+        }
+        tasks = Task.query \
+            .join(
+                association_table,
+                association_table.c.task == Task.id
+            ) \
+            .filter(association_table.c.person == current_user["id"]) \
+            .with_entities(Task.id, Task.project_id)
+        for (task_id, project_id) in tasks:
+            user_permissions["task_ids"].add(str(task_id))
+            user_permissions["project_ids"].add(str(project_id))
+
+        if has_request_context():
+            g.user_permissions = user_permissions
+    return user_permissions
 
-    if query.first() is None:
+
+def check_assigned(task_id):
+    if str(task_id) not in get_user_permissions()["task_ids"]:
         raise permissions.PermissionDenied
 
     return True
 
 
 def check_has_task_related(project_id):
-    query = Project.query \
-        .join(Task) \
-        .filter(assignee_filter()) \
-
-    if query.first() is None:
+    if str(project_id) not in get_user_permissions()["project_ids"]:
         raise permissions.PermissionDenied
 
     return True
 
 
+def filter_permitted(query, project_id_column):
+    """
+    Restrict given query to rows of projects where the current user has
+    tasks. It is useful to filter list results without checking entries one
+    by one.
+    """
+    project_ids = list(get_user_permissions()["project_ids"])
+    if len(project_ids) == 0:
+        return query.filter(false())
+    else:
+        return query.filter(project_id_column.in_(project_ids))
+
+
 def check_criterions_has_task_related(criterions):
     if "project_id" in criterions:
         check_has_task_related(criterions["project_id"])
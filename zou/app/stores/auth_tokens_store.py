@@ -1,47 +1,92 @@
-import sys
-import redis
-
 from zou.app import config
+from zou.app.stores import redis_store
+from zou.app.utils import cache
 
 
-try:
-    revoked_tokens_store = redis.StrictRedis(
-        host=config.KEY_VALUE_STORE["host"],
-        port=config.KEY_VALUE_STORE["port"],
-        db=config.AUTH_TOKEN_BLACKLIST_KV_INDEX,
-        decode_responses=True
-    )
-    revoked_tokens_store.get(None)
-except redis.ConnectionError:
-    try:
-        import fakeredis
-        revoked_tokens_store = fakeredis.FakeStrictRedis()
-    except:
-        print("Cannot access to the required Redis instance")
-        sys.exit(1)
+REVOCATION_CHANNEL = "auth:revoked"
+
+revoked_tokens_store = redis_store.new(config.AUTH_TOKEN_BLACKLIST_KV_INDEX)
+
+# Tokens known as not revoked. It avoids a Redis round trip for most
+# requests. Entries are removed as soon as a revocation is published.
+not_revoked_tokens = cache.TTLCache(
+    max_size=config.AUTH_TOKEN_CACHE_SIZE,
+    ttl=config.AUTH_TOKEN_CACHE_TTL
+)
+revocation_listener = redis_store.ChannelListener(
+    config.AUTH_TOKEN_BLACKLIST_KV_INDEX,
+    REVOCATION_CHANNEL,
+    not_revoked_tokens.delete,
+    # Revocations may have been missed while the listener was down.
+    on_restart=not_revoked_tokens.clear,
+    retry_delay=config.AUTH_TOKEN_CACHE_TTL,
+    enabled=config.AUTH_TOKEN_CACHE_TTL > 0
+)
+
+
+def decode(value):
+    return redis_store.decode(value)
 
 
 def add(key, token, ttl=None):
     """
     Store a token with key as access key.
     """
-    return revoked_tokens_store.set(key.encode("utf-8"), token, ex=ttl)
+    not_revoked_tokens.delete(key)
+    return redis_store.with_retry(
+        revoked_tokens_store.set,
+        key.encode("utf-8"),
+        token,
+        ex=ttl
+    )
+
+
+def add_all(entries):
+    """
+    Store several tokens in a single round trip. Entries are (key, token, ttl)
+    tuples.
+    """
+    pipeline = revoked_tokens_store.pipeline(transaction=False)
+    for (key, token, ttl) in entries:
+        not_revoked_tokens.delete(key)
+        pipeline.set(key.encode("utf-8"), token, ex=ttl)
+    return redis_store.with_retry(pipeline.execute)
+
+
+def revoke(key, ttl=None):
+    """
+    Mark token stored at given key as revoked. Other processes are told
+    through a pub/sub message to drop it from their local cache.
+    """
+    not_revoked_tokens.delete(key)
+    pipeline = revoked_tokens_store.pipeline(transaction=False)
+    pipeline.set(key.encode("utf-8"), "true", ex=ttl)
+    pipeline.publish(REVOCATION_CHANNEL, key)
+    return redis_store.with_retry(pipeline.execute)
 
 
 def get(key):
     """
     Retrieve auth token corresponding at given key.
     """
-    value = revoked_tokens_store.get(key)
-    if value is not None and hasattr(value, 'decode'):
-        value = value.decode("utf-8")
-    return value
+    return decode(redis_store.with_retry(revoked_tokens_store.get, key))
+
+
+def get_all(keys):
+    """
+    Retrieve auth tokens corresponding at given keys in a single round trip.
+    """
+    if len(keys) == 0:
+        return []
+    values = redis_store.with_retry(revoked_tokens_store.mget, keys)
+    return [decode(value) for value in values]
 
 
 def delete(key):
     """
     Remove auth token corresponding at given key.
     """
+    not_revoked_tokens.delete(key)
     return revoked_tokens_store.delete(key.encode("utf-8"))
 
 
@@ -49,25 +94,42 @@ def keys():
     """
     Get all keys available in the store.
     """
-    keys = revoked_tokens_store.keys()
-    if len(keys) > 0 and hasattr(keys[0], 'decode'):
-        return [x.decode("utf-8") for x in revoked_tokens_store.keys()]
-    else:
-        return [x for x in revoked_tokens_store.keys()]
+    return [decode(key) for key in revoked_tokens_store.keys()]
 
 
 def clear():
     """
     Clear all auth token stored in the store.
     """
-    for key in keys():
-        delete(key)
+    not_revoked_tokens.clear()
+    all_keys = keys()
+    if len(all_keys) > 0:
+        revoked_tokens_store.delete(*all_keys)
+
+
+def is_token_value_revoked(value):
+    return (value is None) or (value == "true")
+
+
+def is_revocation_listener_running():
+    """
+    Make sure the revocation listener runs in current process. If it does
+    not, the local cache is not used.
+    """
+    return revocation_listener.is_running()
 
 
 def is_revoked(decrypted_token):
     """
-    Tell if a stored auth token is revoked or not.
+    Tell if a stored auth token is revoked or not. Tokens known as not
+    revoked are kept in a local cache for a short while.
     """
     jti = decrypted_token["jti"]
-    is_revoked = get(jti)
-    return (is_revoked is None) or (is_revoked == "true")
+    use_cache = is_revocation_listener_running()
+    if use_cache and not_revoked_tokens.get(jti, False):
+        return False
+
+    revoked = is_token_value_revoked(get(jti))
+    if use_cache and not revoked:
+        not_revoked_tokens.set(jti, True)
+    return revoked
@@ -0,0 +1,84 @@
+import json
+
+from zou.app import config
+from zou.app.stores import redis_store
+
+
+QUEUE_KEY = "jobs:queue"
+RUNNING_KEY = "jobs:running"
+
+jobs_store = redis_store.new(config.KV_JOBS_DB_INDEX)
+# Waiting for a job can last longer than the socket timeout of regular
+# clients, so blocking pops go through a client without socket timeout.
+queue_store = redis_store.new(config.KV_JOBS_DB_INDEX, blocking=True)
+
+
+def get_key(job_id):
+    return "jobs:%s" % job_id
+
+
+def get(job_id):
+    """
+    Return job stored for given id or None if there is no such job.
+    """
+    value = redis_store.with_retry(jobs_store.get, get_key(job_id))
+    if value is None:
+        return None
+    if hasattr(value, "decode"):
+        value = value.decode("utf-8")
+    return json.loads(value)
+
+
+def save(job):
+    """
+    Store given job. It expires after JOB_TTL seconds.
+    """
+    return redis_store.with_retry(
+        jobs_store.set,
+        get_key(job["id"]),
+        json.dumps(job),
+        ex=config.JOB_TTL
+    )
+
+
+def push(job_id):
+    """
+    Add given job at the end of the queue.
+    """
+    return redis_store.with_retry(jobs_store.rpush, QUEUE_KEY, job_id)
+
+
+def pop(timeout=0):
+    """
+    Take the first job id of the queue. If the queue is empty, it waits for
+    a job at most timeout seconds (it does not wait if timeout is 0). It
+    returns None if no job is available.
+    """
+    if timeout > 0:
+        result = redis_store.with_retry(queue_store.blpop, QUEUE_KEY, timeout)
+        value = result[1] if result is not None else None
+    else:
+        value = redis_store.with_retry(jobs_store.lpop, QUEUE_KEY)
+
+    if value is not None and hasattr(value, "decode"):
+        value = value.decode("utf-8")
+    return value
+
+
+def add_running(job_id):
+    return redis_store.with_retry(jobs_store.sadd, RUNNING_KEY, job_id)
+
+
+def remove_running(job_id):
+    return redis_store.with_retry(jobs_store.srem, RUNNING_KEY, job_id)
+
+
+def get_running_ids():
+    """
+    Return ids of jobs flagged as running, including the ones whose worker
+    died before it could clear the flag.
+    """
+    return [
+        value.decode("utf-8") if hasattr(value, "decode") else value
+        for value in redis_store.with_retry(jobs_store.smembers, RUNNING_KEY)
+    ]
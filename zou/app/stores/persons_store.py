@@ -0,0 +1,35 @@
+from zou.app import config
+from zou.app.stores import redis_store
+
+
+CHANGES_CHANNEL = "persons:changed"
+
+persons_store = redis_store.new(config.KV_CACHE_DB_INDEX)
+
+
+def publish_changes():
+    """
+    Tell every process that people were changed, so they can drop the data
+    they cached about them.
+    """
+    return redis_store.with_retry(
+        persons_store.publish,
+        CHANGES_CHANNEL,
+        "changed"
+    )
+
+
+def new_changes_listener(handle_changes):
+    """
+    Return a listener calling given function each time people are changed
+    by any process (and when the listener is restarted, since changes may
+    have been missed).
+    """
+    return redis_store.ChannelListener(
+        config.KV_CACHE_DB_INDEX,
+        CHANGES_CHANNEL,
+        lambda data: handle_changes(),
+        on_restart=handle_changes,
+        retry_delay=config.CURRENT_USER_CACHE_TTL,
+        enabled=config.CURRENT_USER_CACHE_TTL > 0
+    )
@@ -1,7 +1,5 @@
-import redis
-import sys
-
 from zou.app import config
+from zou.app.stores import redis_store
 
 
 def new():
@@ -10,20 +8,4 @@ def new():
     That way the main API takes advantage of Redis pub/sub capabilities to push
     events to the event stream API.
     """
-    try:
-        publisher = redis.StrictRedis(
-            host=config.KEY_VALUE_STORE["host"],
-            port=config.KEY_VALUE_STORE["port"],
-            db=config.KV_EVENTS_DB_INDEX,
-            decode_responses=True
-        )
-        publisher.get(None)
-    except redis.ConnectionError:
-        try:
-            import fakeredis
-            publisher = fakeredis.FakeStrictRedis()
-        except:
-            print("Cannot access to the required Redis instance")
-            sys.exit(1)
-
-    return publisher
+    return redis_store.new(config.KV_EVENTS_DB_INDEX)
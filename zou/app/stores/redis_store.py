@@ -0,0 +1,152 @@
+import sys
+import time
+import threading
+import redis
+
+from zou.app import config
+
+
+connection_pools = {}
+
+
+def get_connection_pool(db_index, blocking=False):
+    """
+    Return the connection pool used for given database index. Pools are
+    created once and shared by all stores of the current process. When all
+    connections are used, callers wait for a free one at most pool_timeout
+    seconds.
+
+    Blocking pools are meant for commands waiting for messages (pub/sub
+    listening, blocking pops). Their connections have no socket timeout.
+    """
+    key = (db_index, blocking)
+    if key not in connection_pools:
+        if blocking:
+            socket_timeout = None
+        else:
+            socket_timeout = config.KEY_VALUE_STORE["socket_timeout"]
+        connection_pools[key] = redis.BlockingConnectionPool(
+            host=config.KEY_VALUE_STORE["host"],
+            port=config.KEY_VALUE_STORE["port"],
+            db=db_index,
+            decode_responses=True,
+            max_connections=config.KEY_VALUE_STORE["max_connections"],
+            timeout=config.KEY_VALUE_STORE["pool_timeout"],
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=config.KEY_VALUE_STORE["connect_timeout"],
+            socket_keepalive=True,
+            retry_on_timeout=True
+        )
+    return connection_pools[key]
+
+
+def with_retry(func, *args, **kwargs):
+    """
+    Run given store operation. If the connection is lost, the operation is
+    retried a few times with an exponential backoff before giving up.
+    """
+    attempts = max(config.KEY_VALUE_STORE["retry_attempts"], 1)
+    backoff = config.KEY_VALUE_STORE["retry_backoff"]
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except redis.ConnectionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+
+
+def new(db_index, blocking=False):
+    """
+    Initialize a Redis client for given database index. It relies on the
+    shared connection pool (the blocking one if blocking is True). If Redis
+    cannot be reached, it falls back on an in-memory store (useful for tests).
+    """
+    try:
+        store = redis.StrictRedis(
+            connection_pool=get_connection_pool(db_index, blocking)
+        )
+        with_retry(store.ping)
+    except redis.ConnectionError:
+        try:
+            import fakeredis
+            store = fakeredis.FakeStrictRedis()
+        except:
+            print("Cannot access to the required Redis instance")
+            sys.exit(1)
+
+    return store
+
+
+def decode(value):
+    if value is not None and hasattr(value, "decode"):
+        value = value.decode("utf-8")
+    return value
+
+
+class ChannelListener(object):
+    """
+    Call given handler with the data of every message published on given
+    channel. Messages are read by a daemon thread, on a connection without
+    socket timeout. The thread is started lazily so it is not shared by
+    forked workers.
+
+    Messages published while the listener is down are lost. So before the
+    listener is (re)started, on_restart is called, to drop local caches for
+    instance. If the listener cannot be started, it is tried again at most
+    every retry_delay seconds.
+    """
+
+    def __init__(
+        self,
+        db_index,
+        channel,
+        handle_message,
+        on_restart=None,
+        retry_delay=30,
+        enabled=True
+    ):
+        self.db_index = db_index
+        self.channel = channel
+        self.handle_message = handle_message
+        self.on_restart = on_restart
+        self.retry_delay = retry_delay
+        self.thread = None
+        self.started_at = 0
+        self.enabled = enabled
+
+    def listen(self, pubsub):
+        for message in pubsub.listen():
+            if message["type"] == "message":
+                self.handle_message(decode(message["data"]))
+
+    def is_running(self):
+        """
+        Make sure the listener runs in current process. It returns False if
+        it does not run (messages may be missed).
+        """
+        if not self.enabled:
+            return False
+
+        if self.thread is not None and self.thread.is_alive():
+            return True
+
+        if self.on_restart is not None:
+            self.on_restart()
+        now = time.time()
+        if now - self.started_at < self.retry_delay:
+            return False
+
+        self.started_at = now
+        try:
+            store = new(self.db_index, blocking=True)
+            pubsub = store.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+            self.thread = threading.Thread(target=self.listen, args=(pubsub,))
+            self.thread.daemon = True
+            self.thread.start()
+            return True
+        except Exception:
+            self.enabled = False
+            return False
+
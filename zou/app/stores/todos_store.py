@@ -0,0 +1,49 @@
+import json
+
+from zou.app import config
+from zou.app.stores import redis_store
+
+
+todos_store = redis_store.new(config.KV_CACHE_DB_INDEX)
+
+
+def get_key(person_id):
+    return "todos:%s" % person_id
+
+
+def is_enabled():
+    return config.TODO_CACHE_TTL > 0
+
+
+def get(person_id):
+    """
+    Return the cached todo list of given person or None if it is not cached.
+    """
+    value = redis_store.with_retry(todos_store.get, get_key(person_id))
+    if value is None:
+        return None
+    if hasattr(value, "decode"):
+        value = value.decode("utf-8")
+    return json.loads(value)
+
+
+def add(person_id, tasks):
+    """
+    Store the todo list of given person. It expires after TODO_CACHE_TTL
+    seconds.
+    """
+    return redis_store.with_retry(
+        todos_store.set,
+        get_key(person_id),
+        json.dumps(tasks),
+        ex=config.TODO_CACHE_TTL
+    )
+
+
+def delete(person_ids):
+    """
+    Remove the todo lists of given people from the cache.
+    """
+    keys = [get_key(person_id) for person_id in person_ids]
+    if len(keys) > 0:
+        return redis_store.with_retry(todos_store.delete, *keys)
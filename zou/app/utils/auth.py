@@ -1,6 +1,19 @@
 import flask_bcrypt as bcrypt
 import email_validator
 
+from zou.app import config
+
+try:
+    from gevent import monkey
+    from gevent.threadpool import ThreadPool
+except ImportError:
+    monkey = None
+    ThreadPool = None
+
+hashing_pool = {
+    "pool": None
+}
+
 
 class PasswordTooShortException(BaseException):
     pass
@@ -14,11 +27,57 @@ class EmailNotValidException(BaseException):
     pass
 
 
+def run_hashing(func, *args):
+    """
+    Run given hashing function. Hashing is CPU bound: when the server runs
+    with gevent workers, it is done in a bounded pool of native threads so
+    other requests are still served meanwhile. Otherwise it runs inline.
+    """
+    if monkey is None or not monkey.is_module_patched("socket"):
+        return func(*args)
+
+    if hashing_pool["pool"] is None:
+        hashing_pool["pool"] = ThreadPool(config.BCRYPT_POOL_SIZE)
+    return hashing_pool["pool"].apply(func, args)
+
+
 def encrypt_password(password):
     """
-    Encrypt given string password using bcrypt algorithm.
+    Encrypt given string password using bcrypt algorithm. The cost factor
+    is set by the BCRYPT_LOG_ROUNDS setting.
+    """
+    return run_hashing(
+        bcrypt.generate_password_hash,
+        password,
+        config.BCRYPT_LOG_ROUNDS
+    )
+
+
+def check_password(password_hash, password):
+    """
+    Tell if given password matches given bcrypt hash.
+    """
+    return run_hashing(bcrypt.check_password_hash, password_hash, password)
+
+
+def get_hash_rounds(password_hash):
+    """
+    Return the cost factor used to build given bcrypt hash ($2b$12$...).
+    """
+    if hasattr(password_hash, "decode"):
+        password_hash = password_hash.decode("utf-8")
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash):
+    """
+    Tell if given hash was built with a cost factor different from the
+    configured one.
     """
-    return bcrypt.generate_password_hash(password)
+    return get_hash_rounds(password_hash) != config.BCRYPT_LOG_ROUNDS
 
 
 def validate_email(email):
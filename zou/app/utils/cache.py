@@ -0,0 +1,52 @@
+import time
+import threading
+
+from collections import OrderedDict
+
+
+class TTLCache(object):
+    """
+    Small in-process cache. Entries expire after given time to live (in
+    seconds). When the cache is full, the least recently used entry is
+    dropped.
+    """
+
+    def __init__(self, max_size=1000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return default
+
+            (value, expires_at) = entry
+            if expires_at < time.time():
+                return default
+
+            self.entries[key] = entry
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (value, time.time() + self.ttl)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
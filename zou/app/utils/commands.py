@@ -1,7 +1,10 @@
 import json
+import time
 import datetime
+import threading
 
 from zou.app.stores import auth_tokens_store as store
+from zou.app.utils import auth
 
 
 def clean_auth_tokens():
@@ -18,3 +21,30 @@ def clean_auth_tokens():
 
         if is_revoked or is_expired:
             store.delete(key)
+
+
+def benchmark_password_checks(count=100, concurrency=10):
+    """
+    Measure how many password checks (the costly part of a login) current
+    process can run per second, with given number of concurrent logins.
+    It returns the number of checks per second.
+    """
+    password_hash = auth.encrypt_password("benchmark")
+    counter = {"remaining": count}
+    lock = threading.Lock()
+
+    def run_checks():
+        while True:
+            with lock:
+                if counter["remaining"] <= 0:
+                    return
+                counter["remaining"] -= 1
+            auth.check_password(password_hash, "benchmark")
+
+    started_at = time.time()
+    workers = [threading.Thread(target=run_checks) for _ in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return count / (time.time() - started_at)
@@ -2,7 +2,9 @@ try:
     from StringIO import StringIO
 except ImportError:
     from io import StringIO
+import codecs
 import csv
+import sys
 
 from zou.app import config
 from flask import make_response
@@ -32,6 +34,37 @@ def build_csv_string(csv_content):
     return string_wrapper.getvalue()
 
 
+def write_csv_file(csv_content, file_path):
+    with open(file_path, "w") as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerows(csv_content)
+
+
+def build_csv_reader(stream):
+    """
+    Return a reader of rows (as dicts) for given binary stream. Lines are
+    decoded while they are read, so the file is never fully loaded.
+    """
+    if sys.version_info[0] < 3:
+        return csv.DictReader(stream)
+    else:
+        return csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+
+
+def read_batches(reader, batch_size):
+    """
+    Yield rows of given reader by lists of batch size rows.
+    """
+    batch = []
+    for row in reader:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if len(batch) > 0:
+        yield batch
+
+
 def build_csv_headers(csv_response, file_name):
     csv_response.headers["Content-Disposition"] = \
         "attachment; filename=%s.csv" % file_name
@@ -21,3 +21,70 @@ def drop_all():
     db.session.flush()
     db.session.close()
     db.drop_all()
+
+
+# Schema changes that create_all cannot apply on existing tables. Every
+# statement can be run several times.
+UPGRADE_STATEMENTS = [
+    "ALTER TABLE person ADD COLUMN IF NOT EXISTS slug VARCHAR(170)",
+    "ALTER TABLE task ADD COLUMN IF NOT EXISTS last_comment_id UUID",
+    "ALTER TABLE task ADD COLUMN IF NOT EXISTS last_comment_at TIMESTAMP",
+    "CREATE INDEX IF NOT EXISTS ix_person_slug ON person (slug)",
+    "CREATE INDEX IF NOT EXISTS ix_person_desktop_login "
+    "ON person (desktop_login)",
+    "CREATE INDEX IF NOT EXISTS ix_assignations_person "
+    "ON assignations (person)",
+    "CREATE INDEX IF NOT EXISTS entity_updated_at_idx ON entity (updated_at)",
+    "CREATE INDEX IF NOT EXISTS task_updated_at_idx ON task (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_time_spent_task_id ON time_spent (task_id)",
+    "CREATE INDEX IF NOT EXISTS time_spent_person_id_date_idx "
+    "ON time_spent (person_id, date)"
+]
+
+# Tables whose shotgun_id became unique (bulk imports rely on it).
+UNIQUE_SHOTGUN_ID_TABLES = ["task", "comment"]
+
+
+def dedupe_shotgun_ids(table_name):
+    """
+    Keep the shotgun_id of the most recently updated row only, so the
+    unique index can be built. It returns the number of cleared rows.
+    """
+    from zou.app import db
+    result = db.session.execute("""
+        UPDATE %(table)s SET shotgun_id = NULL WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY shotgun_id ORDER BY updated_at DESC
+                ) AS rank
+                FROM %(table)s WHERE shotgun_id IS NOT NULL
+            ) AS ranked WHERE rank > 1
+        )
+    """ % {"table": table_name})
+    return result.rowcount
+
+
+def upgrade_all():
+    """
+    Bring an existing database up to date with the models: create missing
+    tables, add missing columns and indexes, then build unique indexes on
+    shotgun ids once duplicates are cleared. It returns the number of
+    cleared duplicates by table.
+    """
+    from zou.app import db
+    db.create_all()
+    cleared = {}
+    try:
+        for statement in UPGRADE_STATEMENTS:
+            db.session.execute(statement)
+        for table_name in UNIQUE_SHOTGUN_ID_TABLES:
+            cleared[table_name] = dedupe_shotgun_ids(table_name)
+            db.session.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS %(table)s_shotgun_id_key "
+                "ON %(table)s (shotgun_id)" % {"table": table_name}
+            )
+        db.session.commit()
+    except:
+        db.session.rollback()
+        raise
+    return cleared
@@ -0,0 +1,66 @@
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+import csv
+import itertools
+import zlib
+
+from sqlalchemy import Text, cast, func, literal_column
+
+from zou.app import db
+
+
+def iter_chunks(query, chunk_size):
+    """
+    Yield results of given query by lists of chunk size rows. Rows are
+    fetched through a server side cursor, so results are never fully loaded.
+    """
+    results = iter(query.yield_per(chunk_size))
+    while True:
+        chunk = list(itertools.islice(results, chunk_size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def generate_ndjson(query, chunk_size):
+    """
+    Yield results of given column query as JSON lines. Rows are serialized
+    by the database (row_to_json), so values keep their type and no Python
+    object is built per row.
+    """
+    json_query = db.session.query(
+        cast(func.row_to_json(literal_column("dump")), Text)
+    ).select_from(query.subquery("dump"))
+
+    for chunk in iter_chunks(json_query, chunk_size):
+        yield "\n".join([row[0] for row in chunk]) + "\n"
+
+
+def generate_csv_gz(query, chunk_size):
+    """
+    Yield results of given column query as a gzip compressed CSV file. The
+    header is made of the column labels.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    string_wrapper = StringIO()
+    csv_writer = csv.writer(string_wrapper)
+    csv_writer.writerow([
+        column["name"] for column in query.column_descriptions
+    ])
+
+    for chunk in iter_chunks(query, chunk_size):
+        csv_writer.writerows(chunk)
+        yield compressor.compress(encode(string_wrapper.getvalue()))
+        string_wrapper.seek(0)
+        string_wrapper.truncate(0)
+
+    yield compressor.compress(encode(string_wrapper.getvalue())) + \
+        compressor.flush()
+
+
+def encode(value):
+    if not isinstance(value, bytes):
+        value = value.encode("utf-8")
+    return value
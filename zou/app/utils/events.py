@@ -1,13 +1,42 @@
+import json
+import time
+import redis
+
 from collections import OrderedDict
-from zou.app import config
-from zou.app.stores import publisher_store
+from sqlalchemy import event as sqlalchemy_event
 
-import json
+from zou.app import app, db, config
+from zou.app.stores import publisher_store
 
 handlers = {}
 
 publisher = publisher_store.new()
 
+CHANNEL_PREFIX = "events"
+GLOBAL_CHANNEL_KEY = "global"
+SUBSCRIBER_CHECK_TTL = 1
+
+subscriber_check = {
+    "checked_at": 0,
+    "has_subscribers": True
+}
+
+# Append the event to the capped event log and publish it in a single round
+# trip. The log entry ID is sent along the message, so stream clients can
+# resume from it after a disconnection.
+PUBLISH_SCRIPT = """
+local event_id = redis.call(
+    'XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*',
+    'channel', ARGV[2], 'payload', ARGV[3]
+)
+redis.call('PUBLISH', ARGV[2], event_id .. '\\n' .. ARGV[3])
+return event_id
+"""
+event_log = {
+    "enabled": config.EVENT_LOG_MAX_LENGTH > 0,
+    "publish_script": None
+}
+
 
 def register(event, name, handler):
     if event not in handlers:
@@ -32,11 +61,170 @@ def unregister_all():
     handlers = {}
 
 
-def emit(event, data={}):
+def has_stream_subscribers():
+    """
+    Tell if at least one event stream client is listening to published
+    events. The answer is kept for a short while to avoid a Redis round trip
+    for every emitted event.
+    """
+    now = time.time()
+    if now - subscriber_check["checked_at"] > SUBSCRIBER_CHECK_TTL:
+        try:
+            has_subscribers = int(publisher.pubsub_numpat()) > 0
+        except Exception:
+            has_subscribers = True
+        subscriber_check["has_subscribers"] = has_subscribers
+        subscriber_check["checked_at"] = now
+    return subscriber_check["has_subscribers"]
+
+
+def has_listeners(event):
+    """
+    Tell if somebody (a handler or an event stream client) will receive given
+    event. It is useful to avoid building event data nobody will read.
+    """
+    return len(handlers.get(event, {})) > 0 or has_stream_subscribers()
+
+
+def get_channel(event, project_id=None):
+    """
+    Build the name of the pub/sub channel used to publish given event.
+    Channels are split by project and event type. That way event stream
+    clients subscribe only to what they need.
+    """
+    return "%s/%s/%s" % (
+        CHANNEL_PREFIX,
+        project_id or GLOBAL_CHANNEL_KEY,
+        event
+    )
+
+
+def emit(event, data={}, project_id=None):
+    """
+    Emit given event. If the current database session contains changes not
+    committed yet, the event is buffered and published only once the
+    transaction is committed. It is dropped if the transaction is rolled back.
+
+    Data can be given as a function. In that case it is called at publishing
+    time and only if a handler or an event stream client listens to the event.
+
+    Project ID is used to publish the event on the project channel.
+    """
+    session = db.session()
+    if has_uncommitted_changes(session):
+        session.info.setdefault("pending_events", []).append(
+            (event, data, project_id)
+        )
+    else:
+        dispatch(event, data, project_id)
+
+
+def dispatch(event, data={}, project_id=None):
+    """
+    Send event to the event stream and to registered handlers.
+    """
     event_handlers = handlers.get(event, {})
-    publisher.publish('sse', json.dumps({
+    if callable(data):
+        if not has_listeners(event):
+            return
+        data = data()
+
+    publish(get_channel(event, project_id), json.dumps({
         "type": event,
         "data": {"data": data}})
     )
-    for func in event_handlers.values():
+    for func in list(event_handlers.values()):
         func.handle_event(data)
+
+
+def publish(channel, payload):
+    """
+    Publish given payload on given channel. Published messages are prefixed
+    by the event log ID and a line break. The ID is empty when the event log
+    is not available (old Redis version or in-memory store).
+    """
+    if event_log["enabled"]:
+        try:
+            if event_log["publish_script"] is None:
+                event_log["publish_script"] = \
+                    publisher.register_script(PUBLISH_SCRIPT)
+            return event_log["publish_script"](
+                keys=[config.EVENT_LOG_KEY],
+                args=[config.EVENT_LOG_MAX_LENGTH, channel, payload]
+            )
+        except redis.ResponseError as exception:
+            if is_unknown_command_error(exception):
+                # Redis version does not support streams.
+                event_log["enabled"] = False
+            else:
+                app.logger.error("Event log failed: %s" % exception)
+        except (AttributeError, ImportError, NotImplementedError):
+            # Event log is not supported by the key value store.
+            event_log["enabled"] = False
+    publisher.publish(channel, "\n" + payload)
+
+
+def is_unknown_command_error(exception):
+    """
+    Tell if given error comes from a command the store does not know (XADD on
+    Redis versions older than 5), directly or from the publish script.
+    """
+    return "unknown" in str(exception).lower() and \
+        "command" in str(exception).lower()
+
+
+def has_uncommitted_changes(session):
+    return bool(
+        session.info.get("has_flushed_changes", False) or
+        session.new or
+        session.dirty or
+        session.deleted
+    )
+
+
+@sqlalchemy_event.listens_for(db.session, "after_flush")
+def mark_flushed_changes(session, flush_context):
+    session.info["has_flushed_changes"] = True
+
+
+@sqlalchemy_event.listens_for(db.session, "after_commit")
+def mark_events_as_committed(session):
+    pending_events = session.info.pop("pending_events", [])
+    session.info.setdefault("committed_events", []).extend(pending_events)
+
+
+@sqlalchemy_event.listens_for(db.session, "after_transaction_end")
+def dispatch_committed_events(session, transaction):
+    """
+    Events are dispatched when the root transaction is over. Events still
+    pending at that moment belong to a rolled back transaction.
+
+    SQLAlchemy runs this hook before the session begins its next
+    transaction, so the session cannot be used by handlers at that moment.
+    Handlers (and lazy data functions) run with a fresh session set as
+    db.session instead: they can read and write in their own transaction,
+    but they have to commit their changes, the session being closed once
+    events are dispatched.
+    """
+    if transaction.parent is None:
+        session.info.pop("has_flushed_changes", None)
+        session.info.pop("pending_events", None)
+        committed_events = session.info.pop("committed_events", [])
+        if len(committed_events) > 0:
+            dispatch_in_new_session(committed_events)
+
+
+def dispatch_in_new_session(committed_events):
+    registry = db.session.registry
+    previous_session = registry() if registry.has() else None
+    dispatch_session = db.session.session_factory()
+    registry.set(dispatch_session)
+    try:
+        for (event, data, project_id) in committed_events:
+            dispatch(event, data, project_id)
+    finally:
+        dispatch_session.close()
+        if previous_session is not None:
+            registry.set(previous_session)
+        else:
+            registry.clear()
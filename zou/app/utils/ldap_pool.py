@@ -0,0 +1,96 @@
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from ldap3 import Server, Connection, SUBTREE
+from ldap3.core.exceptions import LDAPBindError, LDAPException
+
+
+class LDAPConnectionPool(object):
+    """
+    Keep LDAP connections open between logins. A connection is taken from
+    the pool, bound again with the credentials to check, then given back.
+    That way logins do not pay the connection setup each time.
+    """
+
+    def __init__(self, host, port, use_ssl=False, size=5, lifetime=3600):
+        self.server = Server(host, port=port, use_ssl=use_ssl)
+        self.lifetime = lifetime
+        self.connections = queue.Queue(maxsize=size)
+
+    def acquire(self):
+        """
+        Return an idle connection or a new one if there is no idle connection
+        or if they are too old.
+        """
+        while True:
+            try:
+                (connection, created_at) = self.connections.get_nowait()
+            except queue.Empty:
+                return (
+                    Connection(self.server, read_only=True, check_names=True),
+                    time.time()
+                )
+
+            if connection.closed or time.time() - created_at > self.lifetime:
+                self.close(connection)
+            else:
+                return (connection, created_at)
+
+    def release(self, connection, created_at):
+        try:
+            self.connections.put_nowait((connection, created_at))
+        except queue.Full:
+            self.close(connection)
+
+    def close(self, connection):
+        try:
+            connection.unbind()
+        except LDAPException:
+            pass
+
+    def search_account(self, user, password, search_base, search_filter,
+                       attributes):
+        """
+        Bind with given credentials then look for the account matching given
+        filter. It returns the attributes of the account found or None if no
+        account matches. LDAPBindError is raised if credentials are wrong,
+        other LDAPException errors mean the server could not be reached.
+        """
+        (connection, created_at) = self.acquire()
+        try:
+            # Without raise_exceptions, a failed bind only returns False and
+            # the connection keeps its previous binding. The bind result
+            # tells wrong credentials apart from other failures.
+            if not connection.rebind(user=user, password=password):
+                result = connection.result or {}
+                if result.get("description") == "invalidCredentials":
+                    raise LDAPBindError(connection.last_error)
+                else:
+                    raise LDAPException(
+                        connection.last_error or "LDAP bind failed."
+                    )
+            connection.search(
+                search_base=search_base,
+                search_filter=search_filter,
+                search_scope=SUBTREE,
+                attributes=attributes,
+                size_limit=1
+            )
+            entries = [
+                entry for entry in connection.response or []
+                if entry.get("type") == "searchResEntry"
+            ]
+        except Exception:
+            # Connection state is unknown, it is not reused.
+            self.close(connection)
+            raise
+
+        self.release(connection, created_at)
+        if len(entries) == 0:
+            return None
+        else:
+            return entries[0].get("attributes", {})
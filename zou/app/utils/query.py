@@ -1,7 +1,7 @@
 def get_query_criterions_from_request(request):
     criterions = {}
     for key, value in request.args.items():
-        if key not in ["page"]:
+        if key not in ["page", "since", "limit", "cursor", "format"]:
             criterions[key] = value
     return criterions
 
@@ -1,12 +1,21 @@
 #!/usr/bin/env python
+import os
 import sys
 
+# Patching must happen before Flask, Redis and SQLAlchemy are imported,
+# otherwise sockets and locks they already loaded stay blocking.
+if os.getenv("ZOU_GEVENT", "false").lower() == "true":
+    from gevent import monkey
+    monkey.patch_all()
+
 from zou.app.utils import dbhelpers, auth, commands
 from zou.app.services import (
     assets_service,
+    jobs_service,
     persons_service,
     projects_service,
     shots_service,
+    sync_service,
     tasks_service
 )
 
@@ -27,6 +36,26 @@ def init_db():
     print("Database and tables created.")
 
 
+@cli.command()
+def upgrade_db():
+    """
+    Apply schema changes to an existing database (new tables, columns and
+    indexes). Duplicated shotgun ids are cleared before unique indexes are
+    built. Slugs and last comments are computed afterwards.
+    """
+    print("Upgrading database...")
+    cleared = dbhelpers.upgrade_all()
+    for (table_name, count) in sorted(cleared.items()):
+        if count > 0:
+            print("%s duplicated shotgun ids cleared in %s." % (
+                count,
+                table_name
+            ))
+    persons_service.reset_slugs()
+    tasks_service.reset_last_comments()
+    print("Database upgraded.")
+
+
 @cli.command()
 def clear_db():
     "Drop all tables from database"
@@ -79,6 +108,67 @@ def clean_auth_tokens():
     commands.clean_auth_tokens()
 
 
+@cli.command('reset_person_slugs')
+def reset_person_slugs():
+    "Compute again the first.last identifiers used to match AD logins."
+    persons_service.reset_slugs()
+    print("Person slugs computed.")
+
+
+@cli.command('reset_last_comments')
+def reset_last_comments():
+    "Compute again the last comment of every task."
+    tasks_service.reset_last_comments()
+    print("Last comments computed.")
+
+
+@cli.command('clean_tombstones')
+@click.option("--days", type=int, help="Retention period in days.")
+def clean_tombstones(days):
+    "Remove traces of deletions older than the retention period."
+    count = sync_service.prune_tombstones(days)
+    print("%s tombstones removed." % count)
+
+
+@cli.command('worker')
+@click.option("--burst", is_flag=True, help="Stop once the queue is empty.")
+@click.option("--max-jobs", type=int, help="Stop after this number of jobs.")
+def worker(burst, max_jobs):
+    "Run background jobs (long imports and exports)."
+    print("Waiting for jobs...")
+    jobs_service.work(burst=burst, max_jobs=max_jobs)
+
+
+@cli.command('clean_jobs')
+def clean_jobs():
+    "Fail jobs left running by dead workers and remove expired job files."
+    count = jobs_service.fail_stale_jobs()
+    print("%s stale jobs failed." % count)
+    count = jobs_service.clean_job_files()
+    print("%s job files removed." % count)
+
+
+@cli.command('benchmark_logins')
+@click.option("--count", default=100)
+@click.option("--concurrency", default=10)
+def benchmark_logins(count, concurrency):
+    """
+    Measure logins per second a worker can handle (password checks only).
+    Set ZOU_GEVENT=true to run it like a gevent worker.
+    """
+    from zou.app import config
+    rate = commands.benchmark_password_checks(count, concurrency)
+    print(
+        "%.1f logins per second (%s bcrypt rounds, %s concurrent logins%s)." %
+        (
+            rate,
+            config.BCRYPT_LOG_ROUNDS,
+            concurrency,
+            ", gevent" if "gevent" in sys.modules else ""
+        )
+    )
+
+
 @cli.command('init_data')
 def init_data():
     projects_service.get_open_status()
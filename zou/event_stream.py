@@ -1,13 +1,224 @@
+"""
+Event stream server. It pushes events published by the API to clients
+through Server-Sent Events.
+
+Events are published on one Redis channel per project and event type. Each
+client describes which events it wants with the project_id and event query
+parameters. Both can be given several times and event names can end with a
+wildcard:
+
+    /events?project_id=<project-id>&event=task:*&event=comment:new
+
+Events not related to a project are sent to every client.
+
+Every event is stored in a capped Redis stream too. Its ID is sent as the
+Server-Sent Event ID. When a client reconnects with the Last-Event-ID header
+(or the last_event_id query parameter), the events it missed are replayed
+before live events. If some of them were trimmed from the log, a reset
+event is sent to tell the client it has to reload its data.
+
+Connections are mostly idle, so the server is meant to run with gevent
+workers. It can hold thousands of connections that way:
+
+    gunicorn -k gevent -b 0.0.0.0:5001 zou.event_stream:app
+"""
 import os
+import re
+import time
+import json
+import fnmatch
+
+import redis
+
+from flask import Flask, Response, request, stream_with_context
 
-from flask import Flask
-from flask_sse import sse
+CHANNEL_PREFIX = "events"
+GLOBAL_CHANNEL_KEY = "global"
+EVENT_LOG_KEY = "events:log"
+REPLAY_BATCH_SIZE = 500
 
 app = Flask(__name__)
-redis_host =  os.environ.get("KV_HOST", "localhost")
-redis_port =  os.environ.get("KV_PORT", "6379")
+redis_host = os.environ.get("KV_HOST", "localhost")
+redis_port = os.environ.get("KV_PORT", "6379")
 redis_url = "redis://%s:%s/2" % (redis_host, redis_port)
-
+heartbeat_interval = int(os.environ.get("EVENT_STREAM_HEARTBEAT", 15))
+event_log_max_length = int(os.environ.get("EVENT_LOG_MAX_LENGTH", 10000))
 
 app.config["REDIS_URL"] = redis_url
-app.register_blueprint(sse, url_prefix='/events')
+redis_client = redis.StrictRedis.from_url(redis_url, decode_responses=True)
+
+
+def clean_filter_value(value):
+    """
+    Remove characters that have a special meaning in Redis channel patterns,
+    except the trailing wildcard.
+    """
+    return re.sub(r"[^\w:\-*]", "", value)
+
+
+def get_channel_patterns(project_ids, event_names):
+    """
+    Build channel patterns matching given projects and event names. If no
+    project is given, events of every project are sent.
+    """
+    project_keys = [clean_filter_value(x) for x in project_ids if x]
+    if len(project_keys) > 0:
+        project_keys.append(GLOBAL_CHANNEL_KEY)
+    else:
+        project_keys = ["*"]
+
+    event_keys = [clean_filter_value(x) for x in event_names if x]
+    if len(event_keys) == 0:
+        event_keys = ["*"]
+
+    return [
+        "%s/%s/%s" % (CHANNEL_PREFIX, project_key, event_key)
+        for project_key in project_keys
+        for event_key in event_keys
+    ]
+
+
+def parse_event_id(event_id):
+    """
+    Turn an event log ID (<milliseconds>-<sequence>) into a comparable tuple.
+    It returns None if the ID is not valid.
+    """
+    try:
+        (milliseconds, sequence) = event_id.split("-")
+        return (int(milliseconds), int(sequence))
+    except (AttributeError, ValueError):
+        return None
+
+
+def split_message(message):
+    """
+    Messages published by the API are made of the event ID, a line break and
+    the JSON payload.
+    """
+    (event_id, payload) = message.split("\n", 1)
+    return (event_id, payload)
+
+
+def format_message(event_id, payload):
+    """
+    Convert a message published by the API into a Server-Sent Event.
+    """
+    message = json.loads(payload)
+    event = "event:%s\ndata:%s\n\n" % (
+        message["type"],
+        json.dumps(message["data"])
+    )
+    if event_id:
+        event = "id:%s\n%s" % (event_id, event)
+    return event
+
+
+def match_patterns(channel, patterns):
+    return any(
+        fnmatch.fnmatchcase(channel, pattern) for pattern in patterns
+    )
+
+
+def is_log_trimmed_after(last_event_id):
+    """
+    Tell if events published after given event ID may have been trimmed from
+    the log. Entries are dropped only once the log reached its maximum
+    length, so a given ID older than the oldest entry is not enough.
+    """
+    oldest_entries = redis_client.execute_command(
+        "XRANGE", EVENT_LOG_KEY, "-", "+", "COUNT", 1
+    )
+    if len(oldest_entries) == 0 or \
+       parse_event_id(oldest_entries[0][0]) <= last_event_id:
+        return False
+
+    log_length = redis_client.execute_command("XLEN", EVENT_LOG_KEY)
+    return int(log_length) >= event_log_max_length
+
+
+def replay_events(last_event_id, patterns):
+    """
+    Yield (event ID, payload) tuples for logged events published after given
+    event ID and matching given channel patterns. If events were trimmed from
+    the log since then, a None payload is yielded first.
+    """
+    if is_log_trimmed_after(last_event_id):
+        yield (None, None)
+
+    start = "%s-%s" % last_event_id
+    while True:
+        entries = redis_client.execute_command(
+            "XRANGE", EVENT_LOG_KEY, start, "+", "COUNT", REPLAY_BATCH_SIZE
+        )
+        entries = [
+            entry for entry in entries
+            if parse_event_id(entry[0]) > last_event_id
+        ]
+        if len(entries) == 0:
+            return
+
+        for (event_id, entry_fields) in entries:
+            entry = dict(zip(entry_fields[::2], entry_fields[1::2]))
+            if match_patterns(entry["channel"], patterns):
+                yield (event_id, entry["payload"])
+        last_event_id = parse_event_id(entries[-1][0])
+        start = entries[-1][0]
+
+
+def stream_events(patterns, last_event_id=None):
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.psubscribe(*patterns)
+    last_sent_at = time.time()
+    try:
+        if last_event_id is not None:
+            for (event_id, payload) in replay_events(last_event_id, patterns):
+                if payload is None:
+                    yield "event:reset\ndata:{}\n\n"
+                else:
+                    last_event_id = parse_event_id(event_id)
+                    yield format_message(event_id, payload)
+
+        while True:
+            message = pubsub.get_message(timeout=heartbeat_interval)
+            if message is not None and message["type"] == "pmessage":
+                (event_id, payload) = split_message(message["data"])
+                is_replayed = last_event_id is not None and \
+                    event_id and \
+                    parse_event_id(event_id) <= last_event_id
+                if not is_replayed:
+                    last_sent_at = time.time()
+                    yield format_message(event_id, payload)
+            elif time.time() - last_sent_at >= heartbeat_interval:
+                last_sent_at = time.time()
+                yield ":heartbeat\n\n"
+    finally:
+        pubsub.close()
+
+
+@app.route("/events")
+def events():
+    patterns = get_channel_patterns(
+        request.args.getlist("project_id"),
+        request.args.getlist("event")
+    )
+    last_event_id = parse_event_id(
+        request.headers.get(
+            "Last-Event-ID",
+            request.args.get("last_event_id", "")
+        )
+    )
+    response = Response(
+        stream_with_context(stream_events(patterns, last_event_id)),
+        mimetype="text/event-stream"
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+if __name__ == "__main__":
+    from gevent import monkey
+    monkey.patch_all()
+
+    from gevent.pywsgi import WSGIServer
+    WSGIServer(("0.0.0.0", 5001), app).serve_forever()